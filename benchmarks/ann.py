@@ -0,0 +1,159 @@
+"""benchmarks.ann
+
+Recall vs latency of the ``VectorStore`` IVF index against brute force.
+
+Vectors are drawn from a seeded mixture of Gaussian clusters on the unit
+sphere, a rough stand-in for chunk embeddings (which cluster by topic).
+Queries are perturbed copies of random rows. Ground truth is the exact
+top-k (``exact=True``). For every ``nprobe`` the benchmark reports
+recall@k (the fraction of the exact top-k found) and the mean and p95
+query latency, next to the brute-force latency and the index build time.
+
+Needs NumPy (the index does too).
+
+Usage: python -m benchmarks.ann --rows 200000 --dim 256 --output ann.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from benchmarks.run import _git_commit
+from code_intel.storage import VectorStore
+
+try:
+    import numpy as np  # type: ignore
+except ImportError:
+    np = None
+
+RESULTS_VERSION = 1
+DEFAULT_NPROBES = (1, 2, 4, 8, 16, 32, 64)
+
+
+def make_store(rows: int, dim: int, clusters: int, spread: float, seed: int) -> VectorStore:
+    """A store of ``rows`` clustered unit vectors (metadata is synthetic)."""
+    rnd = np.random.default_rng(seed)
+    centers = rnd.standard_normal((clusters, dim)).astype(np.float32)
+    centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+    store = VectorStore(dim)
+    block = 50_000
+    for start in range(0, rows, block):
+        count = min(block, rows - start)
+        labels = rnd.integers(0, clusters, count)
+        vectors = centers[labels] + spread * rnd.standard_normal((count, dim)).astype(np.float32) / np.sqrt(dim)
+        ids = range(start, start + count)
+        store.add_embeddings([""] * count, vectors, ["synthetic.py"] * count, [f"chunk_{i}" for i in ids])
+    return store
+
+
+def make_queries(store: VectorStore, count: int, noise: float, seed: int) -> List[Any]:
+    rnd = np.random.default_rng(seed + 1)
+    rows = rnd.choice(len(store), count, replace=False)
+    return [np.asarray(store.vector(int(r))) + noise * rnd.standard_normal(store.dim) / np.sqrt(store.dim) for r in rows]
+
+
+def measure(store: VectorStore, queries: Sequence[Any], k: int, **search: Any) -> Dict[str, Any]:
+    """Runs every query; returns the results and the per-query latencies (ms)."""
+    results, latencies = [], []
+    for q in queries:
+        start = time.perf_counter()
+        results.append([row for row, _ in store.top_k(q, k, **search)])
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {"results": results, "latencies": latencies}
+
+
+def benchmark(
+    rows: int,
+    dim: int,
+    clusters: int,
+    queries: int,
+    k: int,
+    nlist: Optional[int],
+    nprobes: Sequence[int],
+    seed: int,
+) -> Dict[str, Any]:
+    store = make_store(rows, dim, clusters, spread=1.0, seed=seed)
+    query_vectors = make_queries(store, queries, noise=0.5, seed=seed)
+
+    exact = measure(store, query_vectors, k, exact=True)
+    truth = [set(r) for r in exact["results"]]
+
+    start = time.perf_counter()
+    index = store.build_index(nlist=nlist)
+    build_seconds = time.perf_counter() - start
+
+    sweep = []
+    for nprobe in nprobes:
+        if nprobe > index.nlist:
+            continue
+        run = measure(store, query_vectors, k, nprobe=nprobe)
+        recall = statistics.mean(len(truth[i] & set(r)) / len(truth[i]) for i, r in enumerate(run["results"]))
+        sweep.append({"nprobe": nprobe, "recall": round(recall, 4), **_latency(run["latencies"])})
+
+    return {
+        "version": RESULTS_VERSION,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "config": {"rows": rows, "dim": dim, "clusters": clusters, "queries": queries, "k": k, "seed": seed},
+        "index": {"nlist": index.nlist, "build_seconds": round(build_seconds, 3)},
+        "brute_force": _latency(exact["latencies"]),
+        "ivf": sweep,
+    }
+
+
+def _latency(latencies: List[float]) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "mean_ms": round(statistics.mean(ordered), 4),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 4),
+    }
+
+
+def main() -> Optional[int]:
+    parser = argparse.ArgumentParser(description="Recall/latency of the VectorStore IVF index vs brute force")
+    parser.add_argument("--rows", type=int, default=100_000, help="Stored vectors (default: 100000)")
+    parser.add_argument("--dim", type=int, default=256, help="Vector dimension (default: 256)")
+    parser.add_argument("--clusters", type=int, default=500, help="Gaussian clusters in the data (default: 500)")
+    parser.add_argument("--queries", type=int, default=200, help="Queries (default: 200)")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query (default: 10)")
+    parser.add_argument("--nlist", type=int, default=None, help="IVF clusters (default: about 4 * sqrt(rows))")
+    parser.add_argument(
+        "--nprobe", type=int, action="append", default=None, help=f"nprobe values to sweep (repeatable; default: {list(DEFAULT_NPROBES)})"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    if np is None:
+        print("benchmarks.ann needs NumPy.")
+        return 1
+    results = benchmark(
+        args.rows, args.dim, args.clusters, args.queries, args.k, args.nlist, args.nprobe or DEFAULT_NPROBES, args.seed
+    )
+
+    brute = results["brute_force"]
+    print(f"{args.rows} x {args.dim} vectors, nlist {results['index']['nlist']} (built in {results['index']['build_seconds']:.2f}s)")
+    print(f"  {'brute force':<12} recall 1.0000  {brute['mean_ms']:8.3f} ms/query  (p95 {brute['p95_ms']:.3f})")
+    for row in results["ivf"]:
+        speedup = brute["mean_ms"] / row["mean_ms"] if row["mean_ms"] else float("inf")
+        print(
+            f"  nprobe {row['nprobe']:<5} recall {row['recall']:.4f}  {row['mean_ms']:8.3f} ms/query  "
+            f"(p95 {row['p95_ms']:.3f}, {speedup:.1f}x)"
+        )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    return None
+
+
+if __name__ == "__main__":
+    sys.exit(main())
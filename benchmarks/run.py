@@ -0,0 +1,215 @@
+"""benchmarks.run
+
+Per-phase benchmark of the analyzer on a synthetic repository.
+
+Phases, in pipeline order:
+
+- discovery: ``FileDiscovery.find_files``;
+- pass1: definitions (``ProjectScanner`` Pass 1: read, parse, visit);
+- index: ``SymbolIndex`` construction;
+- pass2: relationship resolution;
+- report: ``CodeReporter.generate_markdown`` (degree metrics);
+- artifacts: ``ArtifactWriter.write_all``;
+- json_output: ``write_graph_outputs`` (entities / relationships / graph).
+
+Each round starts from a fresh graph and source cache. Timings come from
+``--repeat`` rounds without tracing. Peak traced memory per phase comes from
+one extra round under ``tracemalloc``, which would otherwise slow the timed
+rounds down. Results are written as JSON (see ``--output``) and can be
+compared with an earlier file via ``--compare``.
+
+Usage: python -m benchmarks.run --scale medium --output results.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.synth import SCALES, SynthConfig, generate_repo
+from code_intel.artifacts import ArtifactWriter
+from code_intel.discovery import FileDiscovery
+from code_intel.graph import CodeGraph
+from code_intel.metrics import GraphMetrics
+from code_intel.pipeline import DEFAULT_READERS
+from code_intel.report import CodeReporter
+from code_intel.scanner import ProjectScanner
+from code_intel.serialize import write_graph_outputs
+from code_intel.sources import SourceCache
+
+PHASES = ("discovery", "pass1", "index", "pass2", "report", "artifacts", "json_output")
+RESULTS_VERSION = 1
+
+
+def run_round(repo: str, output_dir: str, readers: int, trace: bool = False) -> Dict[str, Dict[str, float]]:
+    """
+    One full analysis of ``repo``. Returns {phase: {"seconds": ..., ["peak_kb": ...]}}
+    plus a "graph" entry with node/edge counts.
+    """
+    results: Dict[str, Dict[str, float]] = {}
+    graph = CodeGraph()
+    scanner = ProjectScanner(repo, graph, cache=SourceCache(), readers=readers)
+    metrics = GraphMetrics(graph)
+    state: Dict[str, Any] = {}
+
+    steps: List[tuple] = [
+        ("discovery", lambda: state.update(files=FileDiscovery(repo).find_files())),
+        ("pass1", lambda: state.update(files=scanner._pass_definitions(state["files"]))),
+        ("index", lambda: scanner._build_index(state["files"])),
+        ("pass2", lambda: scanner._pass_relationships(state["files"])),
+        ("report", lambda: CodeReporter(graph, metrics).generate_markdown()),
+        ("artifacts", lambda: ArtifactWriter(graph, repo, metrics, sources=scanner.cache).write_all(output_dir)),
+        ("json_output", lambda: write_graph_outputs(graph, output_dir)),
+    ]
+    # The scanner and writers report progress on stdout.
+    with contextlib.redirect_stdout(io.StringIO()):
+        for name, step in steps:
+            results[name] = _measure(step, trace)
+    results["graph"] = {"nodes": len(graph.nodes), "edges": len(graph.edges)}
+    return results
+
+
+def _measure(step: Callable[[], Any], trace: bool) -> Dict[str, float]:
+    if trace:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    step()
+    measured = {"seconds": time.perf_counter() - start}
+    if trace:
+        current, peak = tracemalloc.get_traced_memory()
+        measured["peak_kb"] = round((peak - base) / 1024, 1)
+        measured["retained_kb"] = round((current - base) / 1024, 1)
+    return measured
+
+
+def benchmark(config: SynthConfig, repeat: int, readers: int, memory: bool, workdir: str) -> Dict[str, Any]:
+    """Generates the repository in ``workdir`` and runs the timed (and traced) rounds."""
+    repo = os.path.join(workdir, "repo")
+    out = os.path.join(workdir, "out")
+    repo_stats = generate_repo(repo, config)
+
+    rounds = [run_round(repo, out, readers) for _ in range(max(1, repeat))]
+    phases: Dict[str, Dict[str, Any]] = {}
+    for name in PHASES:
+        samples = [r[name]["seconds"] for r in rounds]
+        phases[name] = {
+            "seconds": [round(s, 6) for s in samples],
+            "min": round(min(samples), 6),
+            "median": round(statistics.median(samples), 6),
+        }
+
+    if memory:
+        tracemalloc.start()
+        try:
+            traced = run_round(repo, out, readers, trace=True)
+            overall_peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        for name in PHASES:
+            phases[name]["peak_kb"] = traced[name]["peak_kb"]
+            phases[name]["retained_kb"] = traced[name]["retained_kb"]
+
+    totals = [sum(r[name]["seconds"] for name in PHASES) for r in rounds]
+    results: Dict[str, Any] = {
+        "version": RESULTS_VERSION,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {**asdict(config), "repeat": repeat, "readers": readers},
+        "repo": repo_stats,
+        "graph": rounds[0]["graph"],
+        "phases": phases,
+        "total": {"min": round(min(totals), 6), "median": round(statistics.median(totals), 6)},
+    }
+    if memory:
+        results["total"]["peak_kb"] = round(overall_peak / 1024, 1)
+    return results
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Human-readable per-phase median ratios (current / baseline)."""
+    lines = [f"Compared with {baseline.get('commit') or 'baseline'} ({baseline.get('timestamp', '?')}):"]
+    for name in PHASES + ("total",):
+        now = current["phases"][name]["median"] if name != "total" else current["total"]["median"]
+        before_entry = baseline.get("phases", {}).get(name) if name != "total" else baseline.get("total")
+        if not before_entry or not before_entry.get("median"):
+            continue
+        ratio = now / before_entry["median"]
+        lines.append(f"  {name:<12} {before_entry['median'] * 1000:9.1f} ms -> {now * 1000:9.1f} ms  ({ratio:.2f}x)")
+    return lines
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the analyzer phases on a synthetic repository")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small", help="Synthetic repository preset")
+    for name, default in asdict(SynthConfig()).items():
+        parser.add_argument(
+            f"--{name.replace('_', '-')}", type=type(default), default=None, help=f"Override the preset's {name}"
+        )
+    parser.add_argument("--repeat", type=int, default=3, help="Timed rounds (default: 3); medians are reported")
+    parser.add_argument("--readers", type=int, default=DEFAULT_READERS, help=f"Pass 1 reader threads (default: {DEFAULT_READERS})")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc round")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON results file (default: benchmark_results.json)")
+    parser.add_argument("--compare", metavar="JSON", help="Earlier results file to compare medians with")
+    parser.add_argument("--workdir", help="Keep the generated repository and outputs here (default: a temporary directory)")
+    args = parser.parse_args()
+
+    config = SCALES[args.scale]
+    overrides = {k: v for k, v in vars(args).items() if k in asdict(config) and v is not None}
+    config = SynthConfig(**{**asdict(config), **overrides})
+
+    if args.workdir:
+        os.makedirs(args.workdir, exist_ok=True)
+        results = benchmark(config, args.repeat, args.readers, not args.no_memory, args.workdir)
+    else:
+        with tempfile.TemporaryDirectory(prefix="code_intel_bench_") as workdir:
+            results = benchmark(config, args.repeat, args.readers, not args.no_memory, workdir)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    repo, graph = results["repo"], results["graph"]
+    print(f"{repo['files']} files, {repo['lines']} lines -> {graph['nodes']} nodes, {graph['edges']} edges")
+    for name in PHASES:
+        phase = results["phases"][name]
+        memory = f"  peak {phase['peak_kb'] / 1024:8.1f} MB" if "peak_kb" in phase else ""
+        print(f"  {name:<12} {phase['median'] * 1000:9.1f} ms{memory}")
+    print(f"  {'total':<12} {results['total']['median'] * 1000:9.1f} ms")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print("\n".join(compare(results, baseline)))
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
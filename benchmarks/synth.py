@@ -0,0 +1,199 @@
+"""benchmarks.synth
+
+Deterministic generator of synthetic Python repositories.
+
+The same ``SynthConfig`` (including ``seed``) always produces byte-identical
+trees, so timings from different commits are measured on the same input. The
+generated code exercises what the analyzer resolves:
+
+- packages with ``__init__`` re-exports and modules in them;
+- ``import pkg.mod``, ``from pkg import mod`` and ``from pkg.mod import name``
+  imports, ``import_fanout`` per module, always of earlier modules (acyclic)
+  plus an occasional back-edge, so import cycles exist too;
+- classes with inheritance, methods calling ``self.*``, module-level
+  functions calling local, imported and attribute-qualified functions
+  (``call_density`` calls per function body);
+- ``raise`` / ``assert`` / guarded branches for the business-rule heuristics.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Tuple
+
+
+@dataclass
+class SynthConfig:
+    """
+    Shape of a synthetic repository.
+
+    Attributes:
+        files (int): Number of modules (``__init__`` files not included).
+        modules_per_package (int): Modules per package directory.
+        classes_per_module (int): Classes defined in each module.
+        methods_per_class (int): Methods per class.
+        functions_per_module (int): Module-level functions per module.
+        call_density (int): Calls per function or method body.
+        import_fanout (int): Project modules imported by each module.
+        cycle_ratio (float): Fraction of modules that also import a later module.
+        seed (int): Random seed; same config -> same tree.
+    """
+    files: int = 200
+    modules_per_package: int = 20
+    classes_per_module: int = 3
+    methods_per_class: int = 4
+    functions_per_module: int = 5
+    call_density: int = 4
+    import_fanout: int = 4
+    cycle_ratio: float = 0.02
+    seed: int = 0
+
+
+# Named presets for the benchmark runner (--scale).
+SCALES: Dict[str, SynthConfig] = {
+    "small": SynthConfig(files=50),
+    "medium": SynthConfig(files=500),
+    "large": SynthConfig(files=5000, modules_per_package=50),
+}
+
+
+def generate_repo(root: str, config: SynthConfig) -> Dict[str, int]:
+    """
+    Writes the repository under ``root`` (created if needed; existing files
+    with the same names are overwritten). Returns file, line and byte counts.
+    """
+    if config.files < 1 or config.functions_per_module < 1 or config.modules_per_package < 1:
+        raise ValueError("files, modules_per_package and functions_per_module must be at least 1")
+    rnd = random.Random(config.seed)
+    modules = [
+        (f"pkg_{i // config.modules_per_package:03d}", f"mod_{i % config.modules_per_package:03d}")
+        for i in range(config.files)
+    ]
+    # (package, module) -> names of its module-level functions / classes
+    functions = {m: [f"func_{j}" for j in range(config.functions_per_module)] for m in modules}
+    classes = {m: [f"Class{j}" for j in range(config.classes_per_module)] for m in modules}
+
+    stats = {"files": 0, "lines": 0, "bytes": 0}
+    packages = sorted({package for package, _ in modules})
+    for package in packages:
+        members = [m for m in modules if m[0] == package]
+        init_lines = [f'"""Synthetic package {package}."""', ""]
+        # Re-export the first function of each module, as real packages do.
+        for _, module in members:
+            init_lines.append(f"from {package}.{module} import {functions[(package, module)][0]} as {module}_entry")
+        _write(os.path.join(root, package, "__init__.py"), init_lines, stats)
+
+    for index, (package, module) in enumerate(modules):
+        lines = _module_source(rnd, config, modules, index, functions, classes)
+        _write(os.path.join(root, package, f"{module}.py"), lines, stats)
+    return stats
+
+
+def _module_source(
+    rnd: random.Random,
+    config: SynthConfig,
+    modules: List[Tuple[str, str]],
+    index: int,
+    functions: Dict[Tuple[str, str], List[str]],
+    classes: Dict[Tuple[str, str], List[str]],
+) -> List[str]:
+    package, module = modules[index]
+    lines = [f'"""Synthetic module {package}.{module} ({index})."""', "", "import os", "import logging", ""]
+
+    # Imports of earlier modules (plus the odd later one, creating cycles).
+    candidates = list(range(index))
+    deps = rnd.sample(candidates, min(config.import_fanout, len(candidates)))
+    if index + 1 < len(modules) and rnd.random() < config.cycle_ratio:
+        deps.append(rnd.randrange(index + 1, len(modules)))
+    # Expressions calling an imported function, as written in this module
+    external: List[str] = []
+    for n, dep in enumerate(deps):
+        dep_package, dep_module = modules[dep]
+        style = n % 3
+        if style == 0:
+            lines.append(f"import {dep_package}.{dep_module}")
+            external.append(f"{dep_package}.{dep_module}.{rnd.choice(functions[modules[dep]])}")
+        elif style == 1:
+            alias = f"m{n}"
+            lines.append(f"from {dep_package} import {dep_module} as {alias}")
+            external.append(f"{alias}.{rnd.choice(functions[modules[dep]])}")
+        else:
+            name = rnd.choice(functions[modules[dep]])
+            alias = f"{name}_{n}"
+            lines.append(f"from {dep_package}.{dep_module} import {name} as {alias}")
+            external.append(alias)
+    lines += ["", "logger = logging.getLogger(__name__)", ""]
+
+    local_functions = functions[(package, module)]
+    local_classes = classes[(package, module)]
+
+    for c, class_name in enumerate(local_classes):
+        base = f"({local_classes[c - 1]})" if c > 0 and rnd.random() < 0.5 else ""
+        lines += ["", f"class {class_name}{base}:", f'    """Synthetic class {class_name}."""', ""]
+        methods = [f"method_{k}" for k in range(config.methods_per_class)]
+        for k, method in enumerate(methods):
+            lines.append(f"    def {method}(self, value=0):")
+            if k == 0:
+                lines += ["        if value < 0:", f'            raise ValueError("{class_name}.{method} needs a non-negative value")']
+            for _ in range(config.call_density):
+                choice = rnd.random()
+                if choice < 0.4:
+                    lines.append(f"        self.{rnd.choice(methods)}(value - 1) if value > 0 else None")
+                elif choice < 0.7:
+                    lines.append(f"        {rnd.choice(local_functions)}(value)")
+                elif external:
+                    lines.append(f"        {rnd.choice(external)}(value)")
+                else:
+                    lines.append("        logger.debug(value)")
+            lines += ["        return value", ""]
+
+    for f, function in enumerate(local_functions):
+        lines += ["", f"def {function}(value=0):", f'    """Synthetic function {function}."""']
+        if f == 0:
+            lines.append('    assert value >= 0, "value must be non-negative"')
+        for _ in range(config.call_density):
+            choice = rnd.random()
+            if choice < 0.3 and f > 0:
+                lines.append(f"    {local_functions[rnd.randrange(f)]}(value)")
+            elif choice < 0.6 and external:
+                lines.append(f"    {rnd.choice(external)}(value)")
+            elif choice < 0.8 and local_classes:
+                cls = rnd.choice(local_classes)
+                lines.append(f"    {cls}().method_0(value)")
+            else:
+                lines.append("    os.path.join(str(value), 'x')")
+        lines.append("    return value")
+    lines.append("")
+    return lines
+
+
+def _write(path: str, lines: List[str], stats: Dict[str, int]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    data = ("\n".join(lines) + "\n").encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(data)
+    stats["files"] += 1
+    stats["lines"] += len(lines)
+    stats["bytes"] += len(data)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic Python repository")
+    parser.add_argument("output", help="Directory to write the repository to")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small", help="Preset to start from")
+    for name, default in asdict(SynthConfig()).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(default), default=None)
+    args = parser.parse_args()
+
+    config = SCALES[args.scale]
+    overrides = {k: v for k, v in vars(args).items() if k in asdict(config) and v is not None}
+    config = SynthConfig(**{**asdict(config), **overrides})
+    stats = generate_repo(args.output, config)
+    print(f"Wrote {stats['files']} files ({stats['lines']} lines, {stats['bytes']} bytes) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,13 +6,24 @@ Usage: python analyze.py <source_path> --output <output_folder>
 """
 
 import argparse
+import contextlib
 import os
-import json
 import time
+from typing import Optional, Set
 from code_intel.scanner import ProjectScanner
+from code_intel.discovery import DEFAULT_INCLUDE, FileDiscovery
+from code_intel.pipeline import DEFAULT_READERS
 from code_intel.graph import CodeGraph
+from code_intel.compact_graph import CompactCodeGraph
 from code_intel.report import CodeReporter
-from code_intel.artifacts import ArtifactWriter
+from code_intel.artifacts import ArtifactWriter, affected_artifacts
+from code_intel.metrics import GraphMetrics
+from code_intel.centrality import DEFAULT_SAMPLES
+from code_intel.instrument import DEFAULT_SLOWEST, Profiler
+from code_intel.serialize import COMPRESSIONS, FORMATS, write_graph_outputs
+from code_intel.sources import SourceCache
+from code_intel.scan_cache import CACHE_FILENAME, ScanCache
+from code_intel.watch import DEFAULT_INTERVAL, FileWatcher, watch
 
 def main():
     parser = argparse.ArgumentParser(description="Code Intelligence Engine")
@@ -23,6 +34,118 @@ def main():
         action="store_true",
         help="Also generate AI-ready artifacts (domain overview, entity map, call graph, dependency report, business rules, ai_context.json)",
     )
+    parser.add_argument(
+        "--ast-cache-mb",
+        type=float,
+        default=None,
+        help="Cap (in MB of source) on parsed modules kept in memory between scan passes; files beyond it are re-parsed on demand (default: unbounded)",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Number of worker processes used to parse and visit files (default: 1, serial)",
+    )
+    parser.add_argument(
+        "--readers",
+        type=int,
+        default=DEFAULT_READERS,
+        help=f"Reader threads feeding the serial scan pipeline (default: {DEFAULT_READERS}, which reads files inline after the walk; try 4+ on network file systems)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=f"Keep a per-file scan cache in the output folder ({CACHE_FILENAME}) and only re-parse files that changed since the last run",
+    )
+    parser.add_argument(
+        "--compact-graph",
+        action="store_true",
+        help="Store the graph with interned IDs and array-backed edges (much lower memory on large codebases)",
+    )
+    parser.add_argument(
+        "--call-sites",
+        action="store_true",
+        help="Record the source line of every call site on each (de-duplicated) edge",
+    )
+    parser.add_argument(
+        "--compact-json",
+        action="store_true",
+        help="Write JSON outputs without indentation (smaller files, faster to write)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default="json",
+        help="Format of the entity/relationship dumps: json arrays, or ndjson (one record per line)",
+    )
+    parser.add_argument(
+        "--compress",
+        choices=sorted(COMPRESSIONS),
+        default=None,
+        help="Compress the entity/relationship dumps (and NDJSON artifacts) with gzip or xz",
+    )
+    parser.add_argument(
+        "--snapshot",
+        action="store_true",
+        help="Also write graph.snapshot, a binary graph that CodeGraph.load_snapshot() memory-maps",
+    )
+    parser.add_argument(
+        "--centrality",
+        action="store_true",
+        help="Rank the most central functions (PageRank and betweenness over the call graph) in summary.md and ai_context.json",
+    )
+    parser.add_argument(
+        "--centrality-samples",
+        type=int,
+        default=DEFAULT_SAMPLES,
+        help=f"With --centrality: source functions sampled to estimate betweenness (default: {DEFAULT_SAMPLES}; 0 computes it exactly)",
+    )
+    parser.add_argument(
+        "--include",
+        action="append",
+        default=None,
+        metavar="GLOB",
+        help="Only scan files matching this glob (repeatable; default: *.py)",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="Skip files or directories matching this glob (repeatable, gitignore syntax)",
+    )
+    parser.add_argument(
+        "--no-gitignore",
+        action="store_true",
+        help="Do not apply .gitignore files found in the scanned tree",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=f"Time each phase, count bytes/AST nodes, record the {DEFAULT_SLOWEST} slowest parses and peak RSS, and write profile.json",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="With --profile: trace allocations (tracemalloc) for per-phase peaks and the top allocation sites (slower)",
+    )
+    parser.add_argument(
+        "--profile-cprofile",
+        action="store_true",
+        help="With --profile: also run cProfile over the phases and write profile.pstats",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="After the first run, keep the graph in memory, poll for file changes and rewrite only the affected outputs",
+    )
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        default=DEFAULT_INTERVAL,
+        help=f"Seconds between polls in --watch mode (default: {DEFAULT_INTERVAL})",
+    )
     
     args = parser.parse_args()
     
@@ -37,48 +160,105 @@ def main():
 
     print(f"Starting analysis on: {source_path}")
     start_time = time.time()
+    profiler = None
+    if args.profile or args.profile_memory or args.profile_cprofile:
+        profiler = Profiler(trace_memory=args.profile_memory, cprofile=args.profile_cprofile)
+
+    def phase(name: str):
+        return profiler.phase(name) if profiler is not None else contextlib.nullcontext()
 
     # 1. Initialize Graph
-    graph = CodeGraph()
+    graph_cls = CompactCodeGraph if args.compact_graph else CodeGraph
+    graph = graph_cls(track_call_sites=args.call_sites)
 
     # 2. Run Scanner
-    scanner = ProjectScanner(source_path, graph)
+    max_cache_bytes = int(args.ast_cache_mb * 1024 * 1024) if args.ast_cache_mb is not None else None
+    scan_cache = None
+    if args.incremental:
+        scan_cache = ScanCache(os.path.join(output_dir, CACHE_FILENAME), source_path)
+        scan_cache.load()
+    scanner = ProjectScanner(
+        source_path,
+        graph,
+        cache=SourceCache(max_bytes=max_cache_bytes),
+        jobs=args.jobs,
+        readers=args.readers,
+        scan_cache=scan_cache,
+        discovery=FileDiscovery(
+            source_path,
+            include=args.include or DEFAULT_INCLUDE,
+            exclude=args.exclude,
+            use_gitignore=not args.no_gitignore,
+        ),
+        live=args.watch,
+        profiler=profiler,
+    )
+    # Taken before the scan so edits made while it runs are picked up.
+    watcher = FileWatcher(scanner.discovery) if args.watch else None
     scanner.scan()
 
     scan_time = time.time()
     print(f"Scanning complete in {scan_time - start_time:.2f}s")
     print(f"Graph stats: {len(graph.nodes)} nodes, {len(graph.edges)} edges")
 
-    # 3. Generate Report
-    reporter = CodeReporter(graph)
-    markdown_report = reporter.generate_markdown()
+    metrics = GraphMetrics(graph, centrality_samples=args.centrality_samples or None)
+    json_indent = None if args.compact_json else 2
 
-    # 4. Write Outputs
-    print(f"Writing results to {output_dir}...")
-    
-    # entities.json
-    entities_data = [e.to_dict() for e in graph.nodes.values()]
-    with open(os.path.join(output_dir, "entities.json"), "w", encoding="utf-8") as f:
-        json.dump(entities_data, f, indent=2)
+    def write_outputs(facets: Optional[Set[str]] = None) -> None:
+        """Writes every output, or (in watch mode) those derived from ``facets``."""
+        graph_changed = facets is None or bool(facets - {"sources"})
+
+        # 3. Generate Report
+        if graph_changed:
+            with phase("report"):
+                markdown_report = CodeReporter(graph, metrics, centrality=args.centrality).generate_markdown()
 
-    # relationships.json
-    relations_data = [r.to_dict() for r in graph.edges]
-    with open(os.path.join(output_dir, "relationships.json"), "w", encoding="utf-8") as f:
-        json.dump(relations_data, f, indent=2)
+        # 4. Write Outputs
+        print(f"Writing results to {output_dir}...")
 
-    # summary.md
-    with open(os.path.join(output_dir, "summary.md"), "w", encoding="utf-8") as f:
-        f.write(markdown_report)
+        # entities / relationships / graph dumps, streamed record by record
+        if graph_changed:
+            with phase("json_output"):
+                write_graph_outputs(graph, output_dir, args.format, json_indent, args.compress)
+                if args.snapshot:
+                    graph.save_snapshot(os.path.join(output_dir, "graph.snapshot"))
 
-    # graph.json (Full Dump)
-    with open(os.path.join(output_dir, "graph.json"), "w", encoding="utf-8") as f:
-        json.dump(graph.to_json(), f, indent=2)
+                # summary.md
+                with open(os.path.join(output_dir, "summary.md"), "w", encoding="utf-8") as f:
+                    f.write(markdown_report)
 
-    # Extra AI-ready artifacts
-    if args.extra_artifacts:
-        ArtifactWriter(graph, source_path).write_all(output_dir)
+        # Extra AI-ready artifacts
+        if args.extra_artifacts:
+            with phase("artifacts"):
+                ArtifactWriter(
+                    graph,
+                    source_path,
+                    metrics,
+                    sources=scanner.cache,
+                    json_indent=json_indent,
+                    output_format=args.format,
+                    compression=args.compress,
+                    centrality=args.centrality,
+                ).write_all(output_dir, only=None if facets is None else affected_artifacts(facets))
 
+    write_outputs()
+    if profiler is not None:
+        profiler.count("graph_nodes", len(graph.nodes))
+        profiler.count("graph_edges", len(graph.edges))
+        profiler.count("parses", scanner.cache.parse_count)
+        print("\n".join(profiler.summary_lines()))
+        for path in profiler.write(output_dir):
+            print(f"Profile written to {path}")
+        # Watch-mode rewrites are not profiled.
+        profiler.close()
+        profiler = scanner.profiler = None
     print("Success!")
 
+    if args.watch:
+        try:
+            watch(scanner, write_outputs, interval=args.watch_interval, watcher=watcher)
+        except KeyboardInterrupt:
+            print("Stopped watching.")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
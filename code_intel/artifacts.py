@@ -6,7 +6,8 @@ This module converts the in-memory CodeGraph into a set of AI-ready artifacts:
 - domain_overview.md
 - entity_map.json
 - call_graph.json (+ optional call_graph.gexf if networkx installed)
-- dependency_report.md
+- dependency_report.md (+ import cycles / recursive call clusters)
+- cycles.json
 - business_rules.json (+ optional business_rules.md)
 - ai_context.json
 
@@ -16,35 +17,43 @@ All logic here is original and based on best-effort static analysis heuristics.
 from __future__ import annotations
 
 import ast
-import json
 import os
+import re
 from collections import Counter, defaultdict
 from dataclasses import dataclass
 from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
 from code_intel.graph import CodeGraph
-from code_intel.relations import REL_CALLS, REL_DEFINES, REL_IMPORTS, REL_INHERITS, Relationship
+from code_intel.metrics import GraphMetrics
+from code_intel.relations import REL_CALLS, REL_DEFINES, REL_IMPORTS, REL_TYPES
+from code_intel.serialize import open_output, output_path, write_json_object, write_ndjson
+from code_intel.sources import ParsedModule, SourceCache
 
 
-def _safe_read_text(path: str) -> str:
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            return f.read()
-    except Exception:
-        try:
-            with open(path, "r", encoding="utf-8", errors="ignore") as f:
-                return f.read()
-        except Exception:
-            return ""
+# Artifact -> what it is derived from: "entities", "sources" (file contents)
+# and relationship types. Watch mode only rewrites artifacts whose inputs changed.
+ARTIFACT_INPUTS: Dict[str, frozenset] = {
+    "domain_overview": frozenset({"entities", "sources"}),
+    "entity_map": frozenset({"entities", REL_DEFINES}),
+    "call_graph": frozenset({"entities", REL_CALLS}),
+    "dependency_report": frozenset({"entities", REL_IMPORTS, REL_CALLS}),
+    "cycles": frozenset({"entities", REL_IMPORTS, REL_CALLS}),
+    "business_rules": frozenset({"sources"}),
+    "ai_context": frozenset({"entities", *REL_TYPES}),
+}
+
 
+def affected_artifacts(facets: Iterable[str]) -> List[str]:
+    """Names of the artifacts that depend on any of ``facets``."""
+    facets = set(facets)
+    return [name for name, inputs in ARTIFACT_INPUTS.items() if inputs & facets]
 
-def _first_module_docstring(source: str) -> str:
-    try:
-        tree = ast.parse(source)
-        ds = ast.get_docstring(tree)
-        return (ds or "").strip()
-    except Exception:
+
+def _first_module_docstring(parsed: ParsedModule) -> str:
+    if parsed.tree is None:
         return ""
+    ds = ast.get_docstring(parsed.tree)
+    return (ds or "").strip()
 
 
 def _shorten(text: str, max_len: int = 240) -> str:
@@ -63,47 +72,6 @@ def _group_by_file(graph: CodeGraph) -> Dict[str, List[Dict[str, Any]]]:
     return dict(by_file)
 
 
-def _calls_adjacency(graph: CodeGraph) -> Dict[str, List[str]]:
-    adj: Dict[str, List[str]] = defaultdict(list)
-    for edge in graph.edges:
-        if edge.type == REL_CALLS:
-            adj[edge.source_id].append(edge.target_id)
-    # de-dup with stable-ish ordering
-    return {k: sorted(set(v)) for k, v in adj.items()}
-
-
-def _imports_adjacency(graph: CodeGraph) -> Dict[str, List[str]]:
-    adj: Dict[str, List[str]] = defaultdict(list)
-    for edge in graph.edges:
-        if edge.type == REL_IMPORTS and edge.target_id:
-            adj[edge.source_id].append(edge.target_id)
-    return {k: sorted(set(v)) for k, v in adj.items()}
-
-
-def _most_called(graph: CodeGraph, limit: int = 25) -> List[Tuple[str, int]]:
-    counts: Counter[str] = Counter()
-    for edge in graph.edges:
-        if edge.type == REL_CALLS:
-            counts[edge.target_id] += 1
-    return counts.most_common(limit)
-
-
-def _top_orchestrators(graph: CodeGraph, limit: int = 25) -> List[Tuple[str, int]]:
-    counts: Counter[str] = Counter()
-    for edge in graph.edges:
-        if edge.type == REL_CALLS:
-            counts[edge.source_id] += 1
-    return counts.most_common(limit)
-
-
-def _coupling_by_module(graph: CodeGraph, limit: int = 25) -> List[Tuple[str, int]]:
-    counts: Counter[str] = Counter()
-    for edge in graph.edges:
-        if edge.type == REL_IMPORTS and edge.target_id:
-            counts[edge.source_id] += 1
-    return counts.most_common(limit)
-
-
 def _entrypoints(graph: CodeGraph) -> List[Dict[str, Any]]:
     candidates: List[Dict[str, Any]] = []
     for ent in graph.nodes.values():
@@ -133,16 +101,33 @@ class BusinessRuleCandidate:
         }
 
 
-def _extract_business_rules_from_source(file_path: str, module_id: str) -> List[BusinessRuleCandidate]:
-    source = _safe_read_text(file_path)
-    if not source:
+def _source_segment(lines: List[str], node: ast.AST) -> Optional[str]:
+    """
+    ``ast.get_source_segment`` over pre-split lines. The stdlib version splits
+    the whole source on every call, which made rule extraction quadratic.
+    """
+    end_lineno = getattr(node, "end_lineno", None)
+    end_col_offset = getattr(node, "end_col_offset", None)
+    if end_lineno is None or end_col_offset is None or end_lineno > len(lines):
+        return None
+    lineno, end_lineno = node.lineno - 1, end_lineno - 1
+    col_offset = node.col_offset
+    if end_lineno == lineno:
+        return lines[lineno].encode()[col_offset:end_col_offset].decode()
+    first = lines[lineno].encode()[col_offset:].decode()
+    last = lines[end_lineno].encode()[:end_col_offset].decode()
+    return "".join([first] + lines[lineno + 1:end_lineno] + [last])
+
+
+def _extract_business_rules(parsed: ParsedModule, module_id: str) -> List[BusinessRuleCandidate]:
+    if parsed.tree is None:
         return []
+    file_path = parsed.file_path
+    tree = parsed.tree
+    # Same line splitting as ast.get_source_segment (\r\n, \r or \n only)
+    lines = re.findall(r"[^\r\n]*(?:\r\n|\r|\n)|[^\r\n]+\Z", parsed.text)
 
     rules: List[BusinessRuleCandidate] = []
-    try:
-        tree = ast.parse(source, filename=file_path)
-    except Exception:
-        return []
 
     keywords = (
         "must",
@@ -186,7 +171,7 @@ def _extract_business_rules_from_source(file_path: str, module_id: str) -> List[
         if isinstance(node, ast.Raise):
             # Common pattern: raise ValueError("...") or raise Exception("...")
             try:
-                evidence = ast.get_source_segment(source, node) or "raise …"
+                evidence = _source_segment(lines, node) or "raise …"
             except Exception:
                 evidence = "raise …"
             title = "Exception-based validation"
@@ -194,7 +179,7 @@ def _extract_business_rules_from_source(file_path: str, module_id: str) -> List[
 
         if isinstance(node, ast.Assert):
             try:
-                evidence = ast.get_source_segment(source, node) or "assert …"
+                evidence = _source_segment(lines, node) or "assert …"
             except Exception:
                 evidence = "assert …"
             title = "Assertion-based invariant"
@@ -208,19 +193,60 @@ def _extract_business_rules_from_source(file_path: str, module_id: str) -> List[
 
 
 class ArtifactWriter:
-    def __init__(self, graph: CodeGraph, source_root: str):
+    """
+    Writes the AI-ready artifacts for a scanned graph.
+
+    Pass the scanner's ``SourceCache`` as ``sources`` so module docstrings and
+    business-rule evidence come from the trees already parsed during the scan
+    (files the cache no longer holds are read and parsed once on demand).
+
+    With ``output_format="ndjson"`` call_graph.json and business_rules.json are
+    replaced by call_graph.ndjson (one CALLS edge per line) and
+    business_rules.ndjson (one candidate per line).
+    """
+    def __init__(
+        self,
+        graph: CodeGraph,
+        source_root: str,
+        metrics: Optional[GraphMetrics] = None,
+        sources: Optional[SourceCache] = None,
+        json_indent: Optional[int] = 2,
+        output_format: str = "json",
+        compression: Optional[str] = None,
+        centrality: bool = False,
+    ):
         self.graph = graph
         self.source_root = os.path.abspath(source_root)
-
-    def write_all(self, output_dir: str) -> None:
+        self.metrics = metrics if metrics is not None else GraphMetrics(graph)
+        self.sources = sources if sources is not None else SourceCache()
+        # None writes compact JSON
+        self.json_indent = json_indent
+        # With "ndjson" the record lists (call edges, business rules) are
+        # written one record per line, optionally compressed.
+        self.output_format = output_format
+        self.compression = compression
+        # Adds the PageRank/betweenness ranking to ai_context.json hotspots
+        self.centrality = centrality
+
+    def write_all(self, output_dir: str, only: Optional[Iterable[str]] = None) -> None:
+        """Writes every artifact, or just the ``only`` ones (names of ``ARTIFACT_INPUTS``)."""
         os.makedirs(output_dir, exist_ok=True)
-
-        self._write_domain_overview(os.path.join(output_dir, "domain_overview.md"))
-        self._write_entity_map(os.path.join(output_dir, "entity_map.json"))
-        self._write_call_graph(output_dir)
-        self._write_dependency_report(os.path.join(output_dir, "dependency_report.md"))
-        self._write_business_rules(output_dir)
-        self._write_ai_context(os.path.join(output_dir, "ai_context.json"))
+        selected = set(ARTIFACT_INPUTS) if only is None else set(only)
+
+        if "domain_overview" in selected:
+            self._write_domain_overview(os.path.join(output_dir, "domain_overview.md"))
+        if "entity_map" in selected:
+            self._write_entity_map(os.path.join(output_dir, "entity_map.json"))
+        if "call_graph" in selected:
+            self._write_call_graph(output_dir)
+        if "dependency_report" in selected:
+            self._write_dependency_report(os.path.join(output_dir, "dependency_report.md"))
+        if "cycles" in selected:
+            self._write_cycles(os.path.join(output_dir, "cycles.json"))
+        if "business_rules" in selected:
+            self._write_business_rules(output_dir)
+        if "ai_context" in selected:
+            self._write_ai_context(os.path.join(output_dir, "ai_context.json"))
 
     def _write_domain_overview(self, path: str) -> None:
         by_file = _group_by_file(self.graph)
@@ -234,8 +260,7 @@ class ArtifactWriter:
         # Summarize modules by file
         for file_path in sorted(by_file.keys()):
             rel = os.path.relpath(file_path, self.source_root)
-            source = _safe_read_text(file_path)
-            doc = _first_module_docstring(source)
+            doc = _first_module_docstring(self.sources.get(file_path))
 
             entities = by_file[file_path]
             counts = Counter(e["type"] for e in entities)
@@ -265,30 +290,34 @@ class ArtifactWriter:
     def _write_entity_map(self, path: str) -> None:
         by_file = _group_by_file(self.graph)
 
-        # Build class -> methods map from DEFINES edges
-        class_methods: Dict[str, List[str]] = defaultdict(list)
-        for edge in self.graph.edges:
-            if edge.type == REL_DEFINES:
-                class_methods[edge.source_id].append(edge.target_id)
-        class_methods = {k: sorted(set(v)) for k, v in class_methods.items()}
-
         entity_map = {
             "source_root": self.source_root,
             "by_file": by_file,
-            "class_methods": class_methods,
+            "class_methods": self.metrics.class_methods(),
         }
         with open(path, "w", encoding="utf-8") as f:
-            json.dump(entity_map, f, indent=2)
+            write_json_object(f, entity_map.items(), self.json_indent)
 
     def _write_call_graph(self, output_dir: str) -> None:
-        call_graph = {
-            "source_root": self.source_root,
-            "edges": [e.to_dict() for e in self.graph.edges if e.type == REL_CALLS],
-            "adjacency": _calls_adjacency(self.graph),
-        }
+        if self.output_format == "ndjson":
+            self._write_ndjson(
+                os.path.join(output_dir, "call_graph.ndjson"),
+                (e.to_dict() for e in self.graph.edges if e.type == REL_CALLS),
+            )
+            self._write_call_graph_gexf(output_dir)
+            return
+
+        call_graph = [
+            ("source_root", self.source_root),
+            ("edges", (e.to_dict() for e in self.graph.edges if e.type == REL_CALLS)),
+            ("adjacency", self.metrics.calls_adjacency()),
+        ]
         with open(os.path.join(output_dir, "call_graph.json"), "w", encoding="utf-8") as f:
-            json.dump(call_graph, f, indent=2)
+            write_json_object(f, call_graph, self.json_indent)
 
+        self._write_call_graph_gexf(output_dir)
+
+    def _write_call_graph_gexf(self, output_dir: str) -> None:
         # Optional GEXF export (nice for Gephi)
         try:
             import networkx as nx  # type: ignore
@@ -298,14 +327,14 @@ class ArtifactWriter:
                 g.add_node(ent.id, **{"type": ent.type, "name": ent.name, "file": ent.file_path})
             for edge in self.graph.edges:
                 if edge.type == REL_CALLS:
-                    g.add_edge(edge.source_id, edge.target_id, **{"type": edge.type})
+                    g.add_edge(edge.source_id, edge.target_id, **{"type": edge.type, "weight": edge.count})
             nx.write_gexf(g, os.path.join(output_dir, "call_graph.gexf"))
         except Exception:
             # If networkx is missing or export fails, keep JSON only.
             pass
 
     def _write_dependency_report(self, path: str) -> None:
-        imports_adj = _imports_adjacency(self.graph)
+        imports_adj = self.metrics.imports_adjacency()
 
         # fan-out and fan-in
         fan_out = {m: len(deps) for m, deps in imports_adj.items()}
@@ -328,6 +357,8 @@ class ArtifactWriter:
             lines.append(f"- {mod}: {count}")
         lines.append("")
 
+        lines.extend(self._cycle_section())
+
         lines.append("## Adjacency (imports)")
         for mod in sorted(imports_adj.keys()):
             deps = imports_adj[mod]
@@ -338,20 +369,76 @@ class ArtifactWriter:
         with open(path, "w", encoding="utf-8") as f:
             f.write("\n".join(lines))
 
+    def _cycle_section(self) -> List[str]:
+        imports = self.metrics.condensation(REL_IMPORTS)
+        calls = self.metrics.condensation(REL_CALLS)
+
+        lines: List[str] = ["## Import Cycles"]
+        import_cycles = imports.cycles()
+        if not import_cycles:
+            lines.append("- None")
+        for c in import_cycles[:20]:
+            lines.append(f"- {len(imports.members[c])} modules: {' -> '.join(imports.cycle_path(c))}")
+        if len(import_cycles) > 20:
+            lines.append(f"- … {len(import_cycles) - 20} more (see cycles.json)")
+        lines.append("")
+
+        lines.append("## Mutually Recursive Call Clusters")
+        call_cycles = calls.cycles()
+        if not call_cycles:
+            lines.append("- None")
+        for c in call_cycles[:20]:
+            members = calls.member_ids(c)
+            lines.append(f"- {len(members)} functions: {', '.join(members[:12])}{'…' if len(members) > 12 else ''}")
+        if len(call_cycles) > 20:
+            lines.append(f"- … {len(call_cycles) - 20} more (see cycles.json)")
+        lines.append("")
+
+        lines.append("## Import Layers (condensed import graph, layer 0 imports no other module)")
+        for depth, modules in enumerate(imports.layered()):
+            lines.append(f"- Layer {depth} ({len(modules)}): {', '.join(modules[:12])}{'…' if len(modules) > 12 else ''}")
+        lines.append("")
+        return lines
+
+    def _write_cycles(self, path: str) -> None:
+        sections = []
+        for key, rel_type in (("imports", REL_IMPORTS), ("calls", REL_CALLS)):
+            condensed = self.metrics.condensation(rel_type)
+            section: Dict[str, Any] = {
+                "components": len(condensed.members),
+                "layer_count": condensed.layer_count,
+                "cycles": [
+                    {"size": len(condensed.members[c]), "members": condensed.member_ids(c), "example": condensed.cycle_path(c)}
+                    for c in condensed.cycles()
+                ],
+            }
+            if rel_type == REL_IMPORTS:
+                section["layers"] = condensed.layered()
+            sections.append((key, section))
+
+        with open(path, "w", encoding="utf-8") as f:
+            write_json_object(f, [("source_root", self.source_root), *sections], self.json_indent)
+
     def _write_business_rules(self, output_dir: str) -> None:
         # Best-effort: scan module files we saw
         module_entities = [e for e in self.graph.nodes.values() if e.type == "module"]
         candidates: List[BusinessRuleCandidate] = []
         for mod in module_entities:
-            candidates.extend(_extract_business_rules_from_source(mod.file_path, mod.id))
+            candidates.extend(_extract_business_rules(self.sources.get(mod.file_path, mod.id), mod.id))
 
-        payload = {
-            "source_root": self.source_root,
-            "count": len(candidates),
-            "candidates": [c.to_dict() for c in candidates],
-        }
-        with open(os.path.join(output_dir, "business_rules.json"), "w", encoding="utf-8") as f:
-            json.dump(payload, f, indent=2)
+        if self.output_format == "ndjson":
+            self._write_ndjson(
+                os.path.join(output_dir, "business_rules.ndjson"),
+                (c.to_dict() for c in candidates),
+            )
+        else:
+            payload = [
+                ("source_root", self.source_root),
+                ("count", len(candidates)),
+                ("candidates", (c.to_dict() for c in candidates)),
+            ]
+            with open(os.path.join(output_dir, "business_rules.json"), "w", encoding="utf-8") as f:
+                write_json_object(f, payload, self.json_indent)
 
         # Also write a readable markdown
         lines: List[str] = ["# Business Rules (Heuristic)", ""]
@@ -372,13 +459,22 @@ class ArtifactWriter:
                 "total_edges": len(self.graph.edges),
             },
             "hotspots": {
-                "most_called": _most_called(self.graph, 25),
-                "top_orchestrators": _top_orchestrators(self.graph, 25),
-                "highest_coupling_modules": _coupling_by_module(self.graph, 25),
+                "most_called": self.metrics.most_called(25),
+                "top_orchestrators": self.metrics.top_orchestrators(25),
+                "highest_coupling_modules": self.metrics.highest_coupling(25),
             },
             "entrypoints": _entrypoints(self.graph),
-            "imports": _imports_adjacency(self.graph),
+            "imports": self.metrics.imports_adjacency(),
         }
+        if self.centrality:
+            context["hotspots"]["central_entities"] = [
+                {"id": entity_id, "pagerank": round(rank, 8), "betweenness": round(between, 8)}
+                for entity_id, rank, between in self.metrics.central_entities(25)
+            ]
 
         with open(path, "w", encoding="utf-8") as f:
-            json.dump(context, f, indent=2)
+            write_json_object(f, context.items(), self.json_indent)
+
+    def _write_ndjson(self, path: str, records: Iterable[Dict[str, Any]]) -> None:
+        with open_output(output_path(path, self.compression), self.compression) as f:
+            write_ndjson(f, records)
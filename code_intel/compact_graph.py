@@ -0,0 +1,324 @@
+"""code_intel.compact_graph
+
+Memory-compact CodeGraph backend for very large codebases.
+
+``CompactCodeGraph`` is a drop-in replacement for ``CodeGraph``:
+- entity IDs (and external edge targets such as imported stdlib modules) are
+  interned to ints once;
+- edges are stored column-wise in typed arrays (source, target, type code,
+  count) instead of one Relationship object referenced from three containers;
+- outgoing/incoming adjacency is built on ``freeze()`` as CSR offset arrays.
+
+``add_relationship`` only appends a row; there is no per-edge dict. Repeated
+edges are merged (counts summed, call-site lines concatenated, first
+occurrence keeps its position) by ``freeze()``, using a hash table that
+lives only for that pass. Removals tombstone rows, which the next
+``freeze()`` drops. Every read (``edges``, adjacency queries) freezes
+first, so readers only ever see merged, live edges. A freeze costs O(rows). Scans
+and watch-mode updates freeze once after each batch of changes.
+
+Relationship objects are only materialized on access (iterating ``edges``,
+``get_outgoing_edges``, ...), so existing consumers keep working unchanged.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Sequence
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from code_intel.entities import Entity
+from code_intel.graph import CodeGraph
+from code_intel.relations import REL_TYPES, Relationship
+
+# Type codes are stored in an array("B"), and packed into the low byte of merge keys.
+MAX_REL_TYPES = 256
+
+
+class EdgeView(Sequence):
+    """Read-only sequence of Relationship objects built on demand from the edge columns."""
+    def __init__(self, graph: "CompactCodeGraph"):
+        self._graph = graph
+
+    def __len__(self) -> int:
+        self._graph.freeze()
+        return len(self._graph._src)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._graph._edge(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("edge index out of range")
+        return self._graph._edge(index)
+
+    def __iter__(self) -> Iterator[Relationship]:
+        edge = self._graph._edge
+        for i in range(len(self)):
+            yield edge(i)
+
+
+class CompactCodeGraph(CodeGraph):
+    """
+    CodeGraph with interned IDs and array-backed edge storage.
+
+    Entities are kept as objects in ``nodes`` (same as CodeGraph); only the
+    edge storage and adjacency indexes differ.
+    """
+    def __init__(self, track_call_sites: bool = False):
+        # The list/dict edge containers of CodeGraph are deliberately not
+        # created; every method touching them is overridden below.
+        self.nodes: Dict[str, Entity] = {}
+        self._file_entities: Dict[str, Dict[str, None]] = {}
+        self.track_call_sites = track_call_sites
+        self.version = 0
+
+        # Interning: string ID <-> int
+        self._ids: Dict[str, int] = {}
+        self._strings: List[str] = []
+
+        # Relationship type <-> code
+        self._types: List[str] = list(REL_TYPES)
+        self._type_codes: Dict[str, int] = {t: i for i, t in enumerate(self._types)}
+
+        # Edge columns (one row per add_relationship until freeze() merges them)
+        self._src = array("i")
+        self._dst = array("i")
+        self._rel = array("B")
+        self._count = array("i")
+        # row -> call-site lines (only with track_call_sites)
+        self._lines: Dict[int, array] = {}
+        # Rows appended since the last merge
+        self._unmerged = False
+        # Tombstones (row -> 1) since the last merge; None when there are none
+        self._dead: Optional[bytearray] = None
+
+        # CSR adjacency (edge rows grouped by source / target), built by freeze()
+        self._out_offsets: Optional[array] = None
+        self._out_index: Optional[array] = None
+        self._in_offsets: Optional[array] = None
+        self._in_index: Optional[array] = None
+        self._indexed = False
+
+    @property
+    def edges(self) -> EdgeView:
+        return EdgeView(self)
+
+    def intern(self, value: str) -> int:
+        """Returns the int ID for a string ID, assigning one if needed."""
+        idx = self._ids.get(value)
+        if idx is None:
+            idx = len(self._strings)
+            self._ids[value] = idx
+            self._strings.append(value)
+        return idx
+
+    def add_relationship(self, rel: Relationship):
+        """Adds a relationship; identical edges are merged by the next ``freeze()``."""
+        self.version += 1
+        code = self._type_codes.get(rel.type)
+        if code is None:
+            code = len(self._types)
+            if code >= MAX_REL_TYPES:
+                raise ValueError(
+                    f"CompactCodeGraph supports at most {MAX_REL_TYPES} relationship types; cannot add {rel.type!r}"
+                )
+            self._types.append(rel.type)
+            self._type_codes[rel.type] = code
+
+        row = len(self._src)
+        self._src.append(self.intern(rel.source_id))
+        self._dst.append(self.intern(rel.target_id))
+        self._rel.append(code)
+        self._count.append(rel.count)
+        if self._dead is not None:
+            self._dead.append(0)
+        if self.track_call_sites and rel.lines:
+            self._lines[row] = array("i", rel.lines)
+        self._unmerged = True
+        self._indexed = False
+
+    def remove_file(self, file_path: str) -> List[Entity]:
+        """
+        Retracts a file's contribution: its entities and every edge whose
+        source is one of them. Returns the removed entities.
+        """
+        entity_ids = self._file_entities.pop(file_path, None)
+        if not entity_ids:
+            return []
+        removed = [self.nodes.pop(entity_id) for entity_id in entity_ids]
+        self._kill(row for entity_id in entity_ids for row in self._live_rows(entity_id, outgoing=True))
+        self.version += 1
+        return removed
+
+    def remove_entity(self, entity_id: str) -> Optional[Entity]:
+        """Removes an entity together with all its incoming and outgoing edges."""
+        entity = self.nodes.pop(entity_id, None)
+        if entity is None:
+            return None
+        self._disown(entity)
+        rows = self._live_rows(entity_id, outgoing=True) + self._live_rows(entity_id, outgoing=False)
+        self._kill(rows)
+        self.version += 1
+        return entity
+
+    def remove_edges(
+        self,
+        source_id: Optional[str] = None,
+        target_id: Optional[str] = None,
+        type: Optional[str] = None,
+    ) -> List[Relationship]:
+        """Removes every edge matching the given filters and returns them."""
+        if source_id is not None:
+            candidates = self._live_rows(source_id, outgoing=True)
+        elif target_id is not None:
+            candidates = self._live_rows(target_id, outgoing=False)
+        else:
+            self._ensure_index()
+            candidates = [row for row in range(len(self._src)) if not self._is_dead(row)]
+        target = self._ids.get(target_id) if target_id is not None else None
+        code = self._type_codes.get(type) if type is not None else None
+        if (target_id is not None and target is None) or (type is not None and code is None):
+            return []
+        matched = [
+            row for row in candidates
+            if (target is None or self._dst[row] == target) and (code is None or self._rel[row] == code)
+        ]
+        removed = [self._edge(row) for row in matched]
+        self._kill(matched)
+        if matched:
+            self.version += 1
+        return removed
+
+    def remove_edge(self, source_id: str, target_id: str, rel_type: str) -> Optional[Relationship]:
+        """Removes the (source, target, type) edge, whatever its count; returns it if present."""
+        removed = self.remove_edges(source_id, target_id, rel_type)
+        return removed[0] if removed else None
+
+    def freeze(self) -> None:
+        """
+        Merges repeated edges, drops removed ones and builds the CSR
+        outgoing/incoming indexes. Called automatically by every read; a no-op
+        when nothing changed.
+        """
+        if self._unmerged or self._dead is not None:
+            self._merge()
+        if not self._indexed:
+            self._build_index()
+
+    def get_outgoing_edges(self, source_id: str) -> List[Relationship]:
+        """Returns all relationships starting from the given source ID."""
+        return self._adjacent(source_id, outgoing=True)
+
+    def get_incoming_edges(self, target_id: str) -> List[Relationship]:
+        """Returns all relationships pointing to the given target ID."""
+        return self._adjacent(target_id, outgoing=False)
+
+    def _adjacent(self, entity_id: str, outgoing: bool) -> List[Relationship]:
+        idx = self._ids.get(entity_id)
+        if idx is None:
+            return []
+        self.freeze()
+        offsets, index = (self._out_offsets, self._out_index) if outgoing else (self._in_offsets, self._in_index)
+        return [self._edge(e) for e in index[offsets[idx]:offsets[idx + 1]]]
+
+    def _ensure_index(self) -> None:
+        """
+        Merged rows and a current CSR index, for removals. Tombstones alone do
+        not invalidate the index (dead rows are skipped), so a series of
+        removals merges at most once.
+        """
+        if self._unmerged:
+            self._merge()
+        if not self._indexed:
+            self._build_index()
+
+    def _live_rows(self, entity_id: str, outgoing: bool) -> List[int]:
+        idx = self._ids.get(entity_id)
+        if idx is None:
+            return []
+        self._ensure_index()
+        offsets, index = (self._out_offsets, self._out_index) if outgoing else (self._in_offsets, self._in_index)
+        return [row for row in index[offsets[idx]:offsets[idx + 1]] if not self._is_dead(row)]
+
+    def _is_dead(self, row: int) -> bool:
+        return self._dead is not None and self._dead[row] == 1
+
+    def _kill(self, rows: Iterable[int]) -> None:
+        for row in rows:
+            if self._dead is None:
+                self._dead = bytearray(len(self._src))
+            self._dead[row] = 1
+
+    def _merge(self) -> None:
+        """
+        Rewrites the columns with one live row per (source, target, type), in
+        order of first occurrence. The key -> row table only lives for this pass.
+        """
+        src, dst, rel, count = self._src, self._dst, self._rel, self._count
+        dead, lines = self._dead, self._lines
+        new_src, new_dst, new_rel, new_count = array("i"), array("i"), array("B"), array("i")
+        new_lines: Dict[int, array] = {}
+        first: Dict[int, int] = {}
+        for row in range(len(src)):
+            if dead is not None and dead[row]:
+                continue
+            key = (((src[row] << 32) | dst[row]) << 8) | rel[row]
+            merged = first.get(key)
+            if merged is None:
+                merged = first[key] = len(new_src)
+                new_src.append(src[row])
+                new_dst.append(dst[row])
+                new_rel.append(rel[row])
+                new_count.append(count[row])
+            else:
+                new_count[merged] += count[row]
+            row_lines = lines.get(row)
+            if row_lines is not None:
+                existing = new_lines.get(merged)
+                if existing is None:
+                    new_lines[merged] = row_lines
+                else:
+                    existing.extend(row_lines)
+        self._src, self._dst, self._rel, self._count = new_src, new_dst, new_rel, new_count
+        self._lines = new_lines
+        self._dead = None
+        self._unmerged = False
+        self._indexed = False
+
+    def _build_index(self) -> None:
+        n = len(self._strings)
+        self._out_offsets, self._out_index = build_csr(self._src, n)
+        self._in_offsets, self._in_index = build_csr(self._dst, n)
+        self._indexed = True
+
+    def _edge(self, i: int) -> Relationship:
+        strings = self._strings
+        lines = self._lines.get(i) if self.track_call_sites else None
+        return Relationship(
+            strings[self._src[i]],
+            strings[self._dst[i]],
+            self._types[self._rel[i]],
+            self._count[i],
+            lines.tolist() if lines is not None else None,
+        )
+
+
+def build_csr(keys: array, n: int) -> Tuple[array, array]:
+    """
+    Counting sort of edge indices by key. Returns (offsets, index) where the
+    edges of key k are index[offsets[k]:offsets[k + 1]], in insertion order.
+    """
+    offsets = array("i", [0]) * (n + 1)
+    for k in keys:
+        offsets[k + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+
+    cursor = array("i", offsets)
+    index = array("i", [0]) * len(keys)
+    for edge_id, k in enumerate(keys):
+        index[cursor[k]] = edge_id
+        cursor[k] += 1
+    return offsets, index
@@ -0,0 +1,249 @@
+"""code_intel.cycles
+
+Strongly connected components (import cycles, mutually recursive calls) and
+the condensed dependency DAG.
+
+``condense`` restricts the graph to entities and the chosen relationship
+types, numbers the nodes and builds a CSR adjacency (``build_csr``). It then
+runs Tarjan's algorithm. The DFS is iterative, with an explicit call stack
+and a per-node edge cursor, so deep graphs cannot hit the recursion limit.
+Everything is linear in nodes + edges.
+
+Tarjan emits each component after every component it can reach, so
+component numbers are already a reverse topological order of the condensed
+DAG. Layers come from one more pass in that order: a component sits one
+layer above its highest dependency, and layer 0 holds what depends on
+nothing.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from code_intel.compact_graph import build_csr
+from code_intel.graph import CodeGraph
+from code_intel.relations import REL_IMPORTS
+from code_intel.symbols import INIT_SUFFIX
+
+
+def strongly_connected_components(offsets: array, targets: array) -> Tuple[array, int]:
+    """
+    Iterative Tarjan over a CSR graph (successors of ``v`` are
+    ``targets[offsets[v]:offsets[v + 1]]``).
+
+    Returns (component of each node, number of components). Components are
+    numbered in reverse topological order: edges only go from higher to
+    lower (or equal) component numbers.
+    """
+    n = len(offsets) - 1
+    index = array("i", [-1]) * n
+    low = array("i", [0]) * n
+    component = array("i", [-1]) * n
+    on_stack = bytearray(n)
+    # Next outgoing edge to explore, per node
+    cursor = array("i", offsets)
+    stack: List[int] = []
+    counter = 0
+    count = 0
+
+    for root in range(n):
+        if index[root] != -1:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        calls = [root]
+        while calls:
+            v = calls[-1]
+            p, end = cursor[v], offsets[v + 1]
+            while p < end:
+                w = targets[p]
+                p += 1
+                if index[w] == -1:
+                    break
+                if on_stack[w] and index[w] < low[v]:
+                    low[v] = index[w]
+            else:
+                w = -1
+            cursor[v] = p
+            if w != -1:
+                # Descend into w; v resumes from the saved cursor afterwards.
+                index[w] = low[w] = counter
+                counter += 1
+                stack.append(w)
+                on_stack[w] = 1
+                calls.append(w)
+                continue
+
+            calls.pop()
+            if calls and low[v] < low[calls[-1]]:
+                low[calls[-1]] = low[v]
+            if low[v] == index[v]:
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = 0
+                    component[w] = count
+                    if w == v:
+                        break
+                count += 1
+    return component, count
+
+
+@dataclass
+class Condensation:
+    """
+    SCCs of one relationship type and the DAG between them.
+
+    Attributes:
+        rel_types (Tuple[str, ...]): Relationship types the graph was restricted to.
+        nodes (List[str]): Node number -> entity ID.
+        component (array): Node number -> component number (reverse topological order).
+        members (List[List[int]]): Component number -> its node numbers.
+        dag_offsets (array): CSR offsets of the condensed DAG (component -> dependencies).
+        dag_targets (array): CSR targets of the condensed DAG.
+        layers (array): Component number -> layer (0: depends on nothing).
+        offsets (array): CSR offsets of the restricted graph.
+        targets (array): CSR targets of the restricted graph.
+    """
+    rel_types: Tuple[str, ...]
+    nodes: List[str]
+    component: array
+    members: List[List[int]]
+    dag_offsets: array
+    dag_targets: array
+    layers: array
+    offsets: array
+    targets: array
+
+    @property
+    def layer_count(self) -> int:
+        return max(self.layers) + 1 if len(self.layers) else 0
+
+    def cycles(self) -> List[int]:
+        """Numbers of the components with more than one member, largest first."""
+        found = [c for c, nodes in enumerate(self.members) if len(nodes) > 1]
+        found.sort(key=lambda c: (-len(self.members[c]), min(self.nodes[v] for v in self.members[c])))
+        return found
+
+    def member_ids(self, c: int) -> List[str]:
+        """Sorted entity IDs of component ``c``."""
+        return sorted(self.nodes[v] for v in self.members[c])
+
+    def layered(self) -> List[List[str]]:
+        """Entity IDs per layer (sorted), from the bottom layer up."""
+        by_layer: List[List[str]] = [[] for _ in range(self.layer_count)]
+        for c, nodes in enumerate(self.members):
+            by_layer[self.layers[c]].extend(self.nodes[v] for v in nodes)
+        for ids in by_layer:
+            ids.sort()
+        return by_layer
+
+    def cycle_path(self, c: int) -> List[str]:
+        """
+        A shortest cycle through the first (by ID) member of component ``c``,
+        staying inside it: ``[a, b, ..., a]``.
+        """
+        start = min(self.members[c], key=self.nodes.__getitem__)
+        parent: Dict[int, int] = {}
+        queue = deque([start])
+        while queue:
+            u = queue.popleft()
+            for w in self.targets[self.offsets[u]:self.offsets[u + 1]]:
+                if self.component[w] != c:
+                    continue
+                if w == start:
+                    path = [u]
+                    while path[-1] != start:
+                        path.append(parent[path[-1]])
+                    path.reverse()
+                    return [self.nodes[v] for v in path] + [self.nodes[start]]
+                if w not in parent:
+                    parent[w] = u
+                    queue.append(w)
+        return [self.nodes[start]]
+
+
+def condense(
+    graph: CodeGraph,
+    rel_types: Iterable[str] = (REL_IMPORTS,),
+    entity_types: Iterable[str] = (),
+) -> Condensation:
+    """
+    SCCs and layered condensation of ``graph`` restricted to ``rel_types``
+    edges between known entities. Edges to external names are ignored; an
+    import of a package (``pkg``) counts as an edge to ``pkg.__init__``.
+
+    Entities of ``entity_types`` are included even without such edges (e.g.
+    "module", so every module gets a layer); other nodes only if they have one.
+    """
+    rel_types = tuple(rel_types)
+    wanted = set(rel_types)
+    nodes = graph.nodes
+    ids: Dict[str, int] = {}
+    names: List[str] = []
+    src, dst = array("i"), array("i")
+
+    def number(entity_id: str) -> int:
+        idx = ids.get(entity_id)
+        if idx is None:
+            idx = ids[entity_id] = len(names)
+            names.append(entity_id)
+        return idx
+
+    kinds = set(entity_types)
+    if kinds:
+        for entity in nodes.values():
+            if entity.type in kinds:
+                number(entity.id)
+    for edge in graph.edges:
+        if edge.type not in wanted:
+            continue
+        target = _entity_target(nodes, edge.target_id, edge.type)
+        if target is None:
+            continue
+        src.append(number(edge.source_id))
+        dst.append(number(target))
+
+    n = len(names)
+    offsets, order = build_csr(src, n)
+    targets = array("i", map(dst.__getitem__, order))
+    component, count = strongly_connected_components(offsets, targets)
+
+    members: List[List[int]] = [[] for _ in range(count)]
+    for v in range(n):
+        members[component[v]].append(v)
+
+    # Condensed DAG: distinct component edges, grouped by source component.
+    seen = set()
+    dag_src, dag_dst = array("i"), array("i")
+    for u in range(n):
+        cu = component[u]
+        for v in targets[offsets[u]:offsets[u + 1]]:
+            cv = component[v]
+            if cu != cv and (cu, cv) not in seen:
+                seen.add((cu, cv))
+                dag_src.append(cu)
+                dag_dst.append(cv)
+    dag_offsets, order = build_csr(dag_src, count)
+    dag_targets = array("i", map(dag_dst.__getitem__, order))
+
+    # Dependencies have lower component numbers, so one ascending pass suffices.
+    layers = array("i", [0]) * count
+    for c in range(count):
+        deps = dag_targets[dag_offsets[c]:dag_offsets[c + 1]]
+        if deps:
+            layers[c] = max(layers[d] for d in deps) + 1
+
+    return Condensation(rel_types, names, component, members, dag_offsets, dag_targets, layers, offsets, targets)
+
+
+def _entity_target(nodes, target_id: str, rel_type: str) -> Optional[str]:
+    if target_id in nodes:
+        return target_id
+    if rel_type == REL_IMPORTS and target_id + INIT_SUFFIX in nodes:
+        return target_id + INIT_SUFFIX
+    return None
@@ -0,0 +1,279 @@
+"""code_intel.discovery
+
+Source file discovery shared by ``ProjectScanner`` and ``LocalScanner``.
+
+The walk is built on ``os.scandir`` (one syscall per directory, file types
+come from the directory entry) and prunes directories before descending:
+
+- well-known noise directories (``.git``, ``node_modules``, virtualenvs,
+  ``__pycache__``, ``build``/``dist``, ``site-packages``, ...);
+- ``.gitignore`` patterns, including nested ``.gitignore`` files, negation
+  (``!pattern``), directory-only (``dir/``), anchored (``/pattern``) and
+  ``**`` patterns;
+- user ``exclude`` globs. ``include`` globs select which files are yielded.
+
+Entries are visited in sorted name order, so the output is deterministic
+across platforms and file systems. ``iter_files`` is a generator: consumers
+can start working on the first files before the walk has finished.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Pattern, Sequence, Tuple
+
+DEFAULT_INCLUDE: Tuple[str, ...] = ("*.py",)
+
+# Directory names that are never scanned (matched on the name alone).
+DEFAULT_EXCLUDE_DIRS = frozenset({
+    ".git", ".hg", ".svn",
+    "node_modules",
+    "venv", ".venv",
+    "__pycache__", ".mypy_cache", ".pytest_cache",
+    "build", "dist", ".eggs",
+    ".tox", ".nox",
+    "site-packages",
+})
+
+GITIGNORE = ".gitignore"
+
+
+@dataclass
+class IgnoreRule:
+    """
+    One compiled ``.gitignore``-style pattern.
+
+    Attributes:
+        base (str): Root-relative directory of the ignore file ("" for the root).
+        regex (Pattern[str]): Matches a path relative to ``base``.
+        negate (bool): ``!pattern``: re-includes a previously ignored path.
+        dir_only (bool): ``pattern/``: only matches directories.
+    """
+    base: str
+    regex: Pattern[str]
+    negate: bool = False
+    dir_only: bool = False
+
+    def matches(self, rel_path: str, is_dir: bool) -> bool:
+        if self.dir_only and not is_dir:
+            return False
+        if self.base:
+            if not rel_path.startswith(self.base + "/"):
+                return False
+            rel_path = rel_path[len(self.base) + 1:]
+        return self.regex.match(rel_path) is not None
+
+
+def compile_pattern(pattern: str, base: str = "") -> Optional[IgnoreRule]:
+    """
+    Compiles one gitignore line; returns None for blanks and comments.
+
+    As in git, a pattern without a slash (other than a trailing one) matches
+    the name at any depth; otherwise it is anchored to ``base``.
+    """
+    pattern = pattern.rstrip("\n").rstrip("\r")
+    if not pattern.strip() or pattern.startswith("#"):
+        return None
+    if not pattern.endswith("\\ "):
+        pattern = pattern.rstrip()
+
+    negate = pattern.startswith("!")
+    if negate:
+        pattern = pattern[1:]
+    elif pattern.startswith("\\"):
+        pattern = pattern[1:]
+
+    dir_only = pattern.endswith("/")
+    pattern = pattern.rstrip("/")
+    if not pattern:
+        return None
+
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+    body = _glob_to_regex(pattern)
+    regex = body if anchored else "(?:.*/)?" + body
+    return IgnoreRule(base, re.compile(regex + r"\Z", re.DOTALL), negate, dir_only)
+
+
+def _glob_to_regex(pattern: str) -> str:
+    """Translates a gitwildmatch glob (``*``, ``?``, ``[...]``, ``**``) to a regex."""
+    out: List[str] = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**", i):
+                at_start = i == 0 or pattern[i - 1] == "/"
+                at_end = i + 2 == n or pattern[i + 2] == "/"
+                if at_start and at_end:
+                    if i + 2 == n:
+                        out.append(".*")  # "dir/**": everything inside
+                        i += 2
+                    else:
+                        out.append("(?:.*/)?")  # "**/x" or "a/**/x": zero or more dirs
+                        i += 3
+                    continue
+            out.append("[^/]*")
+            while i < n and pattern[i] == "*":
+                i += 1
+            continue
+        if c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = pattern.find("]", i + 2 if pattern.startswith("[!", i) or pattern.startswith("[^", i) else i + 1)
+            if j < 0:
+                out.append(re.escape(c))
+            else:
+                inner = pattern[i + 1:j]
+                if inner[:1] in ("!", "^"):
+                    inner = "^" + inner[1:]
+                out.append("[" + inner.replace("\\", "\\\\") + "]")
+                i = j
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def read_ignore_file(path: str, base: str = "") -> List[IgnoreRule]:
+    """Compiles the rules of one ``.gitignore`` file (missing file -> no rules)."""
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            lines = f.readlines()
+    except OSError:
+        return []
+    return [rule for rule in (compile_pattern(line, base) for line in lines) if rule is not None]
+
+
+def is_ignored(rules: Sequence[IgnoreRule], rel_path: str, is_dir: bool) -> bool:
+    """Applies ``rules`` in order; the last matching rule decides."""
+    ignored = False
+    for rule in rules:
+        if rule.negate == ignored and rule.matches(rel_path, is_dir):
+            ignored = not rule.negate
+    return ignored
+
+
+class FileDiscovery:
+    """
+    Walks a source tree and yields the files to analyze.
+
+    Args:
+        root_path (str): Directory to walk.
+        include (Sequence[str]): Globs a file must match (any of) to be yielded.
+        exclude (Sequence[str]): Globs for files or directories to skip.
+        use_gitignore (bool): Honour ``.gitignore`` files found during the walk.
+        exclude_dirs (Iterable[str]): Directory names that are always pruned.
+    """
+    def __init__(
+        self,
+        root_path: str,
+        include: Sequence[str] = DEFAULT_INCLUDE,
+        exclude: Sequence[str] = (),
+        use_gitignore: bool = True,
+        exclude_dirs: Iterable[str] = DEFAULT_EXCLUDE_DIRS,
+    ):
+        self.root_path = os.path.abspath(root_path)
+        self.use_gitignore = use_gitignore
+        self.exclude_dirs = frozenset(exclude_dirs)
+        self._include = [compile_pattern(p) for p in include]
+        self._exclude = [compile_pattern(p) for p in exclude]
+
+    def find_files(self) -> List[str]:
+        """All matching files, in walk order."""
+        return list(self.iter_files())
+
+    def iter_files(self) -> Iterator[str]:
+        """Lazily yields absolute paths of matching files, sorted by path components."""
+        root_rules = self._load_rules(self.root_path, "", [])
+        stack: List[Iterator[Tuple[os.DirEntry, str, List[IgnoreRule]]]] = [
+            self._entries(self.root_path, "", root_rules)
+        ]
+        while stack:
+            item = next(stack[-1], None)
+            if item is None:
+                stack.pop()
+                continue
+            entry, rel_path, rules = item
+            kind = self._classify(entry, rel_path, rules)
+            if kind == "dir":
+                dir_rules = self._load_rules(entry.path, rel_path, rules)
+                stack.append(self._entries(entry.path, rel_path, dir_rules))
+            elif kind == "file":
+                yield entry.path
+
+    def dir_rules(self, path: str, rel_path: str, inherited: List[IgnoreRule]) -> List[IgnoreRule]:
+        """Ignore rules that apply inside ``path``: ``inherited`` plus its own ``.gitignore``."""
+        return self._load_rules(path, rel_path, inherited)
+
+    def list_dir(self, path: str, rel_path: str, rules: List[IgnoreRule]) -> Tuple[List[str], List[Tuple[str, str]]]:
+        """
+        One level of the walk: the matching files directly in ``path`` and the
+        (path, rel_path) of the subdirectories to descend into. ``rules`` are
+        the ones that apply inside ``path`` (see ``dir_rules``).
+        """
+        files: List[str] = []
+        subdirs: List[Tuple[str, str]] = []
+        for entry, entry_rel, _ in self._entries(path, rel_path, rules):
+            kind = self._classify(entry, entry_rel, rules)
+            if kind == "dir":
+                subdirs.append((entry.path, entry_rel))
+            elif kind == "file":
+                files.append(entry.path)
+        return files, subdirs
+
+    def _classify(self, entry: os.DirEntry, rel_path: str, rules: List[IgnoreRule]) -> Optional[str]:
+        """"dir" for a directory to descend into, "file" for a matching file, else None."""
+        try:
+            is_dir = entry.is_dir(follow_symlinks=False)
+        except OSError:
+            return None
+
+        if is_dir:
+            if entry.name in self.exclude_dirs or self._skipped(rules, rel_path, True):
+                return None
+            return "dir"
+
+        if self._skipped(rules, rel_path, False):
+            return None
+        if not any(rule.matches(rel_path, False) for rule in self._include if rule is not None):
+            return None
+        try:
+            if not entry.is_file():
+                return None
+        except OSError:
+            return None
+        return "file"
+
+    def _entries(
+        self, path: str, rel_path: str, rules: List[IgnoreRule]
+    ) -> Iterator[Tuple[os.DirEntry, str, List[IgnoreRule]]]:
+        try:
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            return
+        prefix = rel_path + "/" if rel_path else ""
+        for entry in entries:
+            yield entry, prefix + entry.name, rules
+
+    def _skipped(self, rules: List[IgnoreRule], rel_path: str, is_dir: bool) -> bool:
+        if any(rule is not None and rule.matches(rel_path, is_dir) for rule in self._exclude):
+            return True
+        return bool(rules) and is_ignored(rules, rel_path, is_dir)
+
+    def _load_rules(self, path: str, rel_path: str, inherited: List[IgnoreRule]) -> List[IgnoreRule]:
+        if not self.use_gitignore:
+            return inherited
+        own = read_ignore_file(os.path.join(path, GITIGNORE), rel_path)
+        return inherited + own if own else inherited
+
+
+def discover_files(root_path: str, **options) -> List[str]:
+    """Shortcut for ``FileDiscovery(root_path, **options).find_files()``."""
+    return FileDiscovery(root_path, **options).find_files()
@@ -1,29 +1,130 @@
 # Migrated from AI-modernization-tool/embedder.py
-# Placeholder: implement BGEEmbedder class here based on original logic
+#
+# BGEEmbedder talks to the Gemini embedding API. embed() embeds one text;
+# embed_batch() groups texts into batch requests sent concurrently over a
+# pooled requests.Session, retrying 429/5xx responses with backoff.
 
 
 import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 load_dotenv()
 
+DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+EMBEDDING_DIM = 768
+# Statuses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
 class BGEEmbedder:
-    def __init__(self, api_key=None):
+    def __init__(
+        self,
+        api_key=None,
+        model="embedding-001",
+        base_url=None,
+        batch_size=100,
+        max_workers=4,
+        max_retries=5,
+        backoff=0.5,
+        timeout=60.0,
+    ):
         # Prefer GOOGLE_API_KEY from .env, fallback to GEMINI_API_KEY
         self.api_key = api_key or os.environ.get("GOOGLE_API_KEY") or os.environ.get("GEMINI_API_KEY")
-        self.api_url = "https://generativelanguage.googleapis.com/v1beta/models/embedding-001:embedText"
+        # Part of the embedding cache key: vectors of different models never mix.
+        self.model = model
+        # EMBEDDING_API_URL points the client at a proxy or a local stand-in server.
+        self.base_url = (base_url or os.environ.get("EMBEDDING_API_URL") or DEFAULT_BASE_URL).rstrip("/")
+        self.api_url = f"{self.base_url}/models/{model}:embedText"
+        self.batch_url = f"{self.base_url}/models/{model}:batchEmbedText"
+        self.batch_size = max(1, batch_size)
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+        # One keep-alive connection per worker thread, reused across requests.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
     def embed(self, text):
+        result = self._post(self.api_url, {"text": text})
+        if result is None:
+            return [0.0] * EMBEDDING_DIM
+        # Gemini returns embeddings under 'embedding' key
+        return _vector(result.get("embedding")) or [0.0] * EMBEDDING_DIM
+
+    def embed_batch(self, texts):
+        """
+        Embeddings of ``texts``, in order. Texts are sent in batches of
+        ``batch_size``, up to ``max_workers`` batches at a time. A batch that
+        still fails after the retries yields zero vectors, as ``embed`` does.
+        """
+        texts = list(texts)
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if not batches:
+            return []
+        if len(batches) == 1 or self.max_workers == 1:
+            results = map(self._embed_one_batch, batches)
+            return [vector for batch in results for vector in batch]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as pool:
+            # map() yields in submission order, whatever order batches finish in.
+            return [vector for batch in pool.map(self._embed_one_batch, batches) for vector in batch]
+
+    def close(self):
+        self.session.close()
+
+    def _embed_one_batch(self, texts):
+        result = self._post(self.batch_url, {"texts": texts})
+        embeddings = result.get("embeddings") if result is not None else None
+        if not embeddings or len(embeddings) != len(texts):
+            if result is not None:
+                print(f"Gemini API error: expected {len(texts)} embeddings, got {len(embeddings or [])}")
+            return [[0.0] * EMBEDDING_DIM for _ in texts]
+        return [_vector(item) or [0.0] * EMBEDDING_DIM for item in embeddings]
+
+    def _post(self, url, payload):
+        """POSTs ``payload``; returns the JSON body, or None once retries are exhausted."""
         if not self.api_key:
             raise ValueError("GEMINI_API_KEY not set in environment or passed to BGEEmbedder.")
         headers = {"Content-Type": "application/json"}
         params = {"key": self.api_key}
-        data = {"text": text}
-        response = requests.post(self.api_url, headers=headers, params=params, json=data)
-        if response.status_code == 200:
-            result = response.json()
-            # Gemini returns embeddings under 'embedding' key
-            return result.get("embedding", [0.0] * 768)
-        else:
-            print(f"Gemini API error: {response.status_code} {response.text}")
-            return [0.0] * 768
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.post(url, headers=headers, params=params, json=payload, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    print(f"Gemini API error: {e}")
+                    return None
+                time.sleep(self._delay(attempt))
+                continue
+            if response.status_code == 200:
+                return response.json()
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                print(f"Gemini API error: {response.status_code} {response.text}")
+                return None
+            time.sleep(self._delay(attempt, response.headers.get("Retry-After")))
+        return None
+
+    def _delay(self, attempt, retry_after=None):
+        """Exponential backoff with jitter; a numeric Retry-After header wins."""
+        if retry_after is not None:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass
+        return self.backoff * (2 ** attempt) * (0.5 + random.random() / 2)
+
+
+def _vector(item):
+    # embedText: {"embedding": {"value": [...]}}; batch items: {"value": [...]}
+    # (embedContent-style responses use "values").
+    if isinstance(item, dict):
+        return item.get("value") or item.get("values")
+    return item
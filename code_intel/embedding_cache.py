@@ -0,0 +1,174 @@
+"""code_intel.embedding_cache
+
+Persistent, size-bounded cache of text embeddings.
+
+Embedding requests dominate the cost of the modernization pipeline, and the
+same chunks are embedded again on every run. ``EmbeddingCache`` stores each
+vector in SQLite (stdlib ``sqlite3``), keyed by model name and the SHA-256 of
+the text, so an unchanged repository needs no embedding requests at all and a
+changed one only for the chunks whose text changed.
+
+Vectors are stored as float32 blobs. Entries carry a logical "last used"
+clock; once the cache holds more than ``max_entries``, the least recently
+used entries are deleted (LRU). Lookups and inserts work on whole batches,
+with one transaction per batch.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import sys
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+CACHE_FILENAME = ".embedding_cache.sqlite"
+DEFAULT_MAX_ENTRIES = 200_000
+# SQLite's default limit on host parameters per statement is 999.
+_BATCH = 900
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    dim INTEGER NOT NULL,
+    vector BLOB NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (model, digest)
+);
+CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used);
+"""
+
+
+def text_digest(text: str) -> str:
+    """SHA-256 (hex) of the UTF-8 text."""
+    return hashlib.sha256(text.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    SQLite store of (model, text digest) -> embedding vector.
+
+    Args:
+        path (str): Database file (created if needed).
+        max_entries (Optional[int]): LRU bound on stored vectors; ``None`` keeps
+            everything.
+
+    Attributes:
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups that were not.
+    """
+    def __init__(self, path: str = CACHE_FILENAME, max_entries: Optional[int] = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.executescript(_SCHEMA)
+        self._clock = self._db.execute("SELECT COALESCE(MAX(last_used), 0) FROM embeddings").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self) -> "EmbeddingCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self) -> None:
+        self._db.close()
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        return self.get_many(model, [text])[0]
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Cached vector of each text (None when missing), marking hits as recently used."""
+        digests = [text_digest(text) for text in texts]
+        found: Dict[str, List[float]] = {}
+        unique = list(dict.fromkeys(digests))
+        for start in range(0, len(unique), _BATCH):
+            chunk = unique[start:start + _BATCH]
+            rows = self._db.execute(
+                f"SELECT digest, vector FROM embeddings WHERE model = ? AND digest IN ({','.join('?' * len(chunk))})",
+                [model, *chunk],
+            )
+            for digest, blob in rows:
+                found[digest] = _unpack(blob)
+
+        if found:
+            self._clock += 1
+            with self._db:
+                self._db.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND digest = ?",
+                    [(self._clock, model, digest) for digest in found],
+                )
+        result = [found.get(digest) for digest in digests]
+        hits = sum(1 for vector in result if vector is not None)
+        self.hits += hits
+        self.misses += len(result) - hits
+        return result
+
+    def put(self, model: str, text: str, vector: Sequence[float]) -> None:
+        self.put_many(model, [(text, vector)])
+
+    def put_many(self, model: str, items: Iterable[Tuple[str, Sequence[float]]]) -> None:
+        """Stores (text, vector) pairs, then evicts the least recently used beyond ``max_entries``."""
+        self._clock += 1
+        rows = [(model, text_digest(text), len(vector), _pack(vector), self._clock) for text, vector in items]
+        if not rows:
+            return
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, digest, dim, vector, last_used) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        if self.max_entries is None:
+            return
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM embeddings WHERE rowid IN (SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+
+
+def embed_cached(
+    cache: EmbeddingCache,
+    model: str,
+    texts: Sequence[str],
+    embed_many: Callable[[List[str]], List[List[float]]],
+) -> List[List[float]]:
+    """
+    Embeddings of ``texts``, in order. Only texts missing from ``cache`` are
+    passed to ``embed_many`` (once per distinct text); their vectors are
+    stored, except all-zero vectors, which the embedder returns on failure.
+    """
+    vectors = cache.get_many(model, texts)
+    missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+    if missing:
+        fresh = dict(zip(missing, embed_many(missing)))
+        cache.put_many(model, [(text, vector) for text, vector in fresh.items() if any(vector)])
+        vectors = [vector if vector is not None else fresh[text] for text, vector in zip(texts, vectors)]
+    return vectors
+
+
+def _pack(vector: Sequence[float]) -> bytes:
+    data = array("f", vector)
+    if sys.byteorder != "little":
+        data.byteswap()
+    return data.tobytes()
+
+
+def _unpack(blob: bytes) -> List[float]:
+    data = array("f")
+    data.frombytes(blob)
+    if sys.byteorder != "little":
+        data.byteswap()
+    return data.tolist()
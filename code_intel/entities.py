@@ -61,4 +61,12 @@ class FunctionEntity(Entity):
 class MethodEntity(Entity):
     """Represents a Method within a Class."""
     def __init__(self, id: str, name: str, file_path: str, line_number: int, parent_id: Optional[str] = None):
-        super().__init__(id, name, "method", file_path, line_number, parent_id)
\ No newline at end of file
+        super().__init__(id, name, "method", file_path, line_number, parent_id)
+
+# Maps Entity.type to the concrete class (used to rebuild entities from compact records).
+ENTITY_CLASSES = {
+    "module": ModuleEntity,
+    "class": ClassEntity,
+    "function": FunctionEntity,
+    "method": MethodEntity,
+}
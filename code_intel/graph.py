@@ -5,60 +5,197 @@ Implements the central graph data structure that holds all entities and relation
 Provides methods to add data and query the graph.
 """
 
-from typing import Dict, List, Set, Optional
+from typing import Dict, List, Set, Optional, Tuple, ValuesView
 from code_intel.entities import Entity
 from code_intel.relations import Relationship
 
+# (source_id, target_id, type): identity of a de-duplicated edge
+EdgeKey = Tuple[str, str, str]
+
 class CodeGraph:
     """
     A unified in-memory graph model for the codebase.
     Nodes are Entities, Edges are Relationships.
+
+    Edges are unique per (source, target, type); adding the same edge again
+    increments its ``count``. With ``track_call_sites`` the source lines of
+    every occurrence are kept in ``Relationship.lines`` as well.
+
+    Entities are indexed by the file that defines them and edges by their
+    endpoints, so removing a file, an entity or a node's edges costs time
+    proportional to what is removed, not to the size of the graph.
     """
-    def __init__(self):
+    def __init__(self, track_call_sites: bool = False):
         # Map entity ID -> Entity object
         self.nodes: Dict[str, Entity] = {}
-        # List of all relationships
-        self.edges: List[Relationship] = []
+        # (source_id, target_id, type) -> Relationship. Insertion-ordered, so it
+        # doubles as the edge list (see ``edges``) and supports O(1) removal.
+        self._edge_index: Dict[EdgeKey, Relationship] = {}
+        self.track_call_sites = track_call_sites
+        # Incremented on every mutation so derived data (e.g. metrics) can detect staleness
+        self.version = 0
         
-        # Adjacency lists for fast traversal
-        # source_id -> list of Relationships where this node is source
-        self.outgoing: Dict[str, List[Relationship]] = {}
-        # target_id -> list of Relationships where this node is target
-        self.incoming: Dict[str, List[Relationship]] = {}
+        # Adjacency maps for fast traversal
+        # source_id -> {edge key -> Relationship} where this node is source
+        self.outgoing: Dict[str, Dict[EdgeKey, Relationship]] = {}
+        # target_id -> {edge key -> Relationship} where this node is target
+        self.incoming: Dict[str, Dict[EdgeKey, Relationship]] = {}
+        # file_path -> IDs of the entities it defines (ordered, used as a set)
+        self._file_entities: Dict[str, Dict[str, None]] = {}
+
+    @property
+    def edges(self) -> ValuesView[Relationship]:
+        """All (unique) relationships, in insertion order."""
+        return self._edge_index.values()
 
     def add_entity(self, entity: Entity):
         """Adds an entity to the graph."""
-        if entity.id in self.nodes:
+        previous = self.nodes.get(entity.id)
+        if previous is not None:
             # In case of duplicates (e.g. same name in different conditional blocks),
             # we generally keep the first one or simply overwrite.
             # For static analysis, we'll overwrite to update with latest info if needed,
             # but usually IDs should be unique.
-            pass
+            self._disown(previous)
         self.nodes[entity.id] = entity
+        self._file_entities.setdefault(entity.file_path, {})[entity.id] = None
+        self.version += 1
 
     def add_relationship(self, rel: Relationship):
-        """Adds a relationship to the graph."""
-        self.edges.append(rel)
-        
-        if rel.source_id not in self.outgoing:
-            self.outgoing[rel.source_id] = []
-        self.outgoing[rel.source_id].append(rel)
-        
-        if rel.target_id not in self.incoming:
-            self.incoming[rel.target_id] = []
-        self.incoming[rel.target_id].append(rel)
+        """
+        Adds a relationship to the graph, merging it into an existing identical
+        edge. The graph keeps its own copy; ``rel`` is left untouched.
+        """
+        self.version += 1
+        key = (rel.source_id, rel.target_id, rel.type)
+        existing = self._edge_index.get(key)
+        if existing is not None:
+            existing.count += rel.count
+            if self.track_call_sites and rel.lines:
+                if existing.lines is None:
+                    existing.lines = list(rel.lines)
+                else:
+                    existing.lines.extend(rel.lines)
+            return
+
+        lines = list(rel.lines) if self.track_call_sites and rel.lines is not None else None
+        edge = Relationship(rel.source_id, rel.target_id, rel.type, rel.count, lines)
+        self._edge_index[key] = edge
+        self.outgoing.setdefault(rel.source_id, {})[key] = edge
+        self.incoming.setdefault(rel.target_id, {})[key] = edge
+
+    def remove_file(self, file_path: str) -> List[Entity]:
+        """
+        Retracts a file's contribution: its entities and every edge whose
+        source is one of them. Edges that other files point at its entities
+        are theirs and stay. Returns the removed entities.
+        """
+        entity_ids = self._file_entities.pop(file_path, None)
+        if not entity_ids:
+            return []
+        removed = [self.nodes.pop(entity_id) for entity_id in entity_ids]
+        for entity_id in entity_ids:
+            self._remove_adjacent(self.outgoing, entity_id)
+        self.version += 1
+        return removed
+
+    def remove_entity(self, entity_id: str) -> Optional[Entity]:
+        """Removes an entity together with all its incoming and outgoing edges."""
+        entity = self.nodes.pop(entity_id, None)
+        if entity is None:
+            return None
+        self._disown(entity)
+        self._remove_adjacent(self.outgoing, entity_id)
+        self._remove_adjacent(self.incoming, entity_id)
+        self.version += 1
+        return entity
+
+    def remove_edges(
+        self,
+        source_id: Optional[str] = None,
+        target_id: Optional[str] = None,
+        type: Optional[str] = None,
+    ) -> List[Relationship]:
+        """
+        Removes every edge matching the given filters and returns them.
+        With ``source_id`` or ``target_id`` only that node's adjacency is
+        visited; filtering on ``type`` alone scans all edges.
+        """
+        if source_id is not None:
+            candidates = self.outgoing.get(source_id, {}).values()
+        elif target_id is not None:
+            candidates = self.incoming.get(target_id, {}).values()
+        else:
+            candidates = self._edge_index.values()
+        matched = [
+            rel for rel in candidates
+            if (target_id is None or rel.target_id == target_id) and (type is None or rel.type == type)
+        ]
+        for rel in matched:
+            self._unlink(rel)
+        if matched:
+            self.version += 1
+        return matched
+
+    def remove_edge(self, source_id: str, target_id: str, rel_type: str) -> Optional[Relationship]:
+        """Removes the (source, target, type) edge, whatever its count; returns it if present."""
+        rel = self._edge_index.get((source_id, target_id, rel_type))
+        if rel is None:
+            return None
+        self._unlink(rel)
+        self.version += 1
+        return rel
+
+    def _remove_adjacent(self, adjacency: Dict[str, Dict[EdgeKey, Relationship]], entity_id: str) -> None:
+        for rel in list(adjacency.get(entity_id, {}).values()):
+            self._unlink(rel)
+
+    def _unlink(self, rel: Relationship) -> None:
+        """Drops ``rel`` from the edge store and both adjacency maps."""
+        key = (rel.source_id, rel.target_id, rel.type)
+        del self._edge_index[key]
+        for adjacency, node_id in ((self.outgoing, rel.source_id), (self.incoming, rel.target_id)):
+            edges = adjacency[node_id]
+            del edges[key]
+            if not edges:
+                del adjacency[node_id]
+
+    def _disown(self, entity: Entity) -> None:
+        """Drops ``entity`` from its file's ownership index."""
+        owned = self._file_entities.get(entity.file_path)
+        if owned is not None:
+            owned.pop(entity.id, None)
+            if not owned:
+                del self._file_entities[entity.file_path]
 
     def get_entity(self, entity_id: str) -> Optional[Entity]:
         """Retrieves an entity by its ID."""
         return self.nodes.get(entity_id)
 
+    def get_file_entities(self, file_path: str) -> List[Entity]:
+        """Returns the entities defined in ``file_path``, in definition order."""
+        return [self.nodes[entity_id] for entity_id in self._file_entities.get(file_path, ())]
+
     def get_outgoing_edges(self, source_id: str) -> List[Relationship]:
         """Returns all relationships starting from the given source ID."""
-        return self.outgoing.get(source_id, [])
+        edges = self.outgoing.get(source_id)
+        return list(edges.values()) if edges else []
 
     def get_incoming_edges(self, target_id: str) -> List[Relationship]:
         """Returns all relationships pointing to the given target ID."""
-        return self.incoming.get(target_id, [])
+        edges = self.incoming.get(target_id)
+        return list(edges.values()) if edges else []
+
+    def save_snapshot(self, path: str) -> None:
+        """Writes the graph to a binary snapshot (see code_intel.snapshot)."""
+        from code_intel.snapshot import save_snapshot
+        save_snapshot(self, path)
+
+    @staticmethod
+    def load_snapshot(path: str, mmap: bool = True) -> "CodeGraph":
+        """Opens a snapshot written by ``save_snapshot`` as a read-only graph."""
+        from code_intel.snapshot import load_snapshot
+        return load_snapshot(path, mmap=mmap)
 
     def to_json(self):
         """Serializes the entire graph structure to primitives."""
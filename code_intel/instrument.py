@@ -0,0 +1,289 @@
+"""code_intel.instrument
+
+Lightweight run profiling for ``analyze --profile``.
+
+A ``Profiler`` records:
+
+- phases: wall and CPU seconds of each named block (``with profiler.phase(...)``),
+  the process peak RSS after it and, when memory tracing is on, the peak and
+  retained ``tracemalloc`` memory of the phase;
+- counters: named totals (files, bytes read, AST nodes, graph size, ...);
+- files: per-file read and parse times and AST node counts, with only the
+  ``slowest`` parses kept (a bounded heap);
+- optionally, a ``cProfile`` of the phases (main thread only: the reader
+  threads of the scan pipeline are not profiled) and the top allocation
+  sites of a final ``tracemalloc`` snapshot.
+
+``report()`` returns all of it as a JSON-ready dict and ``write`` stores it
+(``profile.json``). Phases may nest: an outer phase's figures include its
+inner phases, and a phase re-entered while it is open is measured by its
+outermost block only. Counting AST nodes walks every tree once more; that
+time is reported per open phase as ``overhead_seconds`` so it can be told
+apart from the work being measured.
+"""
+
+from __future__ import annotations
+
+import ast
+import contextlib
+import heapq
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from code_intel.sources import ParsedModule
+
+try:
+    import resource  # type: ignore
+except ImportError:  # not available on Windows
+    resource = None
+
+try:
+    import cProfile
+except ImportError:  # some minimal builds ship without it
+    cProfile = None
+
+PROFILE_VERSION = 1
+DEFAULT_SLOWEST = 20
+# Allocation sites listed from the final tracemalloc snapshot
+TOP_ALLOCATIONS = 15
+
+
+@dataclass
+class PhaseStats:
+    """
+    Measurements of one phase (repeated phases are summed).
+
+    Attributes:
+        name (str): Phase name.
+        seconds (float): Wall-clock time.
+        cpu_seconds (float): Process CPU time (all threads).
+        overhead_seconds (float): Time spent by the profiler itself (node counting).
+        calls (int): Times the phase was entered.
+        rss_peak_kb (Optional[float]): Process peak RSS after the phase.
+        peak_kb (Optional[float]): Peak traced memory above the phase's start.
+        retained_kb (Optional[float]): Traced memory still held after the phase.
+    """
+    name: str
+    seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    overhead_seconds: float = 0.0
+    calls: int = 0
+    rss_peak_kb: Optional[float] = None
+    peak_kb: Optional[float] = None
+    retained_kb: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            "name": self.name,
+            "seconds": round(self.seconds, 6),
+            "cpu_seconds": round(self.cpu_seconds, 6),
+            "calls": self.calls,
+        }
+        if self.overhead_seconds:
+            data["overhead_seconds"] = round(self.overhead_seconds, 6)
+        for key in ("rss_peak_kb", "peak_kb", "retained_kb"):
+            value = getattr(self, key)
+            if value is not None:
+                data[key] = round(value, 1)
+        return data
+
+
+class Profiler:
+    """
+    Phase timers, counters and per-file parse statistics of one run.
+
+    Args:
+        slowest (int): Number of slowest-to-parse files to keep.
+        trace_memory (bool): Trace allocations (``tracemalloc``) for per-phase
+            peaks and a final top-allocations snapshot. Slows the run down.
+        cprofile (bool): Run ``cProfile`` inside every phase.
+    """
+    def __init__(self, slowest: int = DEFAULT_SLOWEST, trace_memory: bool = False, cprofile: bool = False):
+        self.slowest = slowest
+        self.trace_memory = trace_memory
+        self.phases: Dict[str, PhaseStats] = {}
+        self.counters: Dict[str, int] = {}
+        self._started = time.perf_counter()
+        self._started_cpu = time.process_time()
+        # Open phases, innermost last, and (memory tracing) the highest traced
+        # memory each has seen so far, as a nested phase resets the peak.
+        self._open: List[PhaseStats] = []
+        self._open_peaks: List[int] = []
+
+        # Per-file totals and a min-heap of (parse seconds, file) for the slowest
+        self.files_recorded = 0
+        self.read_seconds = 0.0
+        self.parse_seconds = 0.0
+        self._slowest: List[Tuple[float, str, float, int, int]] = []
+
+        self._cprofile = cProfile.Profile() if cprofile and cProfile is not None else None
+        self._owns_tracing = False
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracing = True
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[PhaseStats]:
+        """Measures the enclosed block as (part of) phase ``name``."""
+        stats = self.phases.get(name)
+        if stats is None:
+            stats = self.phases[name] = PhaseStats(name)
+        if any(open_stats is stats for open_stats in self._open):
+            yield stats  # already measured by the enclosing block
+            return
+        if self.trace_memory:
+            if self._open_peaks:
+                self._open_peaks[-1] = max(self._open_peaks[-1], tracemalloc.get_traced_memory()[1])
+            _reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            self._open_peaks.append(base)
+        if self._cprofile is not None and not self._open:
+            self._cprofile.enable()
+        self._open.append(stats)
+        start, start_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield stats
+        finally:
+            stats.seconds += time.perf_counter() - start
+            stats.cpu_seconds += time.process_time() - start_cpu
+            stats.calls += 1
+            self._open.pop()
+            if self._cprofile is not None and not self._open:
+                self._cprofile.disable()
+            if self.trace_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, self._open_peaks.pop())
+                if self._open_peaks:
+                    self._open_peaks[-1] = max(self._open_peaks[-1], peak)
+                stats.peak_kb = max(stats.peak_kb or 0.0, (peak - base) / 1024)
+                stats.retained_kb = (stats.retained_kb or 0.0) + (current - base) / 1024
+            stats.rss_peak_kb = peak_rss_kb()
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Adds ``value`` to counter ``name``."""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def record_file(self, parsed: ParsedModule) -> None:
+        """Records the read/parse times, size and AST node count of a parsed file."""
+        start = time.perf_counter()
+        size = len(parsed.source) if parsed.source is not None else 0
+        nodes = sum(1 for _ in ast.walk(parsed.tree)) if parsed.tree is not None else 0
+        self.files_recorded += 1
+        self.read_seconds += parsed.read_seconds
+        self.parse_seconds += parsed.parse_seconds
+        self.count("bytes_read", size)
+        self.count("ast_nodes", nodes)
+        if parsed.error is not None:
+            self.count("parse_errors")
+
+        entry = (parsed.parse_seconds, parsed.file_path, parsed.read_seconds, size, nodes)
+        if len(self._slowest) < self.slowest:
+            heapq.heappush(self._slowest, entry)
+        elif self.slowest > 0 and entry > self._slowest[0]:
+            heapq.heapreplace(self._slowest, entry)
+        overhead = time.perf_counter() - start
+        for stats in self._open:
+            stats.overhead_seconds += overhead
+
+    def slowest_files(self) -> List[Dict[str, Any]]:
+        """The slowest parses recorded, slowest first."""
+        return [
+            {
+                "file": file_path,
+                "parse_seconds": round(parse_seconds, 6),
+                "read_seconds": round(read_seconds, 6),
+                "bytes": size,
+                "ast_nodes": nodes,
+            }
+            for parse_seconds, file_path, read_seconds, size, nodes in sorted(self._slowest, reverse=True)
+        ]
+
+    def report(self) -> Dict[str, Any]:
+        """Everything recorded so far, as a JSON-ready dict."""
+        data: Dict[str, Any] = {
+            "version": PROFILE_VERSION,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "argv": sys.argv,
+            "total_seconds": round(time.perf_counter() - self._started, 6),
+            "total_cpu_seconds": round(time.process_time() - self._started_cpu, 6),
+            "rss_peak_kb": peak_rss_kb(),
+            "phases": [stats.to_dict() for stats in self.phases.values()],
+            "counters": dict(sorted(self.counters.items())),
+            "files": {
+                "recorded": self.files_recorded,
+                "read_seconds": round(self.read_seconds, 6),
+                "parse_seconds": round(self.parse_seconds, 6),
+                "slowest": self.slowest_files(),
+            },
+        }
+        if self.trace_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            data["tracemalloc"] = {
+                "current_kb": round(current / 1024, 1),
+                "peak_kb": round(peak / 1024, 1),
+                "top_allocations": _top_allocations(),
+            }
+        return data
+
+    def write(self, output_dir: str, filename: str = "profile.json") -> List[str]:
+        """
+        Writes ``profile.json`` (and ``profile.pstats`` with cProfile on) to
+        ``output_dir``. Returns the paths written.
+        """
+        paths = [os.path.join(output_dir, filename)]
+        with open(paths[0], "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        if self._cprofile is not None:
+            paths.append(os.path.join(output_dir, "profile.pstats"))
+            self._cprofile.dump_stats(paths[1])
+        return paths
+
+    def close(self) -> None:
+        """Stops memory tracing if this profiler started it."""
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+    def summary_lines(self) -> List[str]:
+        """Short human-readable phase table."""
+        lines = ["Profile:"]
+        for stats in self.phases.values():
+            memory = f"  peak {stats.peak_kb / 1024:8.1f} MB" if stats.peak_kb is not None else ""
+            lines.append(f"  {stats.name:<12} {stats.seconds * 1000:9.1f} ms  cpu {stats.cpu_seconds * 1000:9.1f} ms{memory}")
+        rss = peak_rss_kb()
+        if rss is not None:
+            lines.append(f"  peak RSS {rss / 1024:.1f} MB")
+        return lines
+
+
+def peak_rss_kb() -> Optional[float]:
+    """Peak resident set size of this process in KB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak / 1024 if sys.platform == "darwin" else float(peak)
+
+
+def _reset_peak() -> None:
+    if hasattr(tracemalloc, "reset_peak"):  # Python 3.9+
+        tracemalloc.reset_peak()
+
+
+def _top_allocations(limit: int = TOP_ALLOCATIONS) -> List[Dict[str, Any]]:
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap>"))
+    )
+    top = []
+    for stat in snapshot.statistics("lineno")[:limit]:
+        frame = stat.traceback[0]
+        top.append({"site": f"{frame.filename}:{frame.lineno}", "kb": round(stat.size / 1024, 1), "blocks": stat.count})
+    return top
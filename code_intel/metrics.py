@@ -0,0 +1,150 @@
+"""code_intel.metrics
+
+Single-pass, cached degree metrics over a CodeGraph.
+
+``CodeReporter`` and ``ArtifactWriter`` both need the same edge-derived
+numbers (most called functions, orchestrators, class sizes, import coupling,
+call/import adjacency). ``GraphMetrics`` computes all of them in one scan of
+``graph.edges`` and reuses the result until the graph is mutated again
+(tracked through ``graph.version``). Top-k queries use heap selection.
+Import/call cycle condensations (``code_intel.cycles``) and call-graph
+centrality (``code_intel.centrality``) are cached the same way, but only
+computed when asked for.
+"""
+
+from __future__ import annotations
+
+import heapq
+from collections import defaultdict
+from operator import itemgetter
+from typing import Dict, List, Optional, Set, Tuple
+
+from code_intel.centrality import DEFAULT_SAMPLES, Centrality
+from code_intel.cycles import Condensation, condense
+from code_intel.graph import CodeGraph
+from code_intel.relations import REL_CALLS, REL_DEFINES, REL_IMPORTS
+
+
+def top_k(counts: Dict[str, int], limit: int) -> List[Tuple[str, int]]:
+    """Highest counts first; ties keep first-seen order (same as Counter.most_common)."""
+    return heapq.nlargest(limit, counts.items(), key=itemgetter(1))
+
+
+class GraphMetrics:
+    """
+    Degree counters and adjacency maps for a graph, computed in one pass.
+
+    Counters use edge multiplicity (``Relationship.count``), so every call site
+    or import statement counts. Adjacency maps list distinct targets, sorted.
+
+    ``centrality_samples`` is the betweenness sample budget (None: exact).
+    """
+    def __init__(self, graph: CodeGraph, centrality_samples: Optional[int] = DEFAULT_SAMPLES):
+        self.graph = graph
+        self.centrality_samples = centrality_samples
+        self._version: Optional[int] = None
+
+        self._calls_in: Dict[str, int] = {}
+        self._calls_out: Dict[str, int] = {}
+        self._methods: Dict[str, int] = {}
+        self._imports_out: Dict[str, int] = {}
+        self._calls_adjacency: Dict[str, List[str]] = {}
+        self._imports_adjacency: Dict[str, List[str]] = {}
+        self._class_methods: Dict[str, List[str]] = {}
+        # relationship type -> SCC condensation, computed on first use
+        self._condensations: Dict[str, Condensation] = {}
+        self._centrality: Optional[Centrality] = None
+
+    def refresh(self) -> None:
+        """Recomputes everything if the graph changed since the last pass."""
+        if self._version == self.graph.version:
+            return
+
+        calls_in: Dict[str, int] = defaultdict(int)
+        calls_out: Dict[str, int] = defaultdict(int)
+        methods: Dict[str, int] = defaultdict(int)
+        imports_out: Dict[str, int] = defaultdict(int)
+        calls_adj: Dict[str, Set[str]] = defaultdict(set)
+        imports_adj: Dict[str, Set[str]] = defaultdict(set)
+        class_methods: Dict[str, Set[str]] = defaultdict(set)
+
+        for edge in self.graph.edges:
+            rel_type = edge.type
+            if rel_type == REL_CALLS:
+                calls_in[edge.target_id] += edge.count
+                calls_out[edge.source_id] += edge.count
+                calls_adj[edge.source_id].add(edge.target_id)
+            elif rel_type == REL_IMPORTS:
+                if edge.target_id:
+                    imports_out[edge.source_id] += edge.count
+                    imports_adj[edge.source_id].add(edge.target_id)
+            elif rel_type == REL_DEFINES:
+                methods[edge.source_id] += edge.count
+                class_methods[edge.source_id].add(edge.target_id)
+
+        self._calls_in = dict(calls_in)
+        self._calls_out = dict(calls_out)
+        self._methods = dict(methods)
+        self._imports_out = dict(imports_out)
+        self._calls_adjacency = {k: sorted(v) for k, v in calls_adj.items()}
+        self._imports_adjacency = {k: sorted(v) for k, v in imports_adj.items()}
+        self._class_methods = {k: sorted(v) for k, v in class_methods.items()}
+        self._condensations = {}
+        self._centrality = None
+        self._version = self.graph.version
+
+    def most_called(self, limit: int = 10) -> List[Tuple[str, int]]:
+        """Entities by incoming CALLS (call sites)."""
+        self.refresh()
+        return top_k(self._calls_in, limit)
+
+    def top_orchestrators(self, limit: int = 10) -> List[Tuple[str, int]]:
+        """Entities by outgoing CALLS (call sites)."""
+        self.refresh()
+        return top_k(self._calls_out, limit)
+
+    def largest_classes(self, limit: int = 10) -> List[Tuple[str, int]]:
+        """Classes by number of DEFINES edges."""
+        self.refresh()
+        return top_k(self._methods, limit)
+
+    def highest_coupling(self, limit: int = 10) -> List[Tuple[str, int]]:
+        """Modules by number of IMPORTS (fan-out)."""
+        self.refresh()
+        return top_k(self._imports_out, limit)
+
+    def calls_adjacency(self) -> Dict[str, List[str]]:
+        """source -> sorted distinct CALLS targets."""
+        self.refresh()
+        return self._calls_adjacency
+
+    def imports_adjacency(self) -> Dict[str, List[str]]:
+        """module -> sorted distinct IMPORTS targets."""
+        self.refresh()
+        return self._imports_adjacency
+
+    def class_methods(self) -> Dict[str, List[str]]:
+        """class -> sorted distinct methods it DEFINES."""
+        self.refresh()
+        return self._class_methods
+
+    def condensation(self, rel_type: str) -> Condensation:
+        """Strongly connected components and layered DAG of the ``rel_type`` edges."""
+        self.refresh()
+        cached = self._condensations.get(rel_type)
+        if cached is None:
+            # Every module gets an import layer, even one without internal imports.
+            entity_types = ("module",) if rel_type == REL_IMPORTS else ()
+            cached = self._condensations[rel_type] = condense(self.graph, (rel_type,), entity_types)
+        return cached
+
+    def centrality(self) -> Centrality:
+        """PageRank and sampled betweenness of the call graph."""
+        self.refresh()
+        if self._centrality is None:
+            self._centrality = Centrality.compute(self.graph, self.centrality_samples)
+        return self._centrality
+
+    def central_entities(self, limit: int = 10) -> List[Tuple[str, float, float]]:
+        """(ID, PageRank, betweenness) of the most central functions, by PageRank."""
+        return self.centrality().central_entities(limit)
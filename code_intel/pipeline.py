@@ -0,0 +1,169 @@
+"""code_intel.pipeline
+
+Producer/consumer pipeline for Pass 1: discover -> read -> parse -> visit.
+
+Without it the scanner walks the whole tree before opening a file, and then
+reads and parses files one at a time, leaving the disk idle during parsing.
+``ScanPipeline`` overlaps the stages:
+
+- a discovery thread walks the tree (lazily, via ``FileDiscovery.iter_files``);
+- a pool of reader threads loads file bytes (I/O releases the GIL, so several
+  reads are in flight on network file systems or cold caches);
+- parser threads turn bytes into ASTs;
+- the consumer (the scanner's definition visitor) receives the modules in
+  discovery order, through a small reorder buffer.
+
+Backpressure comes from a semaphore of ``max_in_flight`` slots: discovery
+takes a slot per file and the consumer gives it back once the module has been
+handed over, so at most that many files are held between stages. An
+exception in any stage stops the others and is re-raised to the consumer.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from code_intel.sources import ParsedModule, parse_module, read_module
+
+# Scanner default: no pipeline. Parsing holds the GIL, and on a local disk
+# with a warm page cache reader threads showed no measurable gain; the
+# pipeline pays off on network file systems or cold caches (``--readers N``).
+DEFAULT_READERS = 0
+# Reader threads of a ScanPipeline created without ``readers``
+PIPELINE_READERS = 4
+DEFAULT_MAX_IN_FLIGHT = 64
+
+# End-of-stream marker passed between stages.
+_DONE = None
+
+
+class ScanPipeline:
+    """
+    Iterable of ``ParsedModule`` objects in the order ``files`` yields paths.
+
+    Args:
+        files (Iterable[str]): File paths (typically a lazy discovery generator).
+        module_id (Callable[[str], str]): Maps a file path to its module ID.
+        readers (int): Number of reader threads.
+        parsers (int): Number of parser threads.
+        max_in_flight (int): Files discovered but not yet consumed, at most.
+    """
+    def __init__(
+        self,
+        files: Iterable[str],
+        module_id: Callable[[str], str],
+        readers: int = PIPELINE_READERS,
+        parsers: int = 1,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    ):
+        self.files = files
+        self.module_id = module_id
+        self.readers = max(1, readers)
+        self.parsers = max(1, parsers)
+        self.max_in_flight = max(1, max_in_flight)
+
+        self._read_q: "queue.Queue[Optional[Tuple[int, str]]]" = queue.Queue()
+        self._parse_q: "queue.Queue[Optional[Tuple[int, ParsedModule]]]" = queue.Queue()
+        self._out_q: "queue.Queue[Optional[Tuple[int, ParsedModule]]]" = queue.Queue()
+        self._slots = threading.Semaphore(self.max_in_flight)
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._lock = threading.Lock()
+        self._live_readers = self.readers
+        self._live_parsers = self.parsers
+
+    def __iter__(self) -> Iterator[ParsedModule]:
+        threads = [threading.Thread(target=self._discover, name="scan-discover", daemon=True)]
+        threads += [threading.Thread(target=self._read, name=f"scan-read-{i}", daemon=True) for i in range(self.readers)]
+        threads += [threading.Thread(target=self._parse, name=f"scan-parse-{i}", daemon=True) for i in range(self.parsers)]
+        for thread in threads:
+            thread.start()
+
+        pending: Dict[int, ParsedModule] = {}
+        next_seq = 0
+        try:
+            while True:
+                item = self._out_q.get()
+                if item is _DONE:
+                    break
+                seq, parsed = item
+                pending[seq] = parsed
+                while next_seq in pending:
+                    module = pending.pop(next_seq)
+                    next_seq += 1
+                    yield module
+                    self._slots.release()
+            if self._error is not None:
+                raise self._error
+        finally:
+            # Stops the producers if the consumer bails out early.
+            self._stop.set()
+            for _ in range(self.max_in_flight):
+                self._slots.release()
+
+    def _discover(self) -> None:
+        try:
+            for seq, file_path in enumerate(self.files):
+                while not self._slots.acquire(timeout=0.1):
+                    if self._stop.is_set():
+                        return
+                if self._stop.is_set():
+                    return
+                self._read_q.put((seq, file_path))
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            for _ in range(self.readers):
+                self._read_q.put(_DONE)
+
+    def _read(self) -> None:
+        try:
+            while True:
+                item = self._read_q.get()
+                if item is _DONE:
+                    break
+                if self._stop.is_set():
+                    continue  # drain until the end marker
+                seq, file_path = item
+                try:
+                    self._parse_q.put((seq, read_module(file_path, self.module_id(file_path))))
+                except BaseException as e:
+                    self._fail(e)
+        finally:
+            if self._finish("_live_readers"):
+                for _ in range(self.parsers):
+                    self._parse_q.put(_DONE)
+
+    def _parse(self) -> None:
+        try:
+            while True:
+                item = self._parse_q.get()
+                if item is _DONE:
+                    break
+                if self._stop.is_set():
+                    continue
+                seq, parsed = item
+                try:
+                    self._out_q.put((seq, parse_module(parsed)))
+                except BaseException as e:
+                    self._fail(e)
+        finally:
+            if self._finish("_live_parsers"):
+                self._out_q.put(_DONE)
+
+    def _fail(self, error: BaseException) -> None:
+        """Records the first error of any stage and stops the pipeline; the consumer re-raises it."""
+        with self._lock:
+            if self._error is None:
+                self._error = error
+        self._stop.set()
+
+    def _finish(self, counter: str) -> bool:
+        """Decrements a live-worker counter; True for the last worker of a stage."""
+        with self._lock:
+            remaining = getattr(self, counter) - 1
+            setattr(self, counter, remaining)
+            return remaining == 0
+
@@ -0,0 +1,288 @@
+"""code_intel.query
+
+Graph traversal queries: callers/callees to a given depth, transitive
+reachability, shortest call paths and impact ("blast radius") sets.
+
+``get_outgoing_edges`` / ``get_incoming_edges`` build Relationship lists per
+call, which makes multi-hop traversals expensive. ``AdjacencyIndex`` is an
+int-indexed snapshot of the graph instead: entity IDs are numbered once and
+both directions are stored as CSR arrays (neighbour node and relationship
+type code per slot). Traversals are breadth-first over those arrays, with a
+``bytearray`` of visited marks (one byte per node) and early exit as soon as
+a target is found.
+
+``GraphQuery`` rebuilds the index lazily when the graph has been mutated
+(tracked through ``graph.version``), so it can be kept around in watch and
+server mode.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from code_intel.compact_graph import CompactCodeGraph, build_csr
+from code_intel.graph import CodeGraph
+from code_intel.relations import REL_CALLS, REL_IMPORTS, REL_INHERITS, REL_TYPES
+
+# Relationships along which a change propagates to dependents.
+IMPACT_TYPES: Tuple[str, ...] = (REL_CALLS, REL_INHERITS, REL_IMPORTS)
+
+OUT = "out"
+IN = "in"
+
+
+class AdjacencyIndex:
+    """
+    Int-indexed CSR adjacency of a graph in both directions.
+
+    The neighbours of node ``u`` are ``out_nodes[out_offsets[u]:out_offsets[u + 1]]``
+    (edge targets) and ``in_nodes[in_offsets[u]:in_offsets[u + 1]]`` (edge
+    sources); ``out_types`` / ``in_types`` hold the type code of each slot.
+
+    Attributes:
+        ids (List[str]): Node number -> ID (entities and external edge targets).
+        index (Dict[str, int]): ID -> node number.
+        types (List[str]): Type code -> relationship type.
+    """
+    def __init__(self, graph: CodeGraph):
+        if isinstance(graph, CompactCodeGraph):
+            # Already interned and stored column-wise: reuse the (merged, live) columns.
+            graph.freeze()
+            self.ids: List[str] = list(graph._strings)
+            self.index: Dict[str, int] = dict(graph._ids)
+            self.types: List[str] = list(graph._types)
+            src, dst, rel = graph._src, graph._dst, graph._rel
+            # Entities without edges were never interned by the graph.
+            for entity_id in graph.nodes:
+                self._intern(entity_id)
+        else:
+            self.ids = []
+            self.index = {}
+            self.types = list(REL_TYPES)
+            type_codes = {t: i for i, t in enumerate(self.types)}
+            # Entities first, so node numbers follow graph.nodes order.
+            for entity_id in graph.nodes:
+                self._intern(entity_id)
+            src, dst, rel = array("i"), array("i"), array("B")
+            index, intern = self.index, self._intern
+            for edge in graph.edges:
+                code = type_codes.get(edge.type)
+                if code is None:
+                    code = type_codes[edge.type] = len(self.types)
+                    self.types.append(edge.type)
+                s = index.get(edge.source_id)
+                src.append(s if s is not None else intern(edge.source_id))
+                d = index.get(edge.target_id)
+                dst.append(d if d is not None else intern(edge.target_id))
+                rel.append(code)
+        self._type_codes = {t: i for i, t in enumerate(self.types)}
+
+        n = len(self.ids)
+        self.out_offsets, order = build_csr(src, n)
+        self.out_nodes = array("i", map(dst.__getitem__, order))
+        self.out_types = array("B", map(rel.__getitem__, order))
+        self.in_offsets, order = build_csr(dst, n)
+        self.in_nodes = array("i", map(src.__getitem__, order))
+        self.in_types = array("B", map(rel.__getitem__, order))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _intern(self, value: str) -> int:
+        idx = self.index.get(value)
+        if idx is None:
+            idx = self.index[value] = len(self.ids)
+            self.ids.append(value)
+        return idx
+
+    def type_mask(self, types: Optional[Iterable[str]]) -> int:
+        """Bit mask of type codes; None selects every type."""
+        if types is None:
+            return -1
+        mask = 0
+        for rel_type in types:
+            code = self._type_codes.get(rel_type)
+            if code is not None:
+                mask |= 1 << code
+        return mask
+
+    def neighbours(self, node: int, direction: str, mask: int) -> List[int]:
+        """Adjacent node numbers of ``node`` through edges whose type is in ``mask``."""
+        if direction == OUT:
+            offsets, nodes, types = self.out_offsets, self.out_nodes, self.out_types
+        else:
+            offsets, nodes, types = self.in_offsets, self.in_nodes, self.in_types
+        start, end = offsets[node], offsets[node + 1]
+        if mask == -1:
+            return nodes[start:end].tolist()
+        return [v for v, code in zip(nodes[start:end], types[start:end]) if mask >> code & 1]
+
+
+class GraphQuery:
+    """
+    Traversal queries over a graph, answered from a cached ``AdjacencyIndex``.
+
+    ``types`` arguments select the relationship types to follow (None: all).
+    ``max_depth`` bounds the number of hops (None: unbounded). Results report
+    each node with its hop distance from the nearest start node.
+    """
+    def __init__(self, graph: CodeGraph):
+        self.graph = graph
+        self._index: Optional[AdjacencyIndex] = None
+        self._version: Optional[int] = None
+
+    @property
+    def index(self) -> AdjacencyIndex:
+        """The adjacency index, rebuilt if the graph changed since it was built."""
+        if self._index is None or self._version != self.graph.version:
+            self._index = AdjacencyIndex(self.graph)
+            self._version = self.graph.version
+        return self._index
+
+    def callers(
+        self, entity_id: str, max_depth: Optional[int] = 1, types: Optional[Sequence[str]] = (REL_CALLS,)
+    ) -> List[Tuple[str, int]]:
+        """Entities that reach ``entity_id`` in at most ``max_depth`` hops, nearest first."""
+        return self.traverse([entity_id], IN, max_depth, types)
+
+    def callees(
+        self, entity_id: str, max_depth: Optional[int] = 1, types: Optional[Sequence[str]] = (REL_CALLS,)
+    ) -> List[Tuple[str, int]]:
+        """Entities reached from ``entity_id`` in at most ``max_depth`` hops, nearest first."""
+        return self.traverse([entity_id], OUT, max_depth, types)
+
+    def traverse(
+        self,
+        start_ids: Iterable[str],
+        direction: str = OUT,
+        max_depth: Optional[int] = None,
+        types: Optional[Sequence[str]] = None,
+    ) -> List[Tuple[str, int]]:
+        """
+        Breadth-first walk from ``start_ids`` (``direction`` OUT follows edges,
+        IN walks them backwards). Returns (ID, depth) for every node visited,
+        excluding the start nodes, in visit order.
+        """
+        idx = self.index
+        mask = idx.type_mask(types)
+        visited = bytearray(len(idx))
+        frontier = self._start_nodes(start_ids, visited)
+        ids = idx.ids
+        neighbours = idx.neighbours
+        result: List[Tuple[str, int]] = []
+        depth = 0
+        while frontier and (max_depth is None or depth < max_depth):
+            depth += 1
+            next_frontier: List[int] = []
+            for u in frontier:
+                for v in neighbours(u, direction, mask):
+                    if not visited[v]:
+                        visited[v] = 1
+                        next_frontier.append(v)
+                        result.append((ids[v], depth))
+            frontier = next_frontier
+        return result
+
+    def reachable(
+        self,
+        source_id: str,
+        target_id: str,
+        max_depth: Optional[int] = None,
+        types: Optional[Sequence[str]] = (REL_CALLS,),
+    ) -> bool:
+        """Whether ``target_id`` is reachable from ``source_id``; stops at the first hit."""
+        return self.shortest_path(source_id, target_id, max_depth, types) is not None
+
+    def shortest_path(
+        self,
+        source_id: str,
+        target_id: str,
+        max_depth: Optional[int] = None,
+        types: Optional[Sequence[str]] = (REL_CALLS,),
+    ) -> Optional[List[str]]:
+        """
+        Fewest-hop path ``[source_id, ..., target_id]`` along edges of ``types``,
+        or None. Searches from both ends, always expanding the smaller frontier.
+        """
+        idx = self.index
+        source = idx.index.get(source_id)
+        target = idx.index.get(target_id)
+        if source is None or target is None:
+            return None
+        if source == target:
+            return [source_id]
+
+        mask = idx.type_mask(types)
+        n = len(idx)
+        # 1: seen from the source side, 2: from the target side
+        side = bytearray(n)
+        parent = array("i", [-1]) * n
+        side[source], side[target] = 1, 2
+        forward, backward = [source], [target]
+        hops = 0
+        while forward and backward and (max_depth is None or hops < max_depth):
+            hops += 1
+            expand_forward = len(forward) <= len(backward)
+            frontier = forward if expand_forward else backward
+            mine, theirs = (1, 2) if expand_forward else (2, 1)
+            direction = OUT if expand_forward else IN
+            next_frontier: List[int] = []
+            for u in frontier:
+                for v in idx.neighbours(u, direction, mask):
+                    if side[v] == theirs:
+                        return self._join_path(parent, u, v, expand_forward)
+                    if not side[v]:
+                        side[v] = mine
+                        parent[v] = u
+                        next_frontier.append(v)
+            if expand_forward:
+                forward = next_frontier
+            else:
+                backward = next_frontier
+        return None
+
+    def impact(
+        self,
+        entity_ids: Iterable[str],
+        max_depth: Optional[int] = None,
+        types: Optional[Sequence[str]] = IMPACT_TYPES,
+    ) -> Dict[str, int]:
+        """
+        Blast radius of changing ``entity_ids``: every entity that depends on
+        them, directly or transitively, mapped to its distance in hops.
+        """
+        return dict(self.traverse(entity_ids, IN, max_depth, types))
+
+    def file_impact(
+        self,
+        file_path: str,
+        max_depth: Optional[int] = None,
+        types: Optional[Sequence[str]] = IMPACT_TYPES,
+    ) -> Dict[str, int]:
+        """``impact`` of every entity defined in ``file_path``, outside that file."""
+        own = [entity.id for entity in self.graph.get_file_entities(file_path)]
+        return self.impact(own, max_depth, types)
+
+    def _start_nodes(self, start_ids: Iterable[str], visited: bytearray) -> List[int]:
+        frontier: List[int] = []
+        for entity_id in start_ids:
+            node = self.index.index.get(entity_id)
+            if node is not None and not visited[node]:
+                visited[node] = 1
+                frontier.append(node)
+        return frontier
+
+    def _join_path(self, parent: array, u: int, v: int, forward_edge: bool) -> List[str]:
+        """Stitches the two search trees together at the edge u -> v (or v -> u)."""
+        head, tail = (u, v) if forward_edge else (v, u)
+        path: List[int] = []
+        while head != -1:
+            path.append(head)
+            head = parent[head]
+        path.reverse()
+        while tail != -1:
+            path.append(tail)
+            tail = parent[tail]
+        ids = self.index.ids
+        return [ids[node] for node in path]
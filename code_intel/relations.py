@@ -5,7 +5,7 @@ Defines the data models for relationships between entities (edges in the graph).
 """
 
 from dataclasses import dataclass
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 # Relationship Types
 REL_CALLS = "CALLS"       # Function A calls Function B
@@ -13,24 +13,36 @@ REL_DEFINES = "DEFINES"   # Class A defines Method B
 REL_INHERITS = "INHERITS" # Class A inherits from Class B
 REL_IMPORTS = "IMPORTS"   # File A imports Module B
 
+# Stable small-integer codes for the relationship types (used by compact storage).
+REL_TYPES = (REL_CALLS, REL_DEFINES, REL_INHERITS, REL_IMPORTS)
+
 @dataclass
 class Relationship:
     """
     Represents a directed relationship between two entities.
+    The graph stores each (source, target, type) once; repeats raise ``count``.
     
     Attributes:
         source_id (str): The ID of the source entity.
         target_id (str): The ID of the target entity.
         type (str): The type of relationship (e.g., CALLS, INHERITS).
+        count (int): Number of occurrences (e.g. call sites of a CALLS edge).
+        lines (Optional[List[int]]): Source lines of the occurrences, if tracked.
     """
     source_id: str
     target_id: str
     type: str
+    count: int = 1
+    lines: Optional[List[int]] = None
 
     def to_dict(self) -> Dict[str, Any]:
         """Returns a dictionary representation of the relationship."""
-        return {
+        data = {
             "source_id": self.source_id,
             "target_id": self.target_id,
-            "type": self.type
+            "type": self.type,
+            "count": self.count,
         }
+        if self.lines is not None:
+            data["lines"] = self.lines
+        return data
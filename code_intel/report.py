@@ -5,67 +5,54 @@ Computes insights and analytics from the CodeGraph.
 Generates the summary report.
 """
 
-from typing import List, Tuple, Dict
-from collections import Counter, defaultdict
+from typing import List, Optional, Tuple
 from code_intel.graph import CodeGraph
-from code_intel.relations import REL_CALLS, REL_DEFINES, REL_IMPORTS
+from code_intel.metrics import GraphMetrics
 
 class CodeReporter:
-    def __init__(self, graph: CodeGraph):
+    def __init__(self, graph: CodeGraph, metrics: Optional[GraphMetrics] = None, centrality: bool = False):
         self.graph = graph
+        # Degree counters are computed in a single pass and shared with ArtifactWriter
+        self.metrics = metrics if metrics is not None else GraphMetrics(graph)
+        # PageRank/betweenness cost far more than the degree counters: opt-in (--centrality)
+        self.centrality = centrality
 
     def get_most_called_functions(self, limit: int = 10) -> List[Tuple[str, int]]:
         """
-        Returns functions sorted by in-degree of CALLS relationships.
+        Returns functions sorted by in-degree of CALLS relationships
+        (every call site counts, via the edge multiplicity).
         Function ID -> Count
         """
-        counts = Counter()
-        for edge in self.graph.edges:
-            if edge.type == REL_CALLS:
-                counts[edge.target_id] += 1
-        
-        # We might want to filter only for entities that are actually Functions in our graph
-        # to avoid noise from external libraries if they were added as loose nodes or not added.
-        # But looking at scanner, we only add entities we scan. 
-        # However, relationship scanner might add calls to external libs if we resolved them roughly (though we tried to avoid it).
-        
-        # Let's filter to ensure we show our own functions primarily if possible.
-        # The scanner only adds relationships to entities if they are resolved.
-        return counts.most_common(limit)
+        # The scanner only adds CALLS relationships to entities it resolved,
+        # so this is limited to our own functions.
+        return self.metrics.most_called(limit)
 
     def get_top_orchestrators(self, limit: int = 10) -> List[Tuple[str, int]]:
         """
         Returns functions that call the most OTHER functions (out-degree of CALLS).
         """
-        counts = Counter()
-        for edge in self.graph.edges:
-            if edge.type == REL_CALLS:
-                counts[edge.source_id] += 1
-        return counts.most_common(limit)
+        return self.metrics.top_orchestrators(limit)
+
+    def get_central_entities(self, limit: int = 10) -> List[Tuple[str, float, float]]:
+        """
+        Returns functions ranked by PageRank over the call graph, with their
+        (sampled) betweenness: (ID, PageRank, betweenness).
+        """
+        return self.metrics.central_entities(limit)
 
     def get_largest_classes(self, limit: int = 10) -> List[Tuple[str, int]]:
         """
         Returns classes sorted by number of methods they DEFINE.
         """
-        counts = Counter()
-        for edge in self.graph.edges:
-            if edge.type == REL_DEFINES:
-                counts[edge.source_id] += 1
-        return counts.most_common(limit)
+        return self.metrics.largest_classes(limit)
 
     def get_highest_coupling_files(self, limit: int = 10) -> List[Tuple[str, int]]:
         """
         Returns files (modules) with highest coupling.
-        Metric: Outgoing imports + Incoming imports? 
-        Or just number of other modules it imports (Fan-out).
-        Let's do Fan-out (Dependency count) for now as "Coupling".
+        Metric: Fan-out (number of imports) as "Coupling".
         Relationship is Module -> IMPORTS -> Module
         """
-        counts = Counter()
-        for edge in self.graph.edges:
-            if edge.type == REL_IMPORTS:
-                counts[edge.source_id] += 1
-        return counts.most_common(limit)
+        return self.metrics.highest_coupling(limit)
 
     def generate_markdown(self) -> str:
         """Generates the full markdown summary."""
@@ -86,6 +73,12 @@ class CodeReporter:
              lines.append(f"- `{fn}`: {count} outgoing calls")
         lines.append("")
         
+        if self.centrality:
+            lines.append("## Most Central Functions (PageRank over the call graph)")
+            for fn, rank, between in self.get_central_entities():
+                 lines.append(f"- `{fn}`: PageRank {rank:.4g}, betweenness {between:.4g}")
+            lines.append("")
+
         lines.append("## Largest Classes (by Method count)")
         for cls, count in self.get_largest_classes():
              lines.append(f"- `{cls}`: {count} methods")
@@ -0,0 +1,183 @@
+"""code_intel.scan_cache
+
+Persistent, incremental scan cache.
+
+For every scanned file the cache stores the ``FileSummary`` produced by the
+scanner (definitions, imports and raw unresolved references) together with the
+file's resolved Pass 2 relationships. Entries are keyed by path and validated
+against the file's mtime and size; when those differ the content hash decides,
+so touching a file without editing it does not invalidate anything.
+
+On the next run ``ProjectScanner`` re-parses only the files whose entry is
+stale and re-resolves only the files that may reference a changed module.
+
+The cache is plain JSON (summaries flattened to lists), so loading a cache
+file cannot run code, whoever wrote it. A file that does not have the
+expected shape is ignored like a stale one.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from code_intel.scanner import FileSummary
+
+CACHE_VERSION = 4
+CACHE_FILENAME = ".scan_cache.json"
+
+
+@dataclass
+class CachedFile:
+    """
+    One cache entry.
+
+    Attributes:
+        mtime_ns (int): File modification time when it was summarized.
+        size (int): File size in bytes.
+        summary (FileSummary): Per-file definitions, imports and raw references.
+        relationships (List[Tuple[str, str, str, Optional[int]]]): Resolved (source, target, type, line) edges.
+    """
+    mtime_ns: int
+    size: int
+    summary: FileSummary
+    relationships: List[Tuple[str, str, str, Optional[int]]]
+
+
+class ScanCache:
+    """
+    On-disk store of ``CachedFile`` entries for one source root.
+
+    Args:
+        path (str): Location of the cache file.
+        root_path (str): Project root the entries belong to. A cache written for
+            a different root (module IDs would differ) is ignored.
+    """
+    def __init__(self, path: str, root_path: str):
+        self.path = path
+        self.root_path = os.path.abspath(root_path)
+        self._entries: Dict[str, CachedFile] = {}
+        self._stats: Dict[str, Tuple[int, int]] = {}
+        self._dirty = False
+
+    def load(self) -> None:
+        """Loads the cache file if it exists and matches this root and version."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(payload, dict):
+            return
+        if payload.get("version") != CACHE_VERSION or payload.get("root_path") != self.root_path:
+            return
+        try:
+            self._entries = {path: _decode_entry(path, data) for path, data in payload["entries"].items()}
+        except (KeyError, TypeError, ValueError, AttributeError):
+            self._entries = {}
+
+    def save(self) -> None:
+        """Writes the cache atomically (only if something changed)."""
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        payload = {
+            "version": CACHE_VERSION,
+            "root_path": self.root_path,
+            "entries": {path: _encode_entry(entry) for path, entry in self._entries.items()},
+        }
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def lookup(self, file_path: str, module_id: str) -> Optional[CachedFile]:
+        """Returns the entry for ``file_path`` if it is still valid, else None."""
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        # Remembered so store() records the state the file had before parsing.
+        self._stats[file_path] = (st.st_mtime_ns, st.st_size)
+
+        entry = self._entries.get(file_path)
+        if entry is None or entry.summary.module_id != module_id:
+            return None
+        if entry.mtime_ns == st.st_mtime_ns and entry.size == st.st_size:
+            return entry
+        if entry.size != st.st_size or entry.summary.digest is None:
+            return None
+
+        # Same size, new mtime: compare content before invalidating.
+        if _file_digest(file_path) != entry.summary.digest:
+            return None
+        entry.mtime_ns = st.st_mtime_ns
+        self._dirty = True
+        return entry
+
+    def store(self, summary: FileSummary, relationships: List[Tuple[str, str, str, Optional[int]]]) -> None:
+        """Records (or refreshes) the entry for ``summary.file_path``."""
+        stat = self._stats.get(summary.file_path)
+        if stat is None:
+            try:
+                st = os.stat(summary.file_path)
+            except OSError:
+                return
+            stat = (st.st_mtime_ns, st.st_size)
+        self._entries[summary.file_path] = CachedFile(stat[0], stat[1], summary, relationships)
+        self._dirty = True
+
+    def prune(self, file_paths: List[str]) -> List[str]:
+        """Drops entries for files no longer present; returns their module IDs."""
+        keep = set(file_paths)
+        removed = [path for path in self._entries if path not in keep]
+        module_ids = [self._entries.pop(path).summary.module_id for path in removed]
+        if removed:
+            self._dirty = True
+        return module_ids
+
+
+def _encode_entry(entry: CachedFile) -> List[Any]:
+    summary = entry.summary
+    return [
+        entry.mtime_ns,
+        entry.size,
+        summary.module_id,
+        summary.entities,
+        summary.defines,
+        summary.imports,
+        summary.references,
+        summary.parsed,
+        summary.error,
+        summary.digest,
+        entry.relationships,
+    ]
+
+
+def _decode_entry(file_path: str, data: List[Any]) -> CachedFile:
+    """Inverse of ``_encode_entry``; JSON arrays become the tuples the scanner uses."""
+    mtime_ns, size, module_id, entities, defines, imports, references, parsed, error, digest, relationships = data
+    summary = FileSummary(
+        file_path,
+        module_id,
+        entities=[tuple(item) for item in entities],
+        defines=[tuple(item) for item in defines],
+        imports=[tuple(item) for item in imports],
+        references=[tuple(item) for item in references],
+        parsed=parsed,
+        error=error,
+        digest=digest,
+    )
+    return CachedFile(int(mtime_ns), int(size), summary, [tuple(item) for item in relationships])
+
+
+def _file_digest(file_path: str) -> Optional[str]:
+    try:
+        with open(file_path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
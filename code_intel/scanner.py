@@ -4,8 +4,17 @@ Static analysis for Python projects.
 
 This scanner performs a two-pass walk over Python source files:
 1) Pass 1 extracts definitions (modules, classes, functions, methods).
-2) Pass 2 extracts relationships (imports, calls, inheritance) using a simple
-    import-resolution map built per file.
+2) Pass 2 extracts relationships (imports, calls, inheritance) using the
+    file's import map and a ``SymbolIndex`` built once after Pass 1.
+
+Each file is read and parsed once: Pass 1 stores the AST in a ``SourceCache``
+and Pass 2 reuses it (re-parsing only modules evicted by the cache budget).
+In Pass 1, discovery, reads and parsing run ahead of the visitor in a
+``ScanPipeline``.
+
+Parallel (``jobs > 1``) and incremental (``ScanCache``) scans work from compact
+per-file ``FileSummary`` records instead: definitions and raw references are
+extracted per file, then references are resolved against the merged graph.
 
 The goal is a lightweight, dependency-free (stdlib-only) analyzer that is
 robust on Windows paths.
@@ -14,13 +23,29 @@ robust on Windows paths.
 from __future__ import annotations
 
 import ast
+import contextlib
+import hashlib
 import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Set, Tuple
 
-from code_intel.entities import ClassEntity, FunctionEntity, MethodEntity, ModuleEntity
+from code_intel.discovery import FileDiscovery
+from code_intel.entities import ENTITY_CLASSES, ClassEntity, FunctionEntity, MethodEntity, ModuleEntity
 from code_intel.graph import CodeGraph
+from code_intel.pipeline import DEFAULT_READERS, ScanPipeline
 from code_intel.relations import REL_CALLS, REL_DEFINES, REL_IMPORTS, REL_INHERITS, Relationship
+from code_intel.sources import ParsedModule, SourceCache
+from code_intel.symbols import INIT_SUFFIX, SymbolIndex, package_of
+
+if TYPE_CHECKING:
+    from code_intel.instrument import Profiler
+    from code_intel.scan_cache import ScanCache
+
+# Memo sentinel: distinguishes "not looked up yet" from a cached None.
+_UNRESOLVED = object()
 
 class DefinitionVisitor(ast.NodeVisitor):
     """
@@ -126,11 +151,33 @@ class RelationshipVisitor(ast.NodeVisitor):
     """
     Pass 2 Visitor: Extracts relationships (CALLS, INHERITS usage, IMPORTS).
     Why Pass 2? Because we need to know all definitions to resolve references.
+
+    Every raw reference found in the tree (rel_type, source_id, name, line) can
+    also be appended to ``references``. With ``graph=None`` the visitor only records them;
+    they are resolved later via ``link`` (used by the parallel scanner, where the
+    tree lives in a worker process and the graph in the parent).
+
+    Names are resolved through a ``SymbolIndex`` that should be built once
+    after Pass 1 and passed to every visitor.
     """
-    def __init__(self, graph: CodeGraph, file_path: str, module_id: str, imports_map: Dict[str, str]):
+    def __init__(
+        self,
+        graph: Optional[CodeGraph],
+        file_path: str,
+        module_id: str,
+        imports_map: Dict[str, str],
+        references: Optional[List[Tuple[str, str, str, int]]] = None,
+        index: Optional[SymbolIndex] = None,
+    ):
         self.graph = graph
         self.module_id = module_id
         self.scope_stack: List[str] = [module_id]
+        self.references = references
+        if index is None and graph is not None:
+            index = SymbolIndex(graph.nodes)
+        self.index = index
+        # name -> resolved ID (or None), for this file's imports
+        self._resolved: Dict[str, Optional[str]] = {}
         
         # Map of local_alias -> full_qualified_name (e.g. "np" -> "numpy", "MyClass" -> "other_mod.MyClass")
         # Included from imports_map passed in
@@ -156,9 +203,8 @@ class RelationshipVisitor(ast.NodeVisitor):
         for base in node.bases:
             base_name = self._get_full_name(base)
             # Resolve against imports or local module
-            resolved_id = self._resolve_id(base_name)
-            if resolved_id:
-                 self.graph.add_relationship(Relationship(entity_id, resolved_id, REL_INHERITS))
+            if base_name:
+                self._link(entity_id, base_name, REL_INHERITS, node.lineno)
         
         self.scope_stack.append(entity_id)
         self.generic_visit(node)
@@ -169,12 +215,35 @@ class RelationshipVisitor(ast.NodeVisitor):
         # Extract the name of the function being called
         func_name = self._get_full_name(node.func)
         if func_name:
-            target_id = self._resolve_id(func_name)
-            if target_id and self.graph.get_entity(target_id):
-                self.graph.add_relationship(Relationship(self.current_context, target_id, REL_CALLS))
+            self._link(self.current_context, func_name, REL_CALLS, node.lineno)
         
         self.generic_visit(node)
 
+    def _link(self, source_id: str, name: str, rel_type: str, line: int) -> None:
+        if self.references is not None:
+            self.references.append((rel_type, source_id, name, line))
+        if self.graph is not None:
+            self.link(source_id, name, rel_type, line)
+
+    def link(self, source_id: str, name: str, rel_type: str, line: Optional[int] = None) -> None:
+        """Resolves ``name`` and adds the relationship (with its source line) to the graph."""
+        target_id = self.resolve_reference(name, rel_type, source_id)
+        if target_id:
+            lines = [line] if line is not None else None
+            self.graph.add_relationship(Relationship(source_id, target_id, rel_type, lines=lines))
+
+    def resolve_reference(self, name: str, rel_type: str, source_id: Optional[str] = None) -> Optional[str]:
+        """
+        Returns the target ID for a raw reference, or None if it does not resolve.
+        CALLS targets must be known entities; INHERITS targets may be external.
+        """
+        target_id = self._resolve_id(name, source_id)
+        if not target_id:
+            return None
+        if rel_type == REL_CALLS and target_id not in self.index.nodes:
+            return None
+        return target_id
+
     def _get_full_name(self, node) -> Optional[str]:
         if isinstance(node, ast.Name):
             return node.id
@@ -185,67 +254,160 @@ class RelationshipVisitor(ast.NodeVisitor):
                 return f"{value_name}.{node.attr}"
         return None
 
-    def _resolve_id(self, name: str) -> Optional[str]:
+    def _resolve_id(self, name: str, source_id: Optional[str] = None) -> Optional[str]:
         """
         Resolves a name (e.g. 'MyClass' or 'utils.helper') to a canonical Entity ID.
-        Uses imports and simple heuristics.
+        Uses imports and the shared ``SymbolIndex``; results are memoized per file.
         """
         if not name: return None
 
-        # 1. Check if it's a direct import alias
+        resolved = self._resolved.get(name, _UNRESOLVED)
+        if resolved is not _UNRESOLVED:
+            return resolved
+
+        index = self.index
+        parts = name.split('.', 1)
+        if len(parts) > 1 and parts[0] in ("self", "cls"):
+            # Depends on the enclosing class, so not memoized by name.
+            return index.member(source_id or self.current_context, parts[1])
+
+        resolved = None
+        # 1. Direct import alias, followed through package re-exports
         # e.g. from utils import helper (helper -> utils.helper)
         if name in self.scope_imports:
-            return self.scope_imports[name]
+            resolved = index.canonical(self.scope_imports[name])
 
-        # 2. Check splits (e.g. 'os.path.join') - HARD without full type inference.
-        # We assume standard project structure: 'module.function'.
-        
-        # 3. Check current module (local definition)
-        # e.g. function defined in same file
-        local_candidate = f"{self.module_id}.{name}"
-        if self.graph.get_entity(local_candidate):
-            return local_candidate
-            
-        # 4. Check global imports (e.g. import utils -> utils.helper)
-        parts = name.split('.', 1)
-        if len(parts) > 1:
-            base, suffix = parts[0], parts[1]
-            if base in self.scope_imports:
-                # e.g. import utils; utils.helper -> utilsId.helper
-                # But imports_map maps 'utils' -> 'utils_module_id' (or path)
-                # This is tricky. Let's assume the import map stores the fully qualified module name.
-                resolved_base = self.scope_imports[base]
-                return f"{resolved_base}.{suffix}"
-                
-        return None
+        # 2. Local definition in the current module ('helper', 'MyClass.run')
+        if resolved is None:
+            resolved = index.local(self.module_id, name)
+
+        # 3. Attribute of an imported module (import utils; utils.helper).
+        # The guess is kept even if unknown, e.g. external INHERITS targets.
+        if resolved is None and len(parts) > 1 and parts[0] in self.scope_imports:
+            resolved = index.canonical(f"{self.scope_imports[parts[0]]}.{parts[1]}")
+
+        self._resolved[name] = resolved
+        return resolved
 
 class ProjectScanner:
     """
     Orchestrates the scanning process.
+
+    Args:
+        root_path (str): Root directory of the project to scan.
+        graph (CodeGraph): Graph that receives entities and relationships.
+        cache (Optional[SourceCache]): Parsed-module cache shared by both passes.
+            Pass a bounded ``SourceCache(max_bytes=...)`` to cap memory on very
+            large repositories.
+        jobs (int): Number of worker processes. With ``jobs > 1`` files are
+            parsed and visited in a process pool (the cache is not populated).
+        scan_cache (Optional[ScanCache]): Persistent per-file cache. When given,
+            unchanged files are not re-parsed and only the files affected by a
+            change are re-resolved.
+        discovery (Optional[FileDiscovery]): File walker with the ignore and
+            include/exclude rules to apply (defaults to ``FileDiscovery(root_path)``).
+        readers (int): Reader threads of the discover/read/parse pipeline used
+            by serial scans. ``0`` (the default) walks the tree first and reads files inline.
+        live (bool): Keep every file's summary and resolved edges so that
+            ``update_files`` can apply edits to the graph in place (watch mode).
+        profiler (Optional[Profiler]): Receives the discovery / pass1 / index /
+            pass2 phase timings and per-file parse statistics (``--profile``).
     """
-    def __init__(self, root_path: str, graph: CodeGraph):
+    def __init__(
+        self,
+        root_path: str,
+        graph: CodeGraph,
+        cache: Optional[SourceCache] = None,
+        jobs: int = 1,
+        scan_cache: Optional["ScanCache"] = None,
+        discovery: Optional[FileDiscovery] = None,
+        readers: int = DEFAULT_READERS,
+        live: bool = False,
+        profiler: Optional["Profiler"] = None,
+    ):
         self.root_path = os.path.abspath(root_path)
+        self.discovery = discovery if discovery is not None else FileDiscovery(self.root_path)
         self.graph = graph
+        self.cache = cache if cache is not None else SourceCache()
+        self.jobs = max(1, jobs)
+        self.scan_cache = scan_cache
+        self.readers = max(0, readers)
+        # Built after Pass 1, shared by every file in Pass 2
+        self.index: Optional[SymbolIndex] = None
+
+        self.live = live
+        # file path -> summary / resolved (source, target, type, line) edges, with live=True
+        self.summaries: Dict[str, FileSummary] = {}
+        self.resolved: Dict[str, List[Tuple[str, str, str, Optional[int]]]] = {}
+        self.profiler = profiler
 
     def scan(self):
         """Runs the two-pass scan on the project."""
-        python_files = self._find_files()
-
-        print(f"Scanning {len(python_files)} files for definitions...")
-        for file_path in python_files:
-            self._scan_definitions(file_path)
+        if self.scan_cache is not None or self.jobs > 1 or self.live:
+            with self._phase("discovery"):
+                python_files = self._find_files()
+            self._scan_summaries(python_files)
+            return
 
+        python_files = None
+        if self.readers == 0:
+            # With readers, discovery overlaps Pass 1 and is timed as part of it.
+            with self._phase("discovery"):
+                python_files = self._find_files()
+        with self._phase("pass1"):
+            python_files = self._pass_definitions(python_files)
+        with self._phase("index"):
+            self._build_index(python_files)
         print("Scanning relationships...")
+        with self._phase("pass2"):
+            self._pass_relationships(python_files)
+
+    def _phase(self, name: str):
+        """Profiler phase context (a no-op without a profiler)."""
+        return self.profiler.phase(name) if self.profiler is not None else contextlib.nullcontext()
+
+    def _record_file(self, parsed: ParsedModule) -> None:
+        if self.profiler is not None:
+            self.profiler.record_file(parsed)
+
+    def _pass_definitions(self, python_files: Optional[List[str]] = None) -> List[str]:
+        """Pass 1 over ``python_files`` (default: discovered files). Returns the files visited."""
+        if self.readers > 0:
+            # Pass 1 starts on the first file while discovery is still walking.
+            print(f"Scanning files for definitions ({self.readers} readers)...")
+            files = iter(python_files) if python_files is not None else self.discovery.iter_files()
+            python_files = []
+            pipeline = ScanPipeline(files, self._get_module_id, readers=self.readers)
+            for parsed in pipeline:
+                python_files.append(parsed.file_path)
+                self._visit_definitions(self.cache.put(parsed))
+            print(f"Found {len(python_files)} files")
+        else:
+            if python_files is None:
+                python_files = self._find_files()
+            print(f"Scanning {len(python_files)} files for definitions...")
+            for file_path in python_files:
+                self._scan_definitions(file_path)
+        return python_files
+
+    def _build_index(self, python_files: List[str]) -> None:
+        """Builds the SymbolIndex shared by Pass 2, once Pass 1 is done."""
+        package_imports = {}
+        for file_path in python_files:
+            module_id = self._get_module_id(file_path)
+            if module_id.endswith(INIT_SUFFIX):
+                tree = self.cache.get(file_path, module_id).tree
+                if tree is not None:
+                    package_imports[module_id] = collect_imports(tree, module_id)
+        self.index = SymbolIndex(self.graph.nodes, package_imports)
+
+    def _pass_relationships(self, python_files: List[str]) -> None:
+        """Pass 2: links the relationships of every file."""
         for file_path in python_files:
             self._scan_relationships(file_path)
 
     def _find_files(self) -> List[str]:
-        py_files: List[str] = []
-        for root, _, files in os.walk(self.root_path):
-            for file in files:
-                if file.endswith(".py"):
-                    py_files.append(os.path.join(root, file))
-        return py_files
+        return self.discovery.find_files()
 
     def _get_module_id(self, file_path: str) -> str:
         rel_path = os.path.relpath(file_path, self.root_path)
@@ -253,60 +415,386 @@ class ProjectScanner:
         return name_no_ext.replace(os.sep, ".")
 
     def _scan_definitions(self, file_path: str) -> None:
-        module_id = self._get_module_id(file_path)
+        self._visit_definitions(self.cache.get(file_path, self._get_module_id(file_path)))
+
+    def _visit_definitions(self, parsed: ParsedModule) -> None:
+        file_path, module_id = parsed.file_path, parsed.module_id
+        self._record_file(parsed)
 
         mod_entity = ModuleEntity(module_id, module_id.split(".")[-1], file_path)
         self.graph.add_entity(mod_entity)
 
+        if parsed.tree is None:
+            print(f"Error parsing {file_path}: {parsed.error}")
+            return
+
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                source = f.read()
-            tree = ast.parse(source, filename=file_path)
-            DefinitionVisitor(self.graph, file_path, module_id).visit(tree)
+            DefinitionVisitor(self.graph, file_path, module_id).visit(parsed.tree)
         except Exception as e:
             print(f"Error parsing {file_path}: {e}")
 
     def _scan_relationships(self, file_path: str) -> None:
         module_id = self._get_module_id(file_path)
 
+        # Reuses the tree parsed in pass 1 (re-parsed only if it was evicted).
+        parsed = self.cache.get(file_path, module_id)
+        if parsed.tree is None:
+            # Parsing errors already reported in pass 1.
+            return
+
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                source = f.read()
-            tree = ast.parse(source, filename=file_path)
-            imports_map = self._extract_imports(tree, module_id)
-            RelationshipVisitor(self.graph, file_path, module_id, imports_map).visit(tree)
+            imports_map = self._extract_imports(parsed.tree, module_id)
+            RelationshipVisitor(self.graph, file_path, module_id, imports_map, index=self.index).visit(parsed.tree)
         except Exception:
-            # Parsing errors already reported in pass 1.
             return
 
     def _extract_imports(self, tree: ast.AST, current_module_id: str) -> Dict[str, str]:
+        return self._apply_imports(collect_imports(tree, current_module_id), current_module_id)
+
+    def _apply_imports(self, imports: List[Tuple[str, str, str]], current_module_id: str) -> Dict[str, str]:
+        """Adds IMPORTS edges for the collected imports and returns the alias map."""
         imports_map: Dict[str, str] = {}
+        for local_name, qualified_name, imported_module in imports:
+            imports_map[local_name] = qualified_name
+            self.graph.add_relationship(Relationship(current_module_id, imported_module, REL_IMPORTS))
+        return imports_map
 
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    local_name = alias.asname if alias.asname else alias.name
-                    imports_map[local_name] = alias.name
-                    self.graph.add_relationship(Relationship(current_module_id, alias.name, REL_IMPORTS))
-
-            elif isinstance(node, ast.ImportFrom):
-                module = node.module or ""
-
-                # Resolve relative imports (best-effort)
-                if node.level > 0:
-                    parts = current_module_id.split(".")
-                    base_parts = parts[:-node.level] if len(parts) >= node.level else []
-                    full_module_name = ".".join([p for p in (base_parts + ([module] if module else [])) if p])
-                else:
-                    full_module_name = module
-
-                for alias in node.names:
-                    local_name = alias.asname if alias.asname else alias.name
-                    if full_module_name:
-                        imports_map[local_name] = f"{full_module_name}.{alias.name}"
-                        self.graph.add_relationship(Relationship(current_module_id, full_module_name, REL_IMPORTS))
+    def _scan_summaries(self, python_files: List[str]) -> None:
+        """
+        Runs both passes from per-file ``FileSummary`` records.
 
-        return imports_map
+        Summaries come from the persistent scan cache when a file is unchanged,
+        and are otherwise produced by ``summarize_module`` (in a process pool
+        when ``jobs > 1``). They are merged in file order, so the graph is
+        identical to a serial scan.
+        """
+        module_ids = [self._get_module_id(p) for p in python_files]
+        summaries: List[Optional[FileSummary]] = [None] * len(python_files)
+        cached_relationships: Dict[int, List[Tuple[str, str, str, Optional[int]]]] = {}
+
+        if self.scan_cache is not None:
+            for i, file_path in enumerate(python_files):
+                entry = self.scan_cache.lookup(file_path, module_ids[i])
+                if entry is not None:
+                    summaries[i] = entry.summary
+                    cached_relationships[i] = entry.relationships
+
+        pending = [i for i, summary in enumerate(summaries) if summary is None]
+        workers = f" ({self.jobs} workers)" if self.jobs > 1 else ""
+        reused = f", {len(python_files) - len(pending)} unchanged" if self.scan_cache is not None else ""
+        print(f"Scanning {len(python_files)} files for definitions{workers}{reused}...")
+
+        with self._phase("pass1"):
+            fresh = self._summarize([python_files[i] for i in pending], [module_ids[i] for i in pending])
+            for i in range(len(python_files)):
+                if summaries[i] is None:
+                    summaries[i] = next(fresh)
+                self._merge_definitions(summaries[i])
+        if self.profiler is not None:
+            self.profiler.count("files_reused", len(python_files) - len(pending))
+
+        with self._phase("index"):
+            self.index = SymbolIndex(
+                self.graph.nodes,
+                {s.module_id: s.imports for s in summaries if s.module_id.endswith(INIT_SUFFIX)},
+            )
+
+        # Only changed files and the files whose names may resolve into a
+        # changed (or deleted) module need cross-file resolution again.
+        changed_modules = {summaries[i].module_id for i in pending}
+        if self.scan_cache is not None:
+            changed_modules.update(self.scan_cache.prune(python_files))
+        changed_prefixes = {prefix for m in changed_modules for prefix in _dotted_prefixes(m)}
+        changed_packages = _reexporting_packages(summaries, changed_modules)
+
+        print("Scanning relationships...")
+        with self._phase("pass2"):
+            for i, summary in enumerate(summaries):
+                relationships = cached_relationships.get(i)
+                if relationships is None or _depends_on(summary, changed_modules, changed_prefixes, changed_packages):
+                    relationships = self._resolve_summary(summary)
+                    if self.scan_cache is not None:
+                        self.scan_cache.store(summary, relationships)
+                self._add_resolved(relationships)
+                if self.live:
+                    self.summaries[summary.file_path] = summary
+                    self.resolved[summary.file_path] = relationships
+
+        if self.scan_cache is not None:
+            with self._phase("cache_save"):
+                self.scan_cache.save()
+
+    def update_files(self, changed: List[str], deleted: List[str] = ()) -> Set[str]:
+        """
+        Applies file edits to a live scan (``live=True``) in place.
+
+        The contribution of every changed (new or modified) and deleted file
+        is retracted from the graph, changed files are summarized again, and
+        they are re-resolved together with the files whose names may resolve
+        into an affected module.
+
+        Returns the facets that changed: "sources", "entities" and the
+        relationship types whose edges differ (e.g. REL_CALLS).
+        """
+        changed_paths = set(changed)
+        facets: Set[str] = set()
+        changed_modules: Set[str] = set()
+        previous: Dict[str, List[Tuple[str, str, str, Optional[int]]]] = {}
+
+        for file_path in list(changed) + list(deleted):
+            facets.add("sources")
+            self.cache.release(file_path)
+            old = self.summaries.pop(file_path, None)
+            if old is None:
+                facets.add("entities")  # a new file
+                continue
+            changed_modules.add(old.module_id)
+            self.graph.remove_file(file_path)
+            self.index.remove_module(old.module_id)
+            previous[file_path] = self.resolved.pop(file_path, [])
+            if file_path not in changed_paths:
+                facets.add("entities")
+                facets.update(rel_type for _, _, rel_type, _ in previous[file_path])
+                if old.defines:
+                    facets.add(REL_DEFINES)
+                continue
+
+            summary = summarize_module(self.cache.get(file_path, self._get_module_id(file_path)))
+            if summary.entities != old.entities:
+                facets.add("entities")
+            if summary.defines != old.defines:
+                facets.add(REL_DEFINES)
+            self.summaries[file_path] = summary
+
+        for file_path in changed:
+            summary = self.summaries.get(file_path)
+            if summary is None:
+                summary = self.summaries[file_path] = summarize_module(
+                    self.cache.get(file_path, self._get_module_id(file_path))
+                )
+            self._merge_definitions(summary)
+            self.index.add_module((self.graph.nodes[e[1]] for e in summary.entities), summary.imports)
+            changed_modules.add(summary.module_id)
+
+        changed_prefixes = {prefix for m in changed_modules for prefix in _dotted_prefixes(m)}
+        changed_packages = _reexporting_packages(list(self.summaries.values()), changed_modules)
+        for file_path, summary in self.summaries.items():
+            if file_path in changed_paths:
+                old_edges = previous.get(file_path, [])
+            elif _depends_on(summary, changed_modules, changed_prefixes, changed_packages):
+                old_edges = self.resolved.get(file_path, [])
+                for key in {(s, t, rel_type) for s, t, rel_type, _ in old_edges}:
+                    self.graph.remove_edge(*key)
+            else:
+                continue
+            relationships = self._resolve_summary(summary)
+            self._add_resolved(relationships)
+            self.resolved[file_path] = relationships
+            facets.update(_changed_types(old_edges, relationships, self.graph.track_call_sites))
+
+        return facets
+
+    def _add_resolved(self, relationships: List[Tuple[str, str, str, Optional[int]]]) -> None:
+        for source_id, target_id, rel_type, line in relationships:
+            lines = [line] if line is not None else None
+            self.graph.add_relationship(Relationship(source_id, target_id, rel_type, lines=lines))
+
+    def _summarize(self, file_paths: List[str], module_ids: List[str]) -> Iterator[FileSummary]:
+        """Yields a summary per file, in order."""
+        if self.jobs > 1 and len(file_paths) > 1:
+            chunksize = max(1, len(file_paths) // (self.jobs * 8))
+            with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+                yield from pool.map(summarize_file, file_paths, module_ids, chunksize=chunksize)
+        else:
+            for file_path, module_id in zip(file_paths, module_ids):
+                parsed = self.cache.get(file_path, module_id)
+                self._record_file(parsed)
+                yield summarize_module(parsed)
+
+    def _merge_definitions(self, summary: FileSummary) -> None:
+        for entity_type, entity_id, name, line, parent_id in summary.entities:
+            entity_cls = ENTITY_CLASSES[entity_type]
+            self.graph.add_entity(entity_cls(entity_id, name, summary.file_path, line, parent_id))
+        for class_id, method_id, count in summary.defines:
+            self.graph.add_relationship(Relationship(class_id, method_id, REL_DEFINES, count))
+        if summary.error:
+            print(f"Error parsing {summary.file_path}: {summary.error}")
+
+    def _resolve_summary(self, summary: FileSummary) -> List[Tuple[str, str, str, Optional[int]]]:
+        """Resolves a file's imports and raw references into (source, target, type, line) edges."""
+        if not summary.parsed:
+            return []
+        relationships: List[Tuple[str, str, str, Optional[int]]] = []
+        imports_map: Dict[str, str] = {}
+        for local_name, qualified_name, imported_module in summary.imports:
+            imports_map[local_name] = qualified_name
+            relationships.append((summary.module_id, imported_module, REL_IMPORTS, None))
+
+        visitor = RelationshipVisitor(self.graph, summary.file_path, summary.module_id, imports_map, index=self.index)
+        for rel_type, source_id, name, line in summary.references:
+            target_id = visitor.resolve_reference(name, rel_type, source_id)
+            if target_id:
+                relationships.append((source_id, target_id, rel_type, line))
+        return relationships
+
+
+def _changed_types(
+    old: List[Tuple[str, str, str, Optional[int]]],
+    new: List[Tuple[str, str, str, Optional[int]]],
+    with_lines: bool = False,
+) -> Set[str]:
+    """Relationship types whose edges (and call-site lines, if tracked) differ."""
+    if old == new:
+        return set()
+    width = 4 if with_lines else 3
+    diff = Counter(rel[:width] for rel in old)
+    diff.subtract(rel[:width] for rel in new)
+    return {key[2] for key, count in diff.items() if count}
+
+
+def _dotted_prefixes(name: str) -> List[str]:
+    """'a.b.c' -> ['a', 'a.b', 'a.b.c']"""
+    parts = name.split(".")
+    return [".".join(parts[: i + 1]) for i in range(len(parts))]
+
+
+def _depends_on(
+    summary: FileSummary,
+    changed_modules: Set[str],
+    changed_prefixes: Set[str],
+    changed_packages: Set[str] = frozenset(),
+) -> bool:
+    """
+    True if any name the file resolves against (its own module or an import)
+    lies inside, or contains, one of the changed modules, or is imported
+    through a package whose re-exports may have changed.
+    """
+    names = [summary.module_id] + [qualified_name for _, qualified_name, _ in summary.imports]
+    for i, name in enumerate(names):
+        if name in changed_prefixes:
+            return True
+        for prefix in _dotted_prefixes(name):
+            if prefix in changed_modules or (i and prefix in changed_packages):
+                return True
+    return False
+
+
+def _reexporting_packages(summaries: List[FileSummary], changed_modules: Set[str]) -> Set[str]:
+    """
+    Packages whose ``__init__`` exports may resolve differently after the
+    change: the ``__init__`` itself changed, or it (transitively) re-exports
+    from a changed module.
+    """
+    inits = {package_of(s.module_id): s for s in summaries if s.module_id.endswith(INIT_SUFFIX)}
+    changed = set(changed_modules)
+    packages: Set[str] = set()
+    while True:
+        prefixes = {prefix for m in changed for prefix in _dotted_prefixes(m)}
+        added = {
+            package for package, summary in inits.items()
+            if package not in packages and _depends_on(summary, changed, prefixes, packages)
+        }
+        if not added:
+            return packages
+        packages |= added
+        changed |= {inits[package].module_id for package in added}
+
+
+def collect_imports(tree: ast.AST, current_module_id: str) -> List[Tuple[str, str, str]]:
+    """
+    Lists the imports of a module as (local_name, qualified_name, imported_module).
+
+    ``qualified_name`` is what the local alias refers to (e.g. "utils.helper") and
+    ``imported_module`` the target of the IMPORTS edge (e.g. "utils").
+    """
+    imports: List[Tuple[str, str, str]] = []
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                local_name = alias.asname if alias.asname else alias.name
+                imports.append((local_name, alias.name, alias.name))
+
+        elif isinstance(node, ast.ImportFrom):
+            module = node.module or ""
+
+            # Resolve relative imports (best-effort)
+            if node.level > 0:
+                parts = current_module_id.split(".")
+                base_parts = parts[:-node.level] if len(parts) >= node.level else []
+                full_module_name = ".".join([p for p in (base_parts + ([module] if module else [])) if p])
+            else:
+                full_module_name = module
+
+            for alias in node.names:
+                local_name = alias.asname if alias.asname else alias.name
+                if full_module_name:
+                    imports.append((local_name, f"{full_module_name}.{alias.name}", full_module_name))
+
+    return imports
+
+
+@dataclass
+class FileSummary:
+    """
+    Compact, picklable result of scanning one file in a worker process.
+
+    Attributes:
+        file_path (str): Absolute path to the file.
+        module_id (str): Dotted module ID.
+        entities (List[Tuple]): (type, id, name, line_number, parent_id) in definition order.
+        defines (List[Tuple[str, str, int]]): (class_id, method_id, count) DEFINES edges.
+        imports (List[Tuple[str, str, str]]): Output of ``collect_imports``.
+        references (List[Tuple[str, str, str, int]]): Unresolved (rel_type, source_id, name, line).
+        parsed (bool): Whether the file parsed (relationships are only linked if so).
+        error (Optional[str]): Error to report for this file, if any.
+        digest (Optional[str]): SHA-256 of the source that was summarized.
+    """
+    file_path: str
+    module_id: str
+    entities: List[Tuple[str, str, str, int, Optional[str]]] = field(default_factory=list)
+    defines: List[Tuple[str, str, int]] = field(default_factory=list)
+    imports: List[Tuple[str, str, str]] = field(default_factory=list)
+    references: List[Tuple[str, str, str, int]] = field(default_factory=list)
+    parsed: bool = False
+    error: Optional[str] = None
+    digest: Optional[str] = None
+
+
+def summarize_file(file_path: str, module_id: str) -> FileSummary:
+    """Parses and summarizes one file. Top-level so it can be a ProcessPoolExecutor task."""
+    return summarize_module(SourceCache().get(file_path, module_id))
+
+
+def summarize_module(parsed: ParsedModule) -> FileSummary:
+    """Runs both visitors on a parsed module without a shared graph."""
+    file_path, module_id = parsed.file_path, parsed.module_id
+    summary = FileSummary(file_path, module_id)
+    if parsed.source is not None:
+        summary.digest = hashlib.sha256(parsed.source).hexdigest()
+
+    # Definitions only ever look up parents defined in the same file, so a
+    # file-local graph reproduces exactly what a serial scan would add.
+    local_graph = CodeGraph()
+    local_graph.add_entity(ModuleEntity(module_id, module_id.split(".")[-1], file_path))
+
+    if parsed.tree is None:
+        summary.error = parsed.error
+    else:
+        summary.parsed = True
+        try:
+            DefinitionVisitor(local_graph, file_path, module_id).visit(parsed.tree)
+        except Exception as e:
+            summary.error = str(e)
+        try:
+            summary.imports = collect_imports(parsed.tree, module_id)
+            RelationshipVisitor(None, file_path, module_id, {}, references=summary.references).visit(parsed.tree)
+        except Exception:
+            pass
+
+    summary.entities = [(e.type, e.id, e.name, e.line_number, e.parent_id) for e in local_graph.nodes.values()]
+    summary.defines = [(r.source_id, r.target_id, r.count) for r in local_graph.edges]
+    return summary
 
 
 class LocalScanner:
@@ -315,8 +803,13 @@ class LocalScanner:
     This intentionally does not build entities/relationships; it only lists files.
     """
 
-    def __init__(self, repo_path: str):
+    def __init__(self, repo_path: str, discovery: Optional[FileDiscovery] = None):
         self.repo_path = Path(repo_path)
+        self.discovery = discovery if discovery is not None else FileDiscovery(str(self.repo_path))
 
     def get_files(self) -> List[str]:
-        return [str(p) for p in self.repo_path.rglob("*.py")]
\ No newline at end of file
+        return self.discovery.find_files()
+
+    def iter_files(self) -> Iterator[str]:
+        """Yields files as the walk finds them."""
+        return self.discovery.iter_files()
\ No newline at end of file
@@ -0,0 +1,277 @@
+"""code_intel.serialize
+
+Streaming JSON output for graph-sized data.
+
+``json.dump`` needs the whole document in memory, which for large graphs means
+building a list of dicts for every entity and edge first. The writers here walk
+``graph.nodes`` / ``graph.edges`` and write each record straight to the file
+handle in chunks, so peak memory stays flat regardless of repository size.
+
+With the default ``indent=2`` the output is byte-for-byte what
+``json.dump(..., indent=2)`` produces; ``indent=None`` writes compact JSON.
+
+``json.dump`` only uses the C encoder for compact output; indented output
+goes through its pure-Python generator encoder. ``_Indenter`` formats
+indented values directly instead. Strings use the C string escaper,
+object keys are escaped once per writer, and each record becomes one
+string. Compact arrays are encoded a whole chunk at a time by a single
+reused C-backed ``JSONEncoder``.
+
+The NDJSON (JSON Lines) format writes one record per line instead, so
+consumers can stream-process millions of records with constant memory.
+Any output can be compressed with the stdlib ``gzip`` or ``lzma`` codecs.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import lzma
+import os
+from collections.abc import Iterator
+from json.encoder import encode_basestring_ascii
+from typing import Any, Dict, Iterable, List, Optional, TextIO, Tuple
+
+from code_intel.graph import CodeGraph
+
+# Records are joined and written in batches of this size.
+CHUNK_SIZE = 1000
+
+FORMATS = ("json", "ndjson")
+# Compression codec -> file suffix
+COMPRESSIONS = {"gzip": ".gz", "xz": ".xz"}
+
+
+def output_path(path: str, compression: Optional[str] = None) -> str:
+    """Appends the compression suffix (e.g. ".gz") to ``path`` if needed."""
+    return path + COMPRESSIONS[compression] if compression else path
+
+
+def open_output(path: str, compression: Optional[str] = None) -> TextIO:
+    """Opens ``path`` for text writing, through gzip/lzma if requested."""
+    if compression == "gzip":
+        return gzip.open(path, "wt", encoding="utf-8")
+    if compression == "xz":
+        return lzma.open(path, "wt", encoding="utf-8")
+    if compression:
+        raise ValueError(f"Unknown compression: {compression}")
+    return open(path, "w", encoding="utf-8")
+
+
+# Distinct object keys remembered (already escaped) per writer
+_KEY_CACHE_LIMIT = 4096
+_INFINITY = float("inf")
+
+
+class _Indenter:
+    """
+    Formats values exactly like ``json.dumps(value, indent=indent)`` nested
+    ``level`` deep, without the generator machinery of the Python encoder.
+    Types it does not know (subclasses, non-string keys, ...) go through
+    ``json.dumps``.
+    """
+    def __init__(self, indent: int):
+        self.indent = indent
+        self._pads: Dict[int, str] = {}
+        self._keys: Dict[str, str] = {}
+
+    def pad(self, level: int) -> str:
+        pad = self._pads.get(level)
+        if pad is None:
+            pad = self._pads[level] = "\n" + " " * (self.indent * level)
+        return pad
+
+    def encode(self, value: Any, level: int) -> str:
+        kind = type(value)
+        if kind is str:
+            return encode_basestring_ascii(value)
+        if kind is dict:
+            if not value:
+                return "{}"
+            keys = self._keys
+            inner = self.pad(level + 1)
+            parts = []
+            for key, item in value.items():
+                prefix = keys.get(key) if type(key) is str else None
+                if prefix is None:
+                    if type(key) is not str:
+                        return self._fallback(value, level)
+                    prefix = encode_basestring_ascii(key) + ": "
+                    if len(keys) < _KEY_CACHE_LIMIT:
+                        keys[key] = prefix
+                kind = type(item)
+                if kind is str:
+                    parts.append(prefix + encode_basestring_ascii(item))
+                elif kind is int:
+                    parts.append(prefix + int.__repr__(item))
+                else:
+                    parts.append(prefix + self.encode(item, level + 1))
+            return "{" + inner + ("," + inner).join(parts) + self.pad(level) + "}"
+        if kind is list or kind is tuple:
+            if not value:
+                return "[]"
+            inner = self.pad(level + 1)
+            return "[" + inner + ("," + inner).join([self.encode(item, level + 1) for item in value]) + self.pad(level) + "]"
+        if value is None:
+            return "null"
+        if value is True:
+            return "true"
+        if value is False:
+            return "false"
+        if kind is int:
+            return int.__repr__(value)
+        if kind is float and value == value and value not in (_INFINITY, -_INFINITY):
+            return float.__repr__(value)
+        return self._fallback(value, level)
+
+    def _fallback(self, value: Any, level: int) -> str:
+        text = json.dumps(value, indent=self.indent)
+        if level and "\n" in text:
+            text = text.replace("\n", self.pad(level))
+        return text
+
+
+def _compact_encoder() -> json.JSONEncoder:
+    return json.JSONEncoder(separators=(",", ":"))
+
+
+def write_json_array(fh: TextIO, items: Iterable[Any], indent: Optional[int] = 2, level: int = 0) -> None:
+    """Writes ``items`` as a JSON array without materializing it."""
+    if indent is None:
+        _write_compact_array(fh, items)
+        return
+
+    indenter = _Indenter(indent)
+    encode = indenter.encode
+    item_sep = "," + indenter.pad(level + 1)
+    chunk: List[str] = []
+    first = True
+    for item in items:
+        chunk.append(encode(item, level + 1))
+        if len(chunk) >= CHUNK_SIZE:
+            fh.write(("[" + indenter.pad(level + 1) if first else item_sep) + item_sep.join(chunk))
+            first = False
+            chunk.clear()
+    if chunk:
+        fh.write(("[" + indenter.pad(level + 1) if first else item_sep) + item_sep.join(chunk))
+        first = False
+    fh.write("[]" if first else indenter.pad(level) + "]")
+
+
+def _write_compact_array(fh: TextIO, items: Iterable[Any]) -> None:
+    # One C-encoder call per chunk: "[a,b,c]" minus the brackets.
+    encode = _compact_encoder().encode
+    chunk: List[Any] = []
+    first = True
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= CHUNK_SIZE:
+            fh.write(("[" if first else ",") + encode(chunk)[1:-1])
+            first = False
+            chunk.clear()
+    if chunk:
+        fh.write(("[" if first else ",") + encode(chunk)[1:-1])
+        first = False
+    fh.write("[]" if first else "]")
+
+
+def write_json_object(fh: TextIO, fields: Iterable[Tuple[str, Any]], indent: Optional[int] = 2) -> None:
+    """
+    Writes a top-level JSON object from (key, value) pairs. Values that are
+    iterators (e.g. generators) are streamed with ``write_json_array``; any other
+    value is serialized normally.
+    """
+    if indent is None:
+        open_sep, field_sep, colon, close = "{", ",", ":", "}"
+        encode = _compact_encoder().encode
+    else:
+        pad = " " * indent
+        open_sep, field_sep, colon, close = "{\n" + pad, ",\n" + pad, ": ", "\n}"
+        indenter = _Indenter(indent)
+        encode = lambda value: indenter.encode(value, 1)  # noqa: E731
+
+    first = True
+    for key, value in fields:
+        fh.write(open_sep if first else field_sep)
+        first = False
+        fh.write(json.dumps(key) + colon)
+        if isinstance(value, Iterator):
+            write_json_array(fh, value, indent, level=1)
+        else:
+            fh.write(encode(value))
+    fh.write("{}" if first else close)
+
+
+def write_ndjson(fh: TextIO, items: Iterable[Any]) -> None:
+    """Writes one compact JSON document per line."""
+    encode = _compact_encoder().encode
+    chunk = []
+    for item in items:
+        chunk.append(encode(item))
+        chunk.append("\n")
+        if len(chunk) >= CHUNK_SIZE:
+            fh.write("".join(chunk))
+            chunk.clear()
+    fh.write("".join(chunk))
+
+
+def write_entities(graph: CodeGraph, fh: TextIO, indent: Optional[int] = 2) -> None:
+    """entities.json: array of all entities."""
+    write_json_array(fh, (e.to_dict() for e in graph.nodes.values()), indent)
+
+
+def write_relationships(graph: CodeGraph, fh: TextIO, indent: Optional[int] = 2) -> None:
+    """relationships.json: array of all edges."""
+    write_json_array(fh, (r.to_dict() for r in graph.edges), indent)
+
+
+def write_graph(graph: CodeGraph, fh: TextIO, indent: Optional[int] = 2) -> None:
+    """graph.json: same document as ``CodeGraph.to_json()``, streamed."""
+    write_json_object(
+        fh,
+        [
+            ("context", {"total_nodes": len(graph.nodes), "total_edges": len(graph.edges)}),
+            ("nodes", (e.to_dict() for e in graph.nodes.values())),
+            ("edges", (r.to_dict() for r in graph.edges)),
+        ],
+        indent,
+    )
+
+
+def write_graph_outputs(
+    graph: CodeGraph,
+    output_dir: str,
+    output_format: str = "json",
+    indent: Optional[int] = 2,
+    compression: Optional[str] = None,
+) -> List[str]:
+    """
+    Writes the graph dump files and returns their paths.
+
+    - json: entities.json, relationships.json and graph.json
+    - ndjson: entities.ndjson and relationships.ndjson (graph.json would only
+      repeat both, so it is not written)
+    """
+    written: List[str] = []
+
+    def target(name: str) -> str:
+        path = output_path(os.path.join(output_dir, name), compression)
+        written.append(path)
+        return path
+
+    if output_format == "ndjson":
+        with open_output(target("entities.ndjson"), compression) as f:
+            write_ndjson(f, (e.to_dict() for e in graph.nodes.values()))
+        with open_output(target("relationships.ndjson"), compression) as f:
+            write_ndjson(f, (r.to_dict() for r in graph.edges))
+        return written
+
+    if output_format != "json":
+        raise ValueError(f"Unknown output format: {output_format}")
+    with open_output(target("entities.json"), compression) as f:
+        write_entities(graph, f, indent)
+    with open_output(target("relationships.json"), compression) as f:
+        write_relationships(graph, f, indent)
+    with open_output(target("graph.json"), compression) as f:
+        write_graph(graph, f, indent)
+    return written
@@ -0,0 +1,400 @@
+"""code_intel.server
+
+Long-running analysis daemon speaking JSON-RPC 2.0 over stdin/stdout.
+
+Editors used to start a new ``analyze`` process for every request: the
+interpreter starts, the whole tree is scanned, every output is written, and
+the editor reads the JSON files back. The server scans once with a live
+``ProjectScanner``, keeps the ``CodeGraph`` in memory and answers queries
+straight from it:
+
+- ``callers`` / ``callees``: incoming / outgoing edges of an entity
+  (CALLS by default);
+- ``entityAtPosition``: innermost entity enclosing a file/line;
+- ``hotspots``: the ``GraphMetrics`` rankings used by the reports;
+- ``impact`` / ``callPath``: blast radius and shortest call path
+  (``GraphQuery``);
+- ``didChangeFiles``: applies edits through ``ProjectScanner.update_files``.
+  Without explicit paths it polls the tree for changes instead.
+
+Framing is one JSON object per line in each direction. Responses go to
+stdout only; progress and log messages go to stderr.
+
+Usage: python -m code_intel.server <source_path>
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import json
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, IO, List, Optional, Tuple
+
+from code_intel.discovery import DEFAULT_INCLUDE, FileDiscovery
+from code_intel.entities import Entity
+from code_intel.graph import CodeGraph
+from code_intel.metrics import GraphMetrics
+from code_intel.query import GraphQuery
+from code_intel.relations import REL_CALLS, REL_TYPES, Relationship
+from code_intel.scanner import ProjectScanner
+from code_intel.watch import FileWatcher
+
+JSONRPC_VERSION = "2.0"
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+DEFAULT_LIMIT = 10
+
+# hotspot kind -> GraphMetrics ranking
+HOTSPOT_KINDS: Dict[str, Callable[[GraphMetrics, int], List[Tuple[str, int]]]] = {
+    "most_called": GraphMetrics.most_called,
+    "orchestrators": GraphMetrics.top_orchestrators,
+    "largest_classes": GraphMetrics.largest_classes,
+    "coupling": GraphMetrics.highest_coupling,
+}
+
+_SCOPE_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+class RpcError(Exception):
+    """Error reported to the client as a JSON-RPC error object."""
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class AnalysisServer:
+    """
+    Dispatches JSON-RPC requests against a resident, incrementally updated graph.
+
+    Args:
+        scanner (ProjectScanner): Live scanner (``live=True``). ``scan()`` is
+            run on construction unless ``scanned`` is set.
+        scanned (bool): The scanner already ran ``scan()``.
+    """
+    def __init__(self, scanner: ProjectScanner, scanned: bool = False):
+        if not scanner.live:
+            raise ValueError("AnalysisServer needs a live scanner (ProjectScanner(..., live=True))")
+        self.scanner = scanner
+        self.graph: CodeGraph = scanner.graph
+        self.metrics = GraphMetrics(self.graph)
+        self.query = GraphQuery(self.graph)
+        # Taken before the scan so edits made while it runs are picked up.
+        self.watcher = FileWatcher(scanner.discovery)
+        if not scanned:
+            scanner.scan()
+        # normcase(path) -> path as stored on entities
+        self._paths: Dict[str, str] = {}
+        # file path -> {definition line -> end line}, filled on demand
+        self._spans: Dict[str, Dict[int, int]] = {}
+        self._refresh_paths()
+        self.running = True
+
+        self.methods: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "initialize": self.initialize,
+            "callers": self.callers,
+            "callees": self.callees,
+            "entityAtPosition": self.entity_at_position,
+            "hotspots": self.hotspots,
+            "impact": self.impact,
+            "callPath": self.call_path,
+            "didChangeFiles": self.did_change_files,
+            "shutdown": self.shutdown,
+        }
+
+    def serve(self, reader: IO[str], writer: IO[str]) -> None:
+        """Answers requests read from ``reader`` until EOF or ``shutdown``."""
+        for line in reader:
+            if not line.strip():
+                continue
+            response = self.handle_line(line)
+            if response is not None:
+                writer.write(json.dumps(response, separators=(",", ":")) + "\n")
+                writer.flush()
+            if not self.running:
+                break
+
+    def handle_line(self, line: str) -> Optional[Dict[str, Any]]:
+        """Handles one framed message; returns the response (None for notifications)."""
+        try:
+            message = json.loads(line)
+        except ValueError as e:
+            return _error(None, PARSE_ERROR, f"Parse error: {e}")
+        return self.handle(message)
+
+    def handle(self, message: Any) -> Optional[Dict[str, Any]]:
+        """Dispatches a decoded request or notification."""
+        if not isinstance(message, dict) or not isinstance(message.get("method"), str):
+            return _error(None, INVALID_REQUEST, "Invalid request")
+        request_id = message.get("id")
+        is_notification = "id" not in message
+
+        params = message.get("params", {})
+        handler = self.methods.get(message["method"])
+        try:
+            if handler is None:
+                raise RpcError(METHOD_NOT_FOUND, f"Method not found: {message['method']}")
+            if not isinstance(params, dict):
+                raise RpcError(INVALID_PARAMS, "params must be an object")
+            result = handler(params)
+        except RpcError as e:
+            return None if is_notification else _error(request_id, e.code, e.message)
+        except Exception as e:
+            print(f"[server] {message['method']} failed: {e!r}", file=sys.stderr)
+            return None if is_notification else _error(request_id, INTERNAL_ERROR, str(e))
+
+        if is_notification:
+            return None
+        return {"jsonrpc": JSONRPC_VERSION, "id": request_id, "result": result}
+
+    # -- methods ---------------------------------------------------------
+
+    def initialize(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "root": self.scanner.root_path,
+            "methods": sorted(self.methods),
+            "hotspotKinds": sorted(HOTSPOT_KINDS),
+            "relationshipTypes": list(REL_TYPES),
+            "stats": self._stats(),
+        }
+
+    def callers(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Entities with a ``type`` edge (default CALLS) into ``id``."""
+        entity_id, rel_type = self._entity_param(params)
+        edges = self.graph.get_incoming_edges(entity_id)
+        return [self._neighbour(rel, rel.source_id) for rel in edges if rel.type == rel_type]
+
+    def callees(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Entities ``id`` has a ``type`` edge (default CALLS) to."""
+        entity_id, rel_type = self._entity_param(params)
+        edges = self.graph.get_outgoing_edges(entity_id)
+        return [self._neighbour(rel, rel.target_id) for rel in edges if rel.type == rel_type]
+
+    def entity_at_position(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Innermost class/function/method whose body spans ``line`` (1-based) in
+        ``file``, else the file's module entity. None for unknown files.
+        """
+        file_path = self._file_param(params)
+        line = params.get("line")
+        if not isinstance(line, int) or isinstance(line, bool):
+            raise RpcError(INVALID_PARAMS, "line must be an integer")
+
+        spans = self._file_spans(file_path)
+        module: Optional[Entity] = None
+        best: Optional[Entity] = None
+        for entity in self.graph.get_file_entities(file_path):
+            if entity.type == "module":
+                module = module or entity
+                continue
+            start = entity.line_number
+            # Nested definitions start after their parent: the latest start wins.
+            if start <= line <= spans.get(start, start) and (best is None or start >= best.line_number):
+                best = entity
+        best = best or module
+        return best.to_dict() if best is not None else None
+
+    def hotspots(self, params: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        """Top ``limit`` entities of each requested ``kinds`` ranking (default: all)."""
+        limit = params.get("limit", DEFAULT_LIMIT)
+        if not isinstance(limit, int) or isinstance(limit, bool) or limit < 0:
+            raise RpcError(INVALID_PARAMS, "limit must be a non-negative integer")
+        kinds = params.get("kinds", sorted(HOTSPOT_KINDS))
+        if not isinstance(kinds, list) or any(kind not in HOTSPOT_KINDS for kind in kinds):
+            raise RpcError(INVALID_PARAMS, f"kinds must be a list of {sorted(HOTSPOT_KINDS)}")
+        return {
+            kind: [{"id": entity_id, "count": count} for entity_id, count in HOTSPOT_KINDS[kind](self.metrics, limit)]
+            for kind in kinds
+        }
+
+    def impact(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Entities depending on ``id`` (or on anything defined in ``file``),
+        transitively up to ``depth`` hops, nearest first.
+        """
+        depth = self._depth_param(params)
+        if "file" in params:
+            dependents = self.query.file_impact(self._file_param(params), depth)
+        else:
+            entity_id, _ = self._entity_param(params)
+            dependents = self.query.impact([entity_id], depth)
+        return [{"id": entity_id, "depth": hops} for entity_id, hops in dependents.items()]
+
+    def call_path(self, params: Dict[str, Any]) -> Optional[List[str]]:
+        """Shortest CALLS path from ``from`` to ``to`` (entity IDs), or None."""
+        source, target = params.get("from"), params.get("to")
+        if not isinstance(source, str) or not isinstance(target, str):
+            raise RpcError(INVALID_PARAMS, "from and to must be entity ID strings")
+        return self.query.shortest_path(source, target, self._depth_param(params))
+
+    def did_change_files(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Applies ``changed`` (created or modified) and ``deleted`` paths,
+        together with any other edits the poller finds since the last update
+        (the poll also keeps its baseline in step). With neither list given,
+        only the poll is applied. Reported paths are applied as the files are
+        on disk now, so notifications lagging behind the edits are harmless.
+        """
+        changed, deleted = self.watcher.poll()
+        if "changed" in params or "deleted" in params:
+            reported = self._path_list(params, "changed") + self._path_list(params, "deleted")
+            changed, deleted = _merge_edits(reported, changed, deleted)
+            # Files created and deleted again before this update were never scanned.
+            deleted = [p for p in deleted if p in self.scanner.summaries]
+
+        facets: List[str] = []
+        if changed or deleted:
+            start = time.perf_counter()
+            facets = sorted(self.scanner.update_files(changed, deleted))
+            elapsed = (time.perf_counter() - start) * 1000
+            for file_path in list(changed) + list(deleted):
+                self._spans.pop(file_path, None)
+            self._refresh_paths()
+            print(
+                f"[server] updated {len(changed)} changed / {len(deleted)} deleted file(s) in {elapsed:.0f} ms",
+                file=sys.stderr,
+            )
+        return {"changed": len(changed), "deleted": len(deleted), "facets": facets, "stats": self._stats()}
+
+    def shutdown(self, params: Dict[str, Any]) -> None:
+        """Stops ``serve`` after this response."""
+        self.running = False
+
+    # -- helpers ---------------------------------------------------------
+
+    def _stats(self) -> Dict[str, int]:
+        return {"files": len(self.scanner.summaries), "nodes": len(self.graph.nodes), "edges": len(self.graph.edges)}
+
+    def _entity_param(self, params: Dict[str, Any]) -> Tuple[str, str]:
+        entity_id = params.get("id")
+        if not isinstance(entity_id, str):
+            raise RpcError(INVALID_PARAMS, "id must be an entity ID string")
+        rel_type = params.get("type", REL_CALLS)
+        if rel_type not in REL_TYPES:
+            raise RpcError(INVALID_PARAMS, f"type must be one of {list(REL_TYPES)}")
+        return entity_id, rel_type
+
+    def _depth_param(self, params: Dict[str, Any]) -> Optional[int]:
+        depth = params.get("depth")
+        if depth is not None and (not isinstance(depth, int) or isinstance(depth, bool) or depth < 1):
+            raise RpcError(INVALID_PARAMS, "depth must be a positive integer")
+        return depth
+
+    def _neighbour(self, rel: Relationship, entity_id: str) -> Dict[str, Any]:
+        entity = self.graph.get_entity(entity_id)
+        return {
+            "id": entity_id,
+            "count": rel.count,
+            "lines": rel.lines,
+            "entity": entity.to_dict() if entity is not None else None,
+        }
+
+    def _file_param(self, params: Dict[str, Any]) -> str:
+        file_path = params.get("file")
+        if not isinstance(file_path, str):
+            raise RpcError(INVALID_PARAMS, "file must be a path string")
+        return self._resolve_path(file_path)
+
+    def _path_list(self, params: Dict[str, Any], key: str) -> List[str]:
+        paths = params.get(key, [])
+        if not isinstance(paths, list) or not all(isinstance(p, str) for p in paths):
+            raise RpcError(INVALID_PARAMS, f"{key} must be a list of paths")
+        return [self._resolve_path(p) for p in paths]
+
+    def _resolve_path(self, file_path: str) -> str:
+        """Maps a client path (relative to the root, or differently cased on Windows) to the scanned one."""
+        full = os.path.abspath(os.path.join(self.scanner.root_path, file_path))
+        return self._paths.get(os.path.normcase(full), full)
+
+    def _refresh_paths(self) -> None:
+        self._paths = {os.path.normcase(path): path for path in self.scanner.summaries}
+
+    def _file_spans(self, file_path: str) -> Dict[int, int]:
+        """Definition line -> last line of every class/function in the file."""
+        spans = self._spans.get(file_path)
+        if spans is None:
+            spans = {}
+            summary = self.scanner.summaries.get(file_path)
+            module_id = summary.module_id if summary is not None else ""
+            tree = self.scanner.cache.get(file_path, module_id).tree
+            if tree is not None:
+                for node in ast.walk(tree):
+                    if isinstance(node, _SCOPE_NODES):
+                        spans[node.lineno] = getattr(node, "end_lineno", None) or node.lineno
+            self._spans[file_path] = spans
+        return spans
+
+
+def _error(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {"jsonrpc": JSONRPC_VERSION, "id": request_id, "error": {"code": code, "message": message}}
+
+
+def _merge_edits(
+    reported: List[str],
+    polled_changed: List[str],
+    polled_deleted: List[str],
+    is_file: Callable[[str], bool] = os.path.isfile,
+) -> Tuple[List[str], List[str]]:
+    """
+    Union of client-reported and polled edits as (changed, deleted), without
+    duplicates. Paths are classified by the file on disk now: by the poll if it
+    saw the path, else by whether it exists. A client's "changed" for a file
+    deleted since, or "deleted" for one re-created since, would otherwise be
+    applied as stale.
+    """
+    polled = set(polled_changed) | set(polled_deleted)
+    exists = {p: is_file(p) for p in reported if p not in polled}
+    merged_changed = [p for p, present in exists.items() if present] + polled_changed
+    merged_deleted = [p for p, present in exists.items() if not present] + polled_deleted
+    return list(dict.fromkeys(merged_changed)), list(dict.fromkeys(merged_deleted))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Code Intelligence Engine: JSON-RPC server over stdio")
+    parser.add_argument("path", help="Path to the Python codebase to analyze")
+    parser.add_argument(
+        "--call-sites",
+        action="store_true",
+        help="Record the source line of every call site (returned as 'lines' by callers/callees)",
+    )
+    parser.add_argument("--include", action="append", default=None, metavar="GLOB", help="Only scan files matching this glob (repeatable; default: *.py)")
+    parser.add_argument("--exclude", action="append", default=[], metavar="GLOB", help="Skip files or directories matching this glob (repeatable, gitignore syntax)")
+    parser.add_argument("--no-gitignore", action="store_true", help="Do not apply .gitignore files found in the scanned tree")
+    args = parser.parse_args()
+
+    # The protocol owns stdout; anything printed while scanning goes to stderr.
+    protocol_out = sys.stdout
+    sys.stdout = sys.stderr
+
+    if not os.path.isdir(args.path):
+        print(f"Error: Source path '{args.path}' is not a directory.")
+        sys.exit(1)
+
+    scanner = ProjectScanner(
+        args.path,
+        CodeGraph(track_call_sites=args.call_sites),
+        discovery=FileDiscovery(
+            args.path,
+            include=args.include or DEFAULT_INCLUDE,
+            exclude=args.exclude,
+            use_gitignore=not args.no_gitignore,
+        ),
+        live=True,
+    )
+    start = time.time()
+    server = AnalysisServer(scanner)
+    print(f"[server] ready in {time.time() - start:.2f}s: {server._stats()}")
+    server.serve(sys.stdin, protocol_out)
+
+
+if __name__ == "__main__":
+    main()
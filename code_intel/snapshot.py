@@ -0,0 +1,359 @@
+"""code_intel.snapshot
+
+Versioned binary snapshot of a CodeGraph, loadable through ``mmap``.
+
+Reloading ``graph.json`` means parsing every record before the first query.
+A snapshot instead stores the graph as flat, 8-byte aligned sections that can
+be used in place:
+
+- a string table (offsets + UTF-8 blob) holding every entity ID, name, file
+  path and type, plus a permutation of it sorted by bytes for binary search;
+- entity records as int columns (id, name, type, file, line, parent);
+- edge columns (source, target, type code, count) with optional call-site
+  lines, and CSR outgoing/incoming offsets and indexes.
+
+``load_snapshot(path, mmap=True)`` maps the file and returns a read-only
+``SnapshotGraph``; nothing is decoded up front, so opening a multi-million
+edge graph is near-instant and only the pages a query touches are read.
+"""
+
+from __future__ import annotations
+
+import mmap as _mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from code_intel.compact_graph import build_csr
+from code_intel.entities import ENTITY_CLASSES, Entity
+from code_intel.graph import CodeGraph
+from code_intel.relations import Relationship
+
+MAGIC = b"CIGSNAP\0"
+SNAPSHOT_VERSION = 1
+
+# Section name -> array typecode, in file order.
+SECTIONS: Tuple[Tuple[str, str], ...] = (
+    ("string_offsets", "q"),
+    ("string_blob", "B"),
+    ("sorted_strings", "i"),
+    ("string_entity", "i"),
+    ("types", "i"),
+    ("ent_id", "i"),
+    ("ent_name", "i"),
+    ("ent_type", "i"),
+    ("ent_file", "i"),
+    ("ent_line", "i"),
+    ("ent_parent", "i"),
+    ("edge_src", "i"),
+    ("edge_dst", "i"),
+    ("edge_type", "B"),
+    ("edge_count", "i"),
+    ("edge_has_lines", "B"),
+    ("line_offsets", "q"),
+    ("line_data", "i"),
+    ("out_offsets", "i"),
+    ("out_index", "i"),
+    ("in_offsets", "i"),
+    ("in_index", "i"),
+)
+
+# magic, version, little-endian flag, has_lines, n_strings, n_entities, n_edges
+_HEADER = struct.Struct("<8sIIIIII")
+_SECTION = struct.Struct("<QQ")
+
+
+def save_snapshot(graph: CodeGraph, path: str) -> None:
+    """Writes ``graph`` (any CodeGraph backend) to ``path``."""
+    strings: List[str] = []
+    ids: Dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        idx = ids.get(value)
+        if idx is None:
+            idx = ids[value] = len(strings)
+            strings.append(value)
+        return idx
+
+    cols: Dict[str, array] = {name: array(code) for name, code in SECTIONS}
+
+    for ent in graph.nodes.values():
+        cols["ent_id"].append(intern(ent.id))
+        cols["ent_name"].append(intern(ent.name))
+        cols["ent_type"].append(intern(ent.type))
+        cols["ent_file"].append(intern(ent.file_path))
+        cols["ent_line"].append(ent.line_number or 0)
+        cols["ent_parent"].append(intern(ent.parent_id) if ent.parent_id is not None else -1)
+
+    type_codes: Dict[str, int] = {}
+    has_lines = bool(getattr(graph, "track_call_sites", False))
+    cols["line_offsets"].append(0)
+    for edge in graph.edges:
+        code = type_codes.get(edge.type)
+        if code is None:
+            code = type_codes[edge.type] = len(type_codes)
+            cols["types"].append(intern(edge.type))
+        cols["edge_src"].append(intern(edge.source_id))
+        cols["edge_dst"].append(intern(edge.target_id))
+        cols["edge_type"].append(code)
+        cols["edge_count"].append(edge.count)
+        if has_lines:
+            cols["edge_has_lines"].append(edge.lines is not None)
+            cols["line_data"].extend(edge.lines or [])
+            cols["line_offsets"].append(len(cols["line_data"]))
+
+    encoded = [s.encode("utf-8") for s in strings]
+    offset = 0
+    cols["string_offsets"].append(0)
+    for raw in encoded:
+        offset += len(raw)
+        cols["string_offsets"].append(offset)
+    cols["string_blob"] = array("B", b"".join(encoded))
+    cols["sorted_strings"] = array("i", sorted(range(len(encoded)), key=encoded.__getitem__))
+
+    string_entity = array("i", [-1]) * len(strings)
+    for row, string_idx in enumerate(cols["ent_id"]):
+        string_entity[string_idx] = row
+    cols["string_entity"] = string_entity
+
+    n = len(strings)
+    cols["out_offsets"], cols["out_index"] = build_csr(cols["edge_src"], n)
+    cols["in_offsets"], cols["in_index"] = build_csr(cols["edge_dst"], n)
+
+    header_size = _HEADER.size + _SECTION.size * len(SECTIONS)
+    table: List[Tuple[int, int]] = []
+    position = _align(header_size)
+    for name, _ in SECTIONS:
+        nbytes = len(cols[name]) * cols[name].itemsize
+        table.append((position, nbytes))
+        position = _align(position + nbytes)
+
+    # Written aside and renamed: readers may still map the old snapshot at ``path``.
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(
+            MAGIC, SNAPSHOT_VERSION, int(sys.byteorder == "little"), int(has_lines),
+            len(strings), len(cols["ent_id"]), len(cols["edge_src"]),
+        ))
+        for entry in table:
+            f.write(_SECTION.pack(*entry))
+        for (name, _), (start, _) in zip(SECTIONS, table):
+            f.write(b"\0" * (start - f.tell()))
+            f.write(cols[name].tobytes())
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path: str, mmap: bool = True) -> "SnapshotGraph":
+    """
+    Opens a snapshot. With ``mmap=True`` the file is memory-mapped and read
+    lazily; otherwise it is read into memory in one go.
+    """
+    with open(path, "rb") as f:
+        if mmap:
+            buffer = _mmap.mmap(f.fileno(), 0, access=_mmap.ACCESS_READ)
+        else:
+            buffer = f.read()
+    return SnapshotGraph(buffer)
+
+
+def _align(position: int) -> int:
+    return (position + 7) & ~7
+
+
+class SnapshotGraph(CodeGraph):
+    """
+    Read-only CodeGraph view over a snapshot buffer.
+
+    ``nodes`` and ``edges`` are lazy views; entity lookups binary-search the
+    sorted string table instead of building a dict.
+    """
+    def __init__(self, buffer):
+        self._buffer = buffer
+        view = memoryview(buffer)
+        magic, version, little, has_lines, n_strings, n_entities, n_edges = _HEADER.unpack_from(view, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a code_intel graph snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {version} (expected {SNAPSHOT_VERSION})")
+        if bool(little) != (sys.byteorder == "little"):
+            raise ValueError("Snapshot was written on a machine with a different byte order")
+
+        self._cols: Dict[str, memoryview] = {}
+        for i, (name, code) in enumerate(SECTIONS):
+            start, nbytes = _SECTION.unpack_from(view, _HEADER.size + i * _SECTION.size)
+            self._cols[name] = view[start:start + nbytes].cast(code)
+
+        self._n_strings = n_strings
+        self._n_entities = n_entities
+        self._n_edges = n_edges
+        self.track_call_sites = bool(has_lines)
+        self._types = [self._string(i) for i in self._cols["types"]]
+        self.version = 0
+        self.nodes = _EntityMapping(self)
+
+    def close(self) -> None:
+        """Releases the memory map (views become unusable)."""
+        self._cols.clear()
+        if isinstance(self._buffer, _mmap.mmap):
+            self._buffer.close()
+
+    def __enter__(self) -> "SnapshotGraph":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def edges(self) -> "_SnapshotEdges":
+        return _SnapshotEdges(self)
+
+    def add_entity(self, entity: Entity):
+        raise TypeError("Snapshot graphs are read-only")
+
+    def add_relationship(self, rel: Relationship):
+        raise TypeError("Snapshot graphs are read-only")
+
+    def remove_file(self, file_path: str):
+        raise TypeError("Snapshot graphs are read-only")
+
+    def remove_entity(self, entity_id: str):
+        raise TypeError("Snapshot graphs are read-only")
+
+    def remove_edges(self, source_id=None, target_id=None, type=None):
+        raise TypeError("Snapshot graphs are read-only")
+
+    def remove_edge(self, source_id: str, target_id: str, rel_type: str):
+        raise TypeError("Snapshot graphs are read-only")
+
+    def get_entity(self, entity_id: str) -> Optional[Entity]:
+        return self.nodes.get(entity_id)
+
+    def get_file_entities(self, file_path: str) -> List[Entity]:
+        return [entity for entity in self.nodes.values() if entity.file_path == file_path]
+
+    def get_outgoing_edges(self, source_id: str) -> List[Relationship]:
+        return self._adjacent(source_id, "out")
+
+    def get_incoming_edges(self, target_id: str) -> List[Relationship]:
+        return self._adjacent(target_id, "in")
+
+    def _adjacent(self, entity_id: str, direction: str) -> List[Relationship]:
+        idx = self._find_string(entity_id)
+        if idx < 0:
+            return []
+        offsets = self._cols[f"{direction}_offsets"]
+        index = self._cols[f"{direction}_index"]
+        return [self._edge(e) for e in index[offsets[idx]:offsets[idx + 1]]]
+
+    def _string(self, idx: int) -> str:
+        offsets = self._cols["string_offsets"]
+        return bytes(self._cols["string_blob"][offsets[idx]:offsets[idx + 1]]).decode("utf-8")
+
+    def _string_bytes(self, idx: int) -> bytes:
+        offsets = self._cols["string_offsets"]
+        return bytes(self._cols["string_blob"][offsets[idx]:offsets[idx + 1]])
+
+    def _find_string(self, value: str) -> int:
+        """Binary search over the sorted string permutation; -1 if absent."""
+        target = value.encode("utf-8")
+        order = self._cols["sorted_strings"]
+        lo, hi = 0, self._n_strings
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._string_bytes(order[mid]) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._n_strings and self._string_bytes(order[lo]) == target:
+            return order[lo]
+        return -1
+
+    def _entity(self, row: int) -> Entity:
+        cols = self._cols
+        entity_type = self._string(cols["ent_type"][row])
+        parent = cols["ent_parent"][row]
+        args = (
+            self._string(cols["ent_id"][row]),
+            self._string(cols["ent_name"][row]),
+            self._string(cols["ent_file"][row]),
+            cols["ent_line"][row],
+            self._string(parent) if parent >= 0 else None,
+        )
+        entity_cls = ENTITY_CLASSES.get(entity_type)
+        if entity_cls is None:
+            return Entity(args[0], args[1], entity_type, *args[2:])
+        return entity_cls(*args)
+
+    def _edge(self, i: int) -> Relationship:
+        cols = self._cols
+        lines = None
+        if self.track_call_sites and cols["edge_has_lines"][i]:
+            lines = cols["line_data"][cols["line_offsets"][i]:cols["line_offsets"][i + 1]].tolist()
+        return Relationship(
+            self._string(cols["edge_src"][i]),
+            self._string(cols["edge_dst"][i]),
+            self._types[cols["edge_type"][i]],
+            cols["edge_count"][i],
+            lines,
+        )
+
+
+class _EntityMapping(Mapping):
+    """Lazy ``entity_id -> Entity`` mapping in the original insertion order."""
+    def __init__(self, graph: SnapshotGraph):
+        self._graph = graph
+
+    def __len__(self) -> int:
+        return self._graph._n_entities
+
+    def __iter__(self) -> Iterator[str]:
+        graph = self._graph
+        for string_idx in graph._cols["ent_id"]:
+            yield graph._string(string_idx)
+
+    def __getitem__(self, entity_id: str) -> Entity:
+        graph = self._graph
+        idx = graph._find_string(entity_id)
+        row = graph._cols["string_entity"][idx] if idx >= 0 else -1
+        if row < 0:
+            raise KeyError(entity_id)
+        return graph._entity(row)
+
+    def values(self) -> "_EntityValues":
+        return _EntityValues(self._graph)
+
+
+class _EntityValues:
+    def __init__(self, graph: SnapshotGraph):
+        self._graph = graph
+
+    def __len__(self) -> int:
+        return self._graph._n_entities
+
+    def __iter__(self) -> Iterator[Entity]:
+        for row in range(self._graph._n_entities):
+            yield self._graph._entity(row)
+
+
+class _SnapshotEdges(Sequence):
+    def __init__(self, graph: SnapshotGraph):
+        self._graph = graph
+
+    def __len__(self) -> int:
+        return self._graph._n_edges
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._graph._edge(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("edge index out of range")
+        return self._graph._edge(index)
+
+    def __iter__(self) -> Iterator[Relationship]:
+        for i in range(len(self)):
+            yield self._graph._edge(i)
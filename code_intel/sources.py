@@ -0,0 +1,152 @@
+"""code_intel.sources
+
+Parsed-module cache shared by the scanner passes and artifact generation.
+
+Every Python file is read and parsed exactly once; the raw source bytes and the
+resulting AST are kept in a ``SourceCache`` keyed by file path so that Pass 2
+(relationships) can reuse the tree built in Pass 1 (definitions) instead of
+re-reading and re-parsing the file. ``ArtifactWriter`` reads docstrings and
+business-rule evidence from the same cache.
+
+The cache can be bounded by a byte budget. Budget accounting uses the size of
+the source text (the parsed tree is proportional to it). Modules that do not fit
+in the budget are handed to the caller but not retained; a later ``get`` simply
+re-reads and re-parses them on demand.
+"""
+
+from __future__ import annotations
+
+import ast
+import importlib.util
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+@dataclass
+class ParsedModule:
+    """
+    A single source file and its parse result.
+
+    Attributes:
+        file_path (str): Absolute path to the file.
+        module_id (str): Dotted module ID assigned by the scanner.
+        source (Optional[bytes]): Raw file contents (None if evicted or unreadable).
+        tree (Optional[ast.Module]): Parsed AST (None if evicted or on error).
+        error (Optional[str]): Read/parse error message, if any.
+        read_seconds (float): Time spent reading the file.
+        parse_seconds (float): Time spent in ``ast.parse``.
+    """
+    file_path: str
+    module_id: str
+    source: Optional[bytes] = None
+    tree: Optional[ast.Module] = None
+    error: Optional[str] = None
+    read_seconds: float = 0.0
+    parse_seconds: float = 0.0
+
+    @property
+    def text(self) -> str:
+        """Decoded source (honours coding cookies, universal newlines)."""
+        if self.source is None:
+            return ""
+        try:
+            return importlib.util.decode_source(self.source)
+        except Exception:
+            return self.source.decode("utf-8", errors="ignore")
+
+
+class SourceCache:
+    """
+    Read-once/parse-once store of ``ParsedModule`` objects.
+
+    Args:
+        max_bytes (Optional[int]): Upper bound on the total source size of the
+            modules kept resident. ``None`` keeps everything.
+    """
+    def __init__(self, max_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self._modules: Dict[str, ParsedModule] = {}
+        self._resident_bytes = 0
+
+        # Number of ast.parse calls performed (useful to verify cache hits).
+        self.parse_count = 0
+
+    def get(self, file_path: str, module_id: str = "") -> ParsedModule:
+        """
+        Returns the parsed module for ``file_path``, reading and parsing it if it
+        is not resident. Errors are remembered so broken files are not retried.
+        """
+        cached = self._modules.get(file_path)
+        if cached is not None and (cached.tree is not None or cached.error is not None):
+            return cached
+
+        parsed = self._load(file_path, module_id)
+        self._retain(parsed)
+        return parsed
+
+    def put(self, parsed: ParsedModule) -> ParsedModule:
+        """Adds a module parsed elsewhere (e.g. by the scan pipeline) to the cache."""
+        if parsed.source is not None:
+            self.parse_count += 1
+        self._retain(parsed)
+        return parsed
+
+    def release(self, file_path: str) -> None:
+        """Drops the source and tree of a module (it will be re-parsed on demand)."""
+        cached = self._modules.pop(file_path, None)
+        if cached is not None and cached.source is not None and cached.tree is not None:
+            self._resident_bytes -= len(cached.source)
+
+    def clear(self) -> None:
+        self._modules.clear()
+        self._resident_bytes = 0
+
+    @property
+    def resident_bytes(self) -> int:
+        return self._resident_bytes
+
+    def _load(self, file_path: str, module_id: str) -> ParsedModule:
+        parsed = read_module(file_path, module_id)
+        if parsed.source is None:
+            return parsed
+        self.parse_count += 1
+        return parse_module(parsed)
+
+    def _retain(self, parsed: ParsedModule) -> None:
+        if parsed.error is not None:
+            # Keep only the error marker; the source is of no further use.
+            self._modules[parsed.file_path] = ParsedModule(parsed.file_path, parsed.module_id, error=parsed.error)
+            return
+
+        size = len(parsed.source or b"")
+        if self.max_bytes is None or self._resident_bytes + size <= self.max_bytes:
+            self._modules[parsed.file_path] = parsed
+            self._resident_bytes += size
+        else:
+            # Over budget: the caller still gets the tree, but it is not kept.
+            self._modules.pop(parsed.file_path, None)
+
+
+def read_module(file_path: str, module_id: str) -> ParsedModule:
+    """Reads a file's bytes (or records the error); the tree is not built yet."""
+    start = time.perf_counter()
+    try:
+        with open(file_path, "rb") as f:
+            source = f.read()
+    except Exception as e:
+        return ParsedModule(file_path, module_id, error=str(e))
+    return ParsedModule(file_path, module_id, source=source, read_seconds=time.perf_counter() - start)
+
+
+def parse_module(parsed: ParsedModule) -> ParsedModule:
+    """Parses the source read by ``read_module`` in place and returns it."""
+    if parsed.source is None or parsed.error is not None:
+        return parsed
+    start = time.perf_counter()
+    try:
+        parsed.tree = ast.parse(parsed.source, filename=parsed.file_path)
+    except Exception as e:
+        parsed.error = str(e)
+    parsed.parse_seconds = time.perf_counter() - start
+    return parsed
@@ -1,7 +1,444 @@
-# Migrated from AI-modernization-tool/storage.py
-# Placeholder: implement VectorStore class here based on original logic
+"""code_intel.storage
+
+In-memory vector store for chunk embeddings, with cosine top-k search.
+
+Vectors are L2-normalized on insertion and kept in one contiguous float32
+matrix (row ``i`` is item ``i``), next to the metadata columns (content,
+file_path, name). With NumPy the matrix is an ``ndarray`` and a query is a
+single matrix-vector product followed by ``argpartition`` for the top k,
+so only those k scores are sorted. Without NumPy it is a flat
+``array("f")`` and the scores come from a Python loop (``heapq.nlargest``).
+
+Capacity grows geometrically (amortized O(1) per inserted row); batch
+insertion normalizes and copies a whole block at once.
+
+``save`` writes a directory holding ``vectors.npy``, a standard ``.npy``
+file (written by hand when NumPy is missing), and ``metadata.json``.
+``load`` memory-maps ``vectors.npy`` when NumPy is available, so even a
+large index opens without reading it. The first insertion afterwards copies
+the rows into memory.
+
+Large stores can add an approximate index (``build_index``, NumPy only).
+``IVFIndex`` is an inverted file: spherical k-means splits the rows into
+``nlist`` clusters, and a query scores only the rows of the ``nprobe``
+clusters whose centroids are closest to it. Raising ``nprobe`` trades
+latency for recall; ``nprobe == nlist`` is exact. Rows inserted later go
+to their nearest existing centroid. When the data drifts far from the
+training set, call ``build_index`` again. The index is saved alongside
+the vectors.
+"""
+
+from __future__ import annotations
+
+import ast
+import heapq
+import json
+import math
+import os
+import sys
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np  # type: ignore
+except ImportError:  # optional acceleration
+    np = None
+
+VECTORS_FILE = "vectors.npy"
+METADATA_FILE = "metadata.json"
+IVF_CENTROIDS_FILE = "ivf_centroids.npy"
+IVF_LISTS_FILE = "ivf_lists.npy"
+IVF_OFFSETS_FILE = "ivf_offsets.npy"
+STORE_VERSION = 1
+MIN_CAPACITY = 64
+GROWTH = 2
+_NPY_MAGIC = b"\x93NUMPY"
+
+DEFAULT_NPROBE = 8
+KMEANS_ITERATIONS = 20
+# k-means trains on at most this many rows per cluster (a random sample)
+TRAIN_ROWS_PER_LIST = 64
+# Rows scored against the centroids at a time while assigning (bounds memory)
+ASSIGN_BLOCK = 65536
+
 
 class VectorStore:
-    def add_embedding(self, content, embedding, file_path, name):
-        # TODO: Implement actual storage logic
-        pass
+    """
+    Embeddings with metadata, searchable by cosine similarity.
+
+    Args:
+        dim (Optional[int]): Vector dimension; taken from the first insertion
+            when omitted.
+
+    Attributes:
+        contents (List[str]): Chunk text per row.
+        file_paths (List[str]): Source file per row.
+        names (List[str]): Chunk name per row.
+    """
+    def __init__(self, dim: Optional[int] = None):
+        self.dim = dim
+        self.contents: List[str] = []
+        self.file_paths: List[str] = []
+        self.names: List[str] = []
+        self._size = 0
+        self._capacity = 0
+        # NumPy: (capacity, dim) float32 array; fallback: flat array("f")
+        self._matrix: Any = None
+        # Approximate index (build_index), kept up to date by insertions
+        self.index: Optional[IVFIndex] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add_embedding(self, content: str, embedding: Sequence[float], file_path: str, name: str) -> int:
+        """Adds one row; returns its index."""
+        return self.add_embeddings([content], [embedding], [file_path], [name])
+
+    def add_embeddings(
+        self,
+        contents: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        file_paths: Sequence[str],
+        names: Sequence[str],
+    ) -> int:
+        """Adds rows in bulk; returns the index of the first one."""
+        count = len(embeddings)
+        if not (len(contents) == len(file_paths) == len(names) == count):
+            raise ValueError("contents, embeddings, file_paths and names must have the same length")
+        first = self._size
+        if count == 0:
+            return first
+        if self.dim is None:
+            self.dim = len(embeddings[0])
+
+        self._reserve(self._size + count)
+        if np is not None:
+            block = np.asarray(embeddings, dtype=np.float32)
+            if block.shape != (count, self.dim):
+                raise ValueError(f"expected embeddings of dimension {self.dim}, got shape {block.shape}")
+            norms = np.linalg.norm(block, axis=1, keepdims=True)
+            norms[norms == 0.0] = 1.0
+            self._matrix[first:first + count] = block / norms
+            if self.index is not None:
+                self.index.add(self._matrix[first:first + count], first)
+        else:
+            for embedding in embeddings:
+                if len(embedding) != self.dim:
+                    raise ValueError(f"expected embeddings of dimension {self.dim}, got {len(embedding)}")
+            for i, embedding in enumerate(embeddings):
+                start = (first + i) * self.dim
+                self._matrix[start:start + self.dim] = array("f", _normalized(embedding))
+
+        self._size += count
+        self.contents.extend(contents)
+        self.file_paths.extend(file_paths)
+        self.names.extend(names)
+        return first
+
+    def vector(self, i: int) -> List[float]:
+        """Normalized vector of row ``i``."""
+        if not 0 <= i < self._size:
+            raise IndexError(i)
+        if np is not None:
+            return self._matrix[i].tolist()
+        return self._matrix[i * self.dim:(i + 1) * self.dim].tolist()
+
+    def metadata(self, i: int) -> Dict[str, Any]:
+        return {"index": i, "content": self.contents[i], "file_path": self.file_paths[i], "name": self.names[i]}
+
+    def build_index(
+        self,
+        nlist: Optional[int] = None,
+        nprobe: int = DEFAULT_NPROBE,
+        iterations: int = KMEANS_ITERATIONS,
+        seed: int = 0,
+    ) -> "IVFIndex":
+        """
+        Trains an ``IVFIndex`` on the current rows and indexes them; later
+        searches use it unless ``exact=True``. ``nlist`` defaults to about
+        4 * sqrt(rows).
+        """
+        if np is None:
+            raise RuntimeError("VectorStore.build_index needs NumPy")
+        if self._size == 0:
+            raise ValueError("cannot build an index over an empty store")
+        if nlist is None:
+            nlist = max(1, int(4 * math.sqrt(self._size)))
+        index = IVFIndex(min(nlist, self._size), nprobe)
+        rows = self._matrix[:self._size]
+        index.train(rows, iterations, seed)
+        index.add(rows, 0)
+        self.index = index
+        return index
+
+    def drop_index(self) -> None:
+        self.index = None
+
+    def search(
+        self, query: Sequence[float], k: int = 10, nprobe: Optional[int] = None, exact: bool = False
+    ) -> List[Tuple[float, Dict[str, Any]]]:
+        """(cosine similarity, metadata) of the ``k`` rows closest to ``query``, best first."""
+        return [(score, self.metadata(i)) for i, score in self.top_k(query, k, nprobe, exact)]
+
+    def top_k(
+        self, query: Sequence[float], k: int = 10, nprobe: Optional[int] = None, exact: bool = False
+    ) -> List[Tuple[int, float]]:
+        """
+        (row, cosine similarity) of the ``k`` best rows, best first (ties: lower
+        row first). Approximate when an index is built, unless ``exact``;
+        ``nprobe`` overrides the index's default.
+        """
+        n = self._size
+        if n == 0 or k <= 0:
+            return []
+        if len(query) != self.dim:
+            raise ValueError(f"expected a query of dimension {self.dim}, got {len(query)}")
+        k = min(k, n)
+        if np is not None:
+            q = np.asarray(query, dtype=np.float32)
+            norm = np.linalg.norm(q)
+            if norm:
+                q = q / norm
+            if self.index is not None and not exact:
+                rows = self.index.candidates(q, nprobe)
+                return _best(rows, self._matrix[rows] @ q, k)
+            return _best(np.arange(n), self._matrix[:n] @ q, k)
+
+        q = _normalized(query)
+        dim, matrix = self.dim, self._matrix
+        scores = (sum(a * b for a, b in zip(q, matrix[i * dim:(i + 1) * dim])) for i in range(n))
+        best = heapq.nlargest(k, enumerate(scores), key=lambda item: (item[1], -item[0]))
+        return [(i, float(score)) for i, score in best]
+
+    def save(self, path: str) -> None:
+        """Writes ``vectors.npy`` and ``metadata.json`` into directory ``path``."""
+        os.makedirs(path, exist_ok=True)
+        # Written aside and renamed: a store loaded from ``path`` may still map the old file.
+        vectors_path = os.path.join(path, VECTORS_FILE)
+        tmp_path = f"{vectors_path}.tmp"
+        if np is not None:
+            with open(tmp_path, "wb") as f:
+                np.save(f, np.ascontiguousarray(self._rows()))
+        else:
+            _write_npy(tmp_path, self._rows(), (self._size, self.dim or 0))
+        os.replace(tmp_path, vectors_path)
+        metadata = {
+            "version": STORE_VERSION,
+            "dim": self.dim,
+            "count": self._size,
+            "contents": self.contents,
+            "file_paths": self.file_paths,
+            "names": self.names,
+        }
+        if self.index is not None:
+            metadata["index"] = self.index.save(path)
+        with open(os.path.join(path, METADATA_FILE), "w", encoding="utf-8") as f:
+            json.dump(metadata, f)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "VectorStore":
+        """Opens a store written by ``save``; the vectors are memory-mapped with NumPy and ``mmap``."""
+        with open(os.path.join(path, METADATA_FILE), "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+        if metadata.get("version") != STORE_VERSION:
+            raise ValueError(f"unsupported vector store version: {metadata.get('version')}")
+        store = cls(metadata["dim"])
+        store.contents = metadata["contents"]
+        store.file_paths = metadata["file_paths"]
+        store.names = metadata["names"]
+        vectors_path = os.path.join(path, VECTORS_FILE)
+        if np is not None:
+            store._matrix = np.load(vectors_path, mmap_mode="r" if mmap else None)
+            store._size = store._capacity = store._matrix.shape[0]
+        else:
+            store._matrix = _read_npy(vectors_path)
+            store._size = store._capacity = metadata["count"]
+        if store._size != len(store.contents):
+            raise ValueError(f"{path}: {store._size} vectors but {len(store.contents)} metadata rows")
+        if metadata.get("index") and np is not None:
+            store.index = IVFIndex.load(path, metadata["index"])
+        return store
+
+    def _rows(self) -> Any:
+        if np is not None:
+            if self._matrix is None:
+                return np.zeros((0, self.dim or 0), dtype=np.float32)
+            return self._matrix[:self._size]
+        if self._matrix is None:
+            return array("f")
+        return self._matrix[:self._size * self.dim]
+
+    def _reserve(self, rows: int) -> None:
+        """Grows the matrix geometrically so that it holds at least ``rows`` rows."""
+        if rows <= self._capacity and self._matrix is not None and _writable(self._matrix):
+            return
+        capacity = max(rows, MIN_CAPACITY, self._capacity * GROWTH)
+        if np is not None:
+            matrix = np.empty((capacity, self.dim), dtype=np.float32)
+            if self._size:
+                matrix[:self._size] = self._matrix[:self._size]
+        else:
+            matrix = array("f", bytes(4 * capacity * self.dim))
+            if self._size:
+                matrix[:self._size * self.dim] = self._matrix[:self._size * self.dim]
+        self._matrix = matrix
+        self._capacity = capacity
+
+
+class IVFIndex:
+    """
+    Inverted-file index over normalized rows, with a spherical k-means coarse
+    quantizer (NumPy only).
+
+    Args:
+        nlist (int): Number of clusters (inverted lists).
+        nprobe (int): Clusters searched per query by default.
+
+    Attributes:
+        centroids (np.ndarray): (nlist, dim) unit centroids, once trained.
+        lists (List[array]): Row numbers of each cluster.
+    """
+    def __init__(self, nlist: int, nprobe: int = DEFAULT_NPROBE):
+        if np is None:
+            raise RuntimeError("IVFIndex needs NumPy")
+        self.nlist = max(1, nlist)
+        self.nprobe = max(1, nprobe)
+        self.centroids: Any = None
+        self.lists: List[array] = [array("i") for _ in range(self.nlist)]
+
+    def __len__(self) -> int:
+        return sum(len(rows) for rows in self.lists)
+
+    def train(self, rows: Any, iterations: int = KMEANS_ITERATIONS, seed: int = 0) -> None:
+        """Spherical k-means on (a sample of) ``rows``."""
+        rnd = np.random.default_rng(seed)
+        n = rows.shape[0]
+        sample_size = min(n, self.nlist * TRAIN_ROWS_PER_LIST)
+        sample = rows[np.sort(rnd.choice(n, sample_size, replace=False))] if sample_size < n else np.asarray(rows)
+        centroids = sample[rnd.choice(sample.shape[0], self.nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = _nearest(sample, centroids)
+            order = np.argsort(labels, kind="stable")
+            counts = np.bincount(labels, minlength=self.nlist)
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            filled = counts > 0
+            sums = np.zeros_like(centroids)
+            sums[filled] = np.add.reduceat(sample[order], starts[filled], axis=0)
+            # Empty clusters restart from random sample rows.
+            empty = np.flatnonzero(~filled)
+            if len(empty):
+                sums[empty] = sample[rnd.choice(sample.shape[0], len(empty), replace=False)]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            norms[norms == 0.0] = 1.0
+            updated = (sums / norms).astype(np.float32)
+            converged = np.array_equal(updated, centroids)
+            centroids = updated
+            if converged:
+                break
+        self.centroids = centroids
+
+    def add(self, rows: Any, first: int) -> None:
+        """Indexes ``rows`` as row numbers ``first``, ``first + 1``, ..."""
+        if self.centroids is None:
+            raise RuntimeError("IVFIndex.add called before train")
+        labels = _nearest(rows, self.centroids)
+        order = np.argsort(labels, kind="stable")
+        counts = np.bincount(labels, minlength=self.nlist)
+        row_ids = (order + first).astype(np.int32)
+        start = 0
+        for c in np.flatnonzero(counts):
+            end = start + counts[c]
+            self.lists[c].frombytes(row_ids[start:end].tobytes())
+            start = end
+
+    def candidates(self, query: Any, nprobe: Optional[int] = None) -> Any:
+        """Row numbers in the ``nprobe`` clusters closest to the (unit) ``query``."""
+        probe = min(self.nlist, max(1, nprobe or self.nprobe))
+        scores = self.centroids @ query
+        if probe < self.nlist:
+            clusters = np.argpartition(-scores, probe - 1)[:probe]
+        else:
+            clusters = range(self.nlist)
+        chunks = [np.frombuffer(self.lists[c], dtype=np.int32) for c in clusters if len(self.lists[c])]
+        return np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int32)
+
+    def save(self, path: str) -> Dict[str, Any]:
+        """Writes the centroids and the lists (concatenated, with offsets); returns the metadata entry."""
+        offsets = np.zeros(self.nlist + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(rows) for rows in self.lists])
+        ids = np.concatenate([np.frombuffer(rows, dtype=np.int32) for rows in self.lists])
+        np.save(os.path.join(path, IVF_CENTROIDS_FILE), self.centroids)
+        np.save(os.path.join(path, IVF_LISTS_FILE), ids)
+        np.save(os.path.join(path, IVF_OFFSETS_FILE), offsets)
+        return {"type": "ivf", "nlist": self.nlist, "nprobe": self.nprobe}
+
+    @classmethod
+    def load(cls, path: str, entry: Dict[str, Any]) -> "IVFIndex":
+        if entry.get("type") != "ivf":
+            raise ValueError(f"unsupported index type: {entry.get('type')}")
+        index = cls(entry["nlist"], entry["nprobe"])
+        index.centroids = np.load(os.path.join(path, IVF_CENTROIDS_FILE))
+        ids = np.load(os.path.join(path, IVF_LISTS_FILE))
+        offsets = np.load(os.path.join(path, IVF_OFFSETS_FILE))
+        index.lists = [array("i", ids[offsets[c]:offsets[c + 1]].tobytes()) for c in range(index.nlist)]
+        return index
+
+
+def _nearest(rows: Any, centroids: Any) -> Any:
+    """Index of the most similar centroid for every row, in blocks."""
+    labels = np.empty(rows.shape[0], dtype=np.int64)
+    for start in range(0, rows.shape[0], ASSIGN_BLOCK):
+        labels[start:start + ASSIGN_BLOCK] = np.argmax(rows[start:start + ASSIGN_BLOCK] @ centroids.T, axis=1)
+    return labels
+
+
+def _best(rows: Any, scores: Any, k: int) -> List[Tuple[int, float]]:
+    """The ``k`` best (row, score) pairs, by score and then row number."""
+    if k < len(scores):
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(len(scores))
+    top = top[np.lexsort((rows[top], -scores[top]))]
+    return [(int(rows[i]), float(scores[i])) for i in top]
+
+
+def _normalized(vector: Sequence[float]) -> List[float]:
+    norm = math.sqrt(sum(x * x for x in vector))
+    return [x / norm for x in vector] if norm else list(vector)
+
+
+def _writable(matrix: Any) -> bool:
+    # Memory-mapped (read-only) matrices are copied on the first insertion.
+    return np is None or matrix.flags.writeable
+
+
+def _write_npy(path: str, data: array, shape: Tuple[int, int]) -> None:
+    """Writes a float32 little-endian ``.npy`` (format 1.0) without NumPy."""
+    header = f"{{'descr': '<f4', 'fortran_order': False, 'shape': {shape}, }}"
+    # Magic (6) + version (2) + length (2) + header + newline, padded to 64 bytes
+    padding = 64 - (10 + len(header) + 1) % 64
+    header = (header + " " * padding + "\n").encode("latin1")
+    if sys.byteorder != "little":
+        data = array("f", data)
+        data.byteswap()
+    with open(path, "wb") as f:
+        f.write(_NPY_MAGIC + b"\x01\x00" + len(header).to_bytes(2, "little") + header)
+        data.tofile(f)
+
+
+def _read_npy(path: str) -> array:
+    """Reads a float32 ``.npy`` written by ``save`` into a flat ``array("f")``."""
+    with open(path, "rb") as f:
+        if f.read(6) != _NPY_MAGIC:
+            raise ValueError(f"{path} is not a .npy file")
+        major = f.read(2)[0]
+        length = int.from_bytes(f.read(2 if major == 1 else 4), "little")
+        header = ast.literal_eval(f.read(length).decode("latin1"))
+        if header["descr"] not in ("<f4", "=f4") or header["fortran_order"]:
+            raise ValueError(f"{path}: unsupported array layout {header}")
+        rows = math.prod(header["shape"])
+        data = array("f")
+        data.fromfile(f, rows)
+    if sys.byteorder != "little":
+        data.byteswap()
+    return data
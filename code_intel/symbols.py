@@ -0,0 +1,172 @@
+"""code_intel.symbols
+
+Precomputed name-resolution index for Pass 2.
+
+``RelationshipVisitor`` used to resolve every call by formatting candidate IDs
+(``f"{module_id}.{name}"``, ``f"{base}.{suffix}"``) and probing the graph.
+``SymbolIndex`` is built once after Pass 1 and shared by all files. It holds:
+
+- per-module local names: dotted name relative to its module -> entity ID
+  (``"helper"``, ``"MyClass.run"``);
+- class members: class ID -> {member name -> entity ID}, used to resolve
+  ``self.x`` / ``cls.x`` inside methods (and functions nested in them);
+- package exports: package name -> {name -> qualified name}, taken from the
+  definitions and imports of each ``__init__`` module, so ``pkg.helper``
+  re-exported by ``pkg/__init__.py`` resolves to where ``helper`` is defined.
+
+Qualified names are canonicalized through the exports once and memoized, so
+repeated references cost a dict hit.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from code_intel.entities import Entity
+
+INIT_SUFFIX = ".__init__"
+
+# Guards against re-export cycles (pkg.a -> pkg.b -> pkg.a).
+MAX_REEXPORT_DEPTH = 8
+
+
+class SymbolIndex:
+    """
+    Lookup tables for resolving raw reference names to entity IDs.
+
+    Args:
+        nodes (Mapping[str, Entity]): ``graph.nodes`` after Pass 1. It is used
+            live for membership checks, so later additions are visible.
+        package_imports (Optional[Mapping[str, List[Tuple[str, str, str]]]]):
+            ``collect_imports`` output of each ``__init__`` module, keyed by
+            module ID. Enables re-export resolution.
+    """
+    def __init__(
+        self,
+        nodes: Mapping[str, Entity],
+        package_imports: Optional[Mapping[str, List[Tuple[str, str, str]]]] = None,
+    ):
+        self.nodes = nodes
+        # module ID -> {relative dotted name -> entity ID}
+        self.module_locals: Dict[str, Dict[str, str]] = {}
+        # class ID -> {member name -> entity ID}
+        self.class_members: Dict[str, Dict[str, str]] = {}
+        # package name -> {exported name -> qualified name}
+        self.exports: Dict[str, Dict[str, str]] = {}
+
+        self._enclosing_class: Dict[str, Optional[str]] = {}
+        self._canonical: Dict[str, str] = {}
+
+        self._index_entities(nodes.values())
+        for module_id, imports in (package_imports or {}).items():
+            self._add_exports(module_id, imports)
+
+    def add_module(self, entities: Iterable[Entity], imports: Optional[List[Tuple[str, str, str]]] = None) -> None:
+        """
+        Indexes one (re)scanned module. ``entities`` must start with the module
+        entity; ``imports`` are used for re-exports if it is an ``__init__``.
+        """
+        entities = list(entities)
+        self._index_entities(entities)
+        if imports and entities and entities[0].id.endswith(INIT_SUFFIX):
+            self._add_exports(entities[0].id, imports)
+        self._invalidate()
+
+    def remove_module(self, module_id: str) -> None:
+        """Forgets everything indexed for ``module_id``."""
+        for entity_id in self.module_locals.pop(module_id, {}).values():
+            self.class_members.pop(entity_id, None)
+        if module_id.endswith(INIT_SUFFIX):
+            self.exports.pop(package_of(module_id), None)
+        self._invalidate()
+
+    def _invalidate(self) -> None:
+        # Memoized answers may depend on what was added or removed.
+        self._canonical.clear()
+        self._enclosing_class.clear()
+
+    def _add_exports(self, module_id: str, imports: List[Tuple[str, str, str]]) -> None:
+        exports = self.exports.setdefault(package_of(module_id), {})
+        for local_name, qualified_name, _ in imports:
+            exports.setdefault(local_name, qualified_name)
+
+    def _index_entities(self, entities: Iterable[Entity]) -> None:
+        # Parents are always added to the graph before their children, so one
+        # pass in insertion order knows each entity's module.
+        module_of: Dict[str, str] = {}
+        for ent in entities:
+            if ent.type == "module":
+                module_of[ent.id] = ent.id
+                self.module_locals.setdefault(ent.id, {})
+                continue
+            module_id = module_of.get(ent.parent_id) if ent.parent_id else None
+            if module_id is None:
+                continue
+            module_of[ent.id] = module_id
+            self.module_locals[module_id][ent.id[len(module_id) + 1:]] = ent.id
+
+            parent = self.nodes.get(ent.parent_id)
+            if parent is not None and parent.type == "class":
+                self.class_members.setdefault(parent.id, {})[ent.name] = ent.id
+            if parent is not None and parent.type == "module" and module_id.endswith(INIT_SUFFIX):
+                # Definitions in pkg/__init__.py are reachable as pkg.<name>.
+                self.exports.setdefault(package_of(module_id), {})[ent.name] = ent.id
+
+    def local(self, module_id: str, name: str) -> Optional[str]:
+        """Entity defined in ``module_id`` under the (dotted) ``name``."""
+        names = self.module_locals.get(module_id)
+        return names.get(name) if names else None
+
+    def member(self, source_id: str, attr: str) -> Optional[str]:
+        """Resolves ``self.attr`` / ``cls.attr`` used inside ``source_id``."""
+        class_id = self.enclosing_class(source_id)
+        if class_id is None:
+            return None
+        return self.class_members.get(class_id, {}).get(attr)
+
+    def enclosing_class(self, entity_id: str) -> Optional[str]:
+        """Nearest class containing the function/method ``entity_id``."""
+        if entity_id in self._enclosing_class:
+            return self._enclosing_class[entity_id]
+        class_id = None
+        ent = self.nodes.get(entity_id)
+        while ent is not None and ent.type in ("function", "method") and ent.parent_id:
+            parent = self.nodes.get(ent.parent_id)
+            if parent is not None and parent.type == "class":
+                class_id = parent.id
+                break
+            ent = parent
+        self._enclosing_class[entity_id] = class_id
+        return class_id
+
+    def canonical(self, qualified_name: str) -> str:
+        """
+        Follows package re-exports until ``qualified_name`` names a known
+        entity. Names that do not resolve are returned unchanged.
+        """
+        hit = self._canonical.get(qualified_name)
+        if hit is None:
+            hit = self._canonical[qualified_name] = self._follow(qualified_name, 0)
+        return hit
+
+    def _follow(self, qualified_name: str, depth: int) -> str:
+        if qualified_name in self.nodes or depth >= MAX_REEXPORT_DEPTH or not self.exports:
+            return qualified_name
+        parts = qualified_name.split(".")
+        # Longest package prefix first: pkg.sub.name before pkg.sub...
+        for i in range(len(parts) - 1, 0, -1):
+            exports = self.exports.get(".".join(parts[:i]))
+            if not exports or parts[i] not in exports:
+                continue
+            target = ".".join([exports[parts[i]]] + parts[i + 1:])
+            if target == qualified_name:
+                continue
+            resolved = self._follow(target, depth + 1)
+            if resolved in self.nodes:
+                return resolved
+        return qualified_name
+
+
+def package_of(module_id: str) -> str:
+    """'pkg.sub.__init__' -> 'pkg.sub'"""
+    return module_id[: -len(INIT_SUFFIX)] if module_id.endswith(INIT_SUFFIX) else module_id
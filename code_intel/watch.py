@@ -0,0 +1,175 @@
+"""code_intel.watch
+
+Watch mode: keep the graph in memory and apply file edits as they happen.
+
+``FileWatcher`` polls the tree (through the scanner's ``FileDiscovery``, so
+the same ignore rules apply) and compares each file's mtime and size with the
+previous poll. Stdlib only: no inotify/FSEvents dependency.
+
+A poll does not walk the tree again. Creating, deleting or renaming an entry
+changes its directory's mtime, so only directories whose mtime (or
+``.gitignore``) changed are listed again and matched against the ignore
+rules; the files already known are just ``stat``-ed. Directories modified
+within ``RACY_SECONDS`` of being listed are listed again on the next poll,
+in case a second change landed within the file system's mtime granularity.
+
+``watch`` feeds the changes to ``ProjectScanner.update_files`` (live scan),
+which retracts the changed files from the graph, rescans them and re-resolves
+their dependents, then hands the changed facets to a callback that rewrites
+only the affected outputs.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from code_intel.discovery import GITIGNORE, FileDiscovery, IgnoreRule
+from code_intel.scanner import ProjectScanner
+
+DEFAULT_INTERVAL = 0.5
+# Coarsest mtime granularity expected (FAT, HFS+ and some network file systems)
+RACY_SECONDS = 2.0
+
+
+@dataclass
+class WatchedDir:
+    """
+    A directory as of its last listing.
+
+    Attributes:
+        rel_path (str): Path relative to the watched root ("" for the root).
+        rules (List[IgnoreRule]): Ignore rules that apply inside it.
+        signature (Tuple): (directory mtime, ``.gitignore`` mtime and size).
+        listed_ns (int): Wall-clock time of the listing.
+        files (List[str]): Matching files directly inside it.
+        subdirs (List[Tuple[str, str]]): (path, rel_path) of the subdirectories walked.
+    """
+    rel_path: str
+    rules: List[IgnoreRule]
+    signature: Tuple
+    listed_ns: int
+    files: List[str] = field(default_factory=list)
+    subdirs: List[Tuple[str, str]] = field(default_factory=list)
+
+
+class FileWatcher:
+    """
+    Detects created, modified and deleted files between polls.
+
+    Args:
+        discovery (FileDiscovery): Walker defining the watched files.
+    """
+    def __init__(self, discovery: FileDiscovery):
+        self.discovery = discovery
+        self._dirs: Dict[str, WatchedDir] = {}
+        self._stats: Dict[str, Tuple[int, int]] = self._snapshot()
+
+    def poll(self) -> Tuple[List[str], List[str]]:
+        """Returns (changed, deleted) paths since the previous poll; new files count as changed."""
+        current = self._snapshot()
+        changed = [path for path, stat in current.items() if self._stats.get(path) != stat]
+        deleted = [path for path in self._stats if path not in current]
+        self._stats = current
+        return sorted(changed, key=_walk_order), sorted(deleted, key=_walk_order)
+
+    def _snapshot(self) -> Dict[str, Tuple[int, int]]:
+        root = self.discovery.root_path
+        self._refresh(root, "", [], force=root not in self._dirs)
+        stats: Dict[str, Tuple[int, int]] = {}
+        for watched in self._dirs.values():
+            for path in watched.files:
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                stats[path] = (st.st_mtime_ns, st.st_size)
+        return stats
+
+    def _refresh(self, path: str, rel_path: str, parent_rules: List[IgnoreRule], force: bool) -> None:
+        """
+        Lists ``path`` again if it changed (or ``force``), then its subdirectories.
+        ``force`` also reloads the ignore rules, which subdirectories inherit.
+        """
+        signature = self._signature(path)
+        watched = self._dirs.get(path)
+        if signature is None:
+            self._forget(path)
+            return
+        if watched is not None and not force and watched.signature == signature and not _racy(watched):
+            for sub_path, sub_rel in watched.subdirs:
+                self._refresh(sub_path, sub_rel, watched.rules, False)
+            return
+
+        reload_rules = force or watched is None or watched.signature[1] != signature[1]
+        rules = self.discovery.dir_rules(path, rel_path, parent_rules) if reload_rules else watched.rules
+        listed_ns = time.time_ns()
+        files, subdirs = self.discovery.list_dir(path, rel_path, rules)
+        if watched is not None:
+            for sub_path in {p for p, _ in watched.subdirs} - {p for p, _ in subdirs}:
+                self._forget(sub_path)
+        self._dirs[path] = WatchedDir(rel_path, rules, signature, listed_ns, files, subdirs)
+        for sub_path, sub_rel in subdirs:
+            self._refresh(sub_path, sub_rel, rules, reload_rules)
+
+    def _forget(self, path: str) -> None:
+        watched = self._dirs.pop(path, None)
+        if watched is not None:
+            for sub_path, _ in watched.subdirs:
+                self._forget(sub_path)
+
+    def _signature(self, path: str) -> Optional[Tuple]:
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        ignore_stat = None
+        if self.discovery.use_gitignore:
+            try:
+                st = os.stat(os.path.join(path, GITIGNORE))
+                ignore_stat = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                pass
+        return mtime_ns, ignore_stat
+
+
+def _racy(watched: WatchedDir) -> bool:
+    """Whether the directory changed too close to its listing to trust its mtime."""
+    return watched.listed_ns - watched.signature[0] < RACY_SECONDS * 1e9
+
+
+def _walk_order(path: str) -> List[str]:
+    return path.split(os.sep)
+
+
+def watch(
+    scanner: ProjectScanner,
+    on_update: Callable[[Set[str]], None],
+    interval: float = DEFAULT_INTERVAL,
+    watcher: Optional[FileWatcher] = None,
+) -> None:
+    """
+    Polls for edits forever (until KeyboardInterrupt) and applies them.
+
+    ``scanner`` must be a live scanner that already ran ``scan()``. Pass a
+    ``watcher`` created before that scan so edits made during it are not missed.
+    """
+    watcher = watcher if watcher is not None else FileWatcher(scanner.discovery)
+    print(f"Watching {scanner.root_path} for changes (Ctrl+C to stop)...")
+    while True:
+        time.sleep(interval)
+        changed, deleted = watcher.poll()
+        if not changed and not deleted:
+            continue
+
+        start = time.perf_counter()
+        facets = scanner.update_files(changed, deleted)
+        elapsed = (time.perf_counter() - start) * 1000
+        graph = scanner.graph
+        print(
+            f"Updated {len(changed)} changed / {len(deleted)} deleted file(s) in {elapsed:.0f} ms "
+            f"({len(graph.nodes)} nodes, {len(graph.edges)} edges)"
+        )
+        on_update(facets)
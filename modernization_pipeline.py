@@ -8,6 +8,7 @@ from pathlib import Path
 from code_intel.scanner import LocalScanner
 from code_intel.graph_builder import CodeGraphPipeline
 from code_intel.embedder import BGEEmbedder
+from code_intel.embedding_cache import CACHE_FILENAME, EmbeddingCache, embed_cached
 from code_intel.chunker import HybridChunker
 from code_intel.logger import PipelineLogger
 from code_intel.storage import VectorStore
@@ -40,7 +41,7 @@ def run_modernization_pipeline(repo_path: str, target_subfolder_str: str):
 
     # --- PASS 2: Target File Analysis ---
     # Analyze all .py files in the target folder
-    target_files = [str(p) for p in Path(target_path).rglob('*.py')]
+    target_files = LocalScanner(str(target_path)).get_files()
     print(f"🔗 Found {len(target_files)} files in target. Building relationships...")
 
     target_chunks = []
@@ -69,11 +70,27 @@ def run_modernization_pipeline(repo_path: str, target_subfolder_str: str):
         print("[Warning] No graph was built (empty or None). Skipping graph export.")
 
 
-    # Embedding and storing chunks
+    # Embedding and storing chunks (unchanged chunks come from the on-disk cache)
     print(f"🔎 Embedding {len(target_chunks)} code chunks...")
-    for chunk in target_chunks:
-        embedding = embedder.embed(chunk["content"])
-        store.add_embedding(chunk["content"], embedding, chunk["file_path"], chunk["name"])
+    cache_path = os.environ.get("EMBEDDING_CACHE", CACHE_FILENAME)
+    with EmbeddingCache(cache_path) as cache:
+        embeddings = embed_cached(
+            cache,
+            embedder.model,
+            [chunk["content"] for chunk in target_chunks],
+            embedder.embed_batch,
+        )
+        print(f"   {cache.hits} cached, {cache.misses} embedded ({cache_path})")
+    store.add_embeddings(
+        [chunk["content"] for chunk in target_chunks],
+        embeddings,
+        [chunk["file_path"] for chunk in target_chunks],
+        [chunk["name"] for chunk in target_chunks],
+    )
+    # Next to the analyzer outputs in results/; vector directories are gitignored.
+    vectors_dir = os.path.join("results", f"{target_path.name}_vectors")
+    store.save(vectors_dir)
+    print(f"Vector store ({len(store)} chunks) written to {vectors_dir}")
 
     # LLM-based code explanation
     chat = ModernizationChat()
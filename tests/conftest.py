@@ -0,0 +1,111 @@
+"""Shared fixtures: the bundled sample project and a small synthetic package."""
+
+import os
+import shutil
+import textwrap
+
+import pytest
+
+SAMPLE_PROJECT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample_project")
+
+# A package exercising what the sample project does not: package re-exports,
+# relative and aliased imports, an import cycle (core <-> util), mutual
+# recursion (even/odd), repeated call sites and a file that does not parse.
+SYNTHETIC_FILES = {
+    "app/__init__.py": """
+        from .core import Engine
+    """,
+    "app/core.py": """
+        from app import util
+        from .util import helper
+
+
+        class Engine:
+            def start(self):
+                helper()
+                self.step()
+                return util.format_name("x")
+
+            def step(self):
+                return helper()
+    """,
+    "app/util.py": """
+        from app import core
+
+
+        def helper():
+            return format_name("y")
+
+
+        def format_name(name):
+            return name.upper()
+
+
+        def even(n):
+            return n == 0 or odd(n - 1)
+
+
+        def odd(n):
+            return n != 0 and even(n - 1)
+    """,
+    "main.py": """
+        from app import Engine
+        import app.util as u
+
+
+        class Runner(Engine):
+            def run(self):
+                self.start()
+                u.helper()
+                u.helper()
+
+
+        def main():
+            Runner().run()
+    """,
+    "broken.py": """
+        def oops(:
+            pass
+    """,
+}
+
+
+def write_files(root, files):
+    """Writes ``{relative path: source}`` under ``root`` (sources are dedented)."""
+    for rel_path, source in files.items():
+        path = os.path.join(str(root), rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(textwrap.dedent(source).lstrip())
+
+
+def graph_state(graph, ordered=True):
+    """Entities and edges of ``graph`` as plain tuples, in graph order or sorted."""
+    nodes = [
+        (e.id, e.name, e.type, e.file_path, e.line_number, e.parent_id) for e in graph.nodes.values()
+    ]
+    edges = [(r.source_id, r.target_id, r.type, r.count, r.lines) for r in graph.edges]
+    if not ordered:
+        nodes.sort()
+        edges = sorted(edges, key=lambda edge: edge[:4] + (sorted(edge[4] or ()),))
+    return nodes, edges
+
+
+@pytest.fixture
+def sample_project(tmp_path):
+    """A private copy of tests/sample_project."""
+    root = tmp_path / "sample_project"
+    shutil.copytree(SAMPLE_PROJECT, str(root))
+    return str(root)
+
+
+@pytest.fixture
+def synthetic_project(tmp_path):
+    root = tmp_path / "synthetic"
+    write_files(root, SYNTHETIC_FILES)
+    return str(root)
+
+
+@pytest.fixture(params=["sample", "synthetic"])
+def project(request, sample_project, synthetic_project):
+    return sample_project if request.param == "sample" else synthetic_project
@@ -0,0 +1,149 @@
+"""PageRank and betweenness of the call graph, checked against direct computations."""
+
+import random
+from collections import deque
+
+import pytest
+
+from code_intel import centrality
+from code_intel.centrality import CallGraphCSR, Centrality, betweenness, pagerank
+from code_intel.entities import Entity
+from code_intel.graph import CodeGraph
+from code_intel.metrics import GraphMetrics
+from code_intel.relations import REL_CALLS, REL_IMPORTS, Relationship
+from code_intel.report import CodeReporter
+from code_intel.scanner import ProjectScanner
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    """Runs a test with NumPy (when installed) and with the pure-Python fallback."""
+    if request.param == "numpy":
+        if centrality.np is None:
+            pytest.skip("NumPy is not installed")
+    else:
+        monkeypatch.setattr(centrality, "np", None)
+    return request.param
+
+
+def call_graph(edges, nodes=()):
+    graph = CodeGraph()
+    for entity_id in sorted(set(nodes) | {node for edge in edges for node in edge[:2]}):
+        graph.add_entity(Entity(entity_id, entity_id, "function", "m.py", 1))
+    for source, target, *count in edges:
+        graph.add_relationship(Relationship(source, target, REL_CALLS, count[0] if count else 1))
+    return graph
+
+
+def random_call_graph(seed, n=12, m=30):
+    rnd = random.Random(seed)
+    names = [f"f{i}" for i in range(n)]
+    return call_graph([(rnd.choice(names), rnd.choice(names), rnd.randint(1, 3)) for _ in range(m)])
+
+
+def reference_pagerank(csr, damping=0.85, iterations=500):
+    n = len(csr.nodes)
+    out = [sum(csr.weights[csr.offsets[u]:csr.offsets[u + 1]]) for u in range(n)]
+    rank = [1.0 / n] * n
+    for _ in range(iterations):
+        dangling = sum(rank[u] for u in range(n) if out[u] == 0)
+        new = [(1 - damping + damping * dangling) / n] * n
+        for u in range(n):
+            for p in range(csr.offsets[u], csr.offsets[u + 1]):
+                new[csr.targets[p]] += damping * rank[u] * csr.weights[p] / out[u]
+        rank = new
+    return rank
+
+
+def reference_betweenness(csr):
+    """Straight from the definition: sum over (s, t) of the share of shortest s-t paths through v."""
+    n = len(csr.nodes)
+
+    def bfs(s):
+        dist, sigma = {s: 0}, {s: 1}
+        queue = deque([s])
+        while queue:
+            u = queue.popleft()
+            for v in csr.targets[csr.offsets[u]:csr.offsets[u + 1]]:
+                if v not in dist:
+                    dist[v], sigma[v] = dist[u] + 1, 0
+                    queue.append(v)
+                if dist[v] == dist[u] + 1:
+                    sigma[v] += sigma[u]
+        return dist, sigma
+
+    paths = [bfs(s) for s in range(n)]
+    scores = [0.0] * n
+    for s in range(n):
+        dist_s, sigma_s = paths[s]
+        for t in dist_s:
+            if t == s:
+                continue
+            for v in range(n):
+                if v in (s, t) or v not in dist_s:
+                    continue
+                dist_v, sigma_v = paths[v]
+                if t in dist_v and dist_s[v] + dist_v[t] == dist_s[t]:
+                    scores[v] += sigma_s[v] * sigma_v[t] / sigma_s[t]
+    return [score / ((n - 1) * (n - 2)) for score in scores]
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_pagerank_matches_reference(backend, seed):
+    csr = CallGraphCSR.from_graph(random_call_graph(seed))
+    ranks = pagerank(csr, tolerance=1e-12, max_iterations=1000)
+    assert sum(ranks) == pytest.approx(1.0)
+    assert list(ranks) == pytest.approx(reference_pagerank(csr), abs=1e-9)
+
+
+def test_pagerank_of_a_cycle_is_uniform(backend):
+    csr = CallGraphCSR.from_graph(call_graph([("a", "b"), ("b", "c"), ("c", "a")]))
+    assert list(pagerank(csr)) == pytest.approx([1 / 3] * 3)
+
+
+def test_pagerank_weights_call_sites(backend):
+    csr = CallGraphCSR.from_graph(call_graph([("root", "often", 9), ("root", "rarely", 1)]))
+    ranks = dict(zip(csr.nodes, pagerank(csr)))
+    assert ranks["often"] > ranks["rarely"]
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_exact_betweenness_matches_definition(seed):
+    csr = CallGraphCSR.from_graph(random_call_graph(seed))
+    assert list(betweenness(csr, samples=None)) == pytest.approx(reference_betweenness(csr))
+
+
+def test_betweenness_of_a_chain():
+    csr = CallGraphCSR.from_graph(call_graph([("a", "b"), ("b", "c")]))
+    scores = dict(zip(csr.nodes, betweenness(csr, samples=None)))
+    # b lies on the only a -> c path: 1 / ((n - 1) * (n - 2)) = 0.5
+    assert scores == pytest.approx({"a": 0.0, "b": 0.5, "c": 0.0})
+
+
+def test_sampled_betweenness_is_deterministic():
+    csr = CallGraphCSR.from_graph(random_call_graph(0, n=40, m=120))
+    assert list(betweenness(csr, samples=10)) == list(betweenness(csr, samples=10))
+    assert list(betweenness(csr, samples=40)) == list(betweenness(csr, samples=None))
+
+
+def test_call_graph_ignores_other_edges():
+    graph = call_graph([("a", "b")])
+    graph.add_relationship(Relationship("a", "os.path", REL_CALLS))
+    graph.add_relationship(Relationship("b", "a", REL_IMPORTS))
+    csr = CallGraphCSR.from_graph(graph)
+    assert csr.nodes == ["a", "b"]
+    assert list(csr.targets) == [1]
+
+
+def test_central_entities_ranking():
+    graph = call_graph([("a", "hub"), ("b", "hub"), ("c", "hub"), ("hub", "leaf")])
+    ranked = Centrality.compute(graph, samples=None).central_entities(limit=2)
+    assert [entity_id for entity_id, _, _ in ranked] == ["leaf", "hub"]
+
+
+def test_report_centrality_is_opt_in(sample_project):
+    graph = CodeGraph()
+    ProjectScanner(sample_project, graph).scan()
+    metrics = GraphMetrics(graph)
+    assert "Most Central Functions" not in CodeReporter(graph, metrics).generate_markdown()
+    assert "Most Central Functions" in CodeReporter(graph, metrics, centrality=True).generate_markdown()
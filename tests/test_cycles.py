@@ -0,0 +1,116 @@
+"""Strongly connected components and the condensed DAG, checked against brute force."""
+
+import random
+from array import array
+
+import pytest
+
+from code_intel.compact_graph import build_csr
+from code_intel.cycles import condense, strongly_connected_components
+from code_intel.entities import Entity
+from code_intel.graph import CodeGraph
+from code_intel.relations import REL_CALLS, REL_IMPORTS, Relationship
+from code_intel.scanner import ProjectScanner
+
+
+def csr(n, edges):
+    src = array("i", [u for u, _ in edges])
+    offsets, order = build_csr(src, n)
+    return offsets, array("i", [edges[i][1] for i in order])
+
+
+def reachability(n, edges):
+    reach = [{v} for v in range(n)]
+    changed = True
+    while changed:
+        changed = False
+        for u, v in edges:
+            if not reach[v] <= reach[u]:
+                reach[u] |= reach[v]
+                changed = True
+    return reach
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_scc_matches_mutual_reachability(seed):
+    rnd = random.Random(seed)
+    n = rnd.randint(1, 25)
+    edges = [(rnd.randrange(n), rnd.randrange(n)) for _ in range(rnd.randint(0, 3 * n))]
+    component, count = strongly_connected_components(*csr(n, edges))
+    reach = reachability(n, edges)
+
+    assert sorted(set(component)) == list(range(count))
+    for u in range(n):
+        for v in range(n):
+            assert (component[u] == component[v]) == (v in reach[u] and u in reach[v])
+    # Reverse topological numbering: edges never point to a higher component.
+    assert all(component[u] >= component[v] for u, v in edges)
+
+
+def test_scc_handles_deep_chains():
+    n = 20000
+    edges = [(i, i + 1) for i in range(n - 1)] + [(n - 1, 0)]
+    component, count = strongly_connected_components(*csr(n, edges))
+    assert count == 1
+
+
+def graph_from_edges(edges, rel_type=REL_IMPORTS):
+    graph = CodeGraph()
+    for entity_id in sorted({node for edge in edges for node in edge}):
+        graph.add_entity(Entity(entity_id, entity_id, "module", f"{entity_id}.py", 0))
+    for source, target in edges:
+        graph.add_relationship(Relationship(source, target, rel_type))
+    return graph
+
+
+@pytest.mark.parametrize("seed", range(15))
+def test_condensation_layers_and_cycle_paths(seed):
+    rnd = random.Random(seed)
+    names = [f"m{i}" for i in range(rnd.randint(2, 15))]
+    edges = [(rnd.choice(names), rnd.choice(names)) for _ in range(rnd.randint(1, 30))]
+    graph = graph_from_edges(edges)
+    condensed = condense(graph, (REL_IMPORTS,), ("module",))
+
+    assert sorted(condensed.nodes) == sorted(graph.nodes)
+    number = {entity_id: i for i, entity_id in enumerate(condensed.nodes)}
+    reach = reachability(len(condensed.nodes), [(number[u], number[v]) for u, v in edges])
+
+    # A component sits strictly above everything it depends on, and exactly one above its highest dependency.
+    for c in range(len(condensed.members)):
+        deps = condensed.dag_targets[condensed.dag_offsets[c]:condensed.dag_offsets[c + 1]]
+        assert c not in deps
+        assert condensed.layers[c] == (max(condensed.layers[d] for d in deps) + 1 if len(deps) else 0)
+    assert sorted(sum(condensed.layered(), [])) == sorted(graph.nodes)
+
+    edge_set = set(edges)
+    for c in condensed.cycles():
+        members = condensed.member_ids(c)
+        assert len(members) > 1
+        path = condensed.cycle_path(c)
+        assert path[0] == path[-1] == members[0]
+        assert all(step in edge_set for step in zip(path, path[1:]))
+        assert set(path) <= set(members)
+        for u in members:
+            assert all(number[v] in reach[number[u]] for v in members)
+
+
+def test_condense_ignores_external_and_other_edges():
+    graph = graph_from_edges([("a", "b"), ("b", "a")])
+    graph.add_relationship(Relationship("a", "os", REL_IMPORTS))
+    graph.add_relationship(Relationship("b", "c", REL_CALLS))
+    condensed = condense(graph, (REL_IMPORTS,))
+    assert sorted(condensed.nodes) == ["a", "b"]
+    assert [condensed.member_ids(c) for c in condensed.cycles()] == [["a", "b"]]
+
+
+def test_import_cycle_through_package(synthetic_project):
+    graph = CodeGraph()
+    ProjectScanner(synthetic_project, graph).scan()
+
+    imports = condense(graph, (REL_IMPORTS,), ("module",))
+    cycles = [imports.member_ids(c) for c in imports.cycles()]
+    # ``from app import util`` imports the package, i.e. app/__init__.py.
+    assert cycles == [["app.__init__", "app.core", "app.util"]]
+
+    calls = condense(graph, (REL_CALLS,))
+    assert [calls.member_ids(c) for c in calls.cycles()] == [["app.util.even", "app.util.odd"]]
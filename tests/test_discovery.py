@@ -0,0 +1,142 @@
+"""File discovery: gitignore pattern semantics and the pruned, sorted walk."""
+
+import os
+
+import pytest
+
+from code_intel.discovery import FileDiscovery, compile_pattern, is_ignored
+
+from conftest import write_files
+
+# (patterns, root-relative path, is a directory, ignored). Every row agrees with
+# ``git check-ignore --no-index``.
+PATTERN_CASES = [
+    (["*.pyc"], "a.pyc", False, True),
+    (["*.pyc"], "x/y/a.pyc", False, True),
+    (["*.pyc"], "a.py", False, False),
+    (["build/"], "build", True, True),
+    (["build/"], "build", False, False),
+    (["build/"], "src/build", True, True),
+    (["/build"], "build", False, True),
+    (["/build"], "src/build", False, False),
+    (["docs/*.md"], "docs/a.md", False, True),
+    (["docs/*.md"], "docs/sub/a.md", False, False),
+    (["docs/*.md"], "x/docs/a.md", False, False),
+    (["foo/bar"], "x/foo/bar", False, False),
+    (["**/logs"], "logs", True, True),
+    (["**/logs"], "a/b/logs", True, True),
+    (["**/logs/*.txt"], "a/logs/x.txt", False, True),
+    (["logs/**"], "logs/a", False, True),
+    (["logs/**"], "logs/a/b", False, True),
+    (["logs/**"], "logs", True, False),
+    (["a/**/b"], "a/b", False, True),
+    (["a/**/b"], "a/x/b", False, True),
+    (["a/**/b"], "a/x/y/b", False, True),
+    (["a/**/b"], "xa/b", False, False),
+    (["a**b"], "axxb", False, True),
+    (["a**b"], "ax/xb", False, False),
+    (["*.log", "!keep.log"], "x.log", False, True),
+    (["*.log", "!keep.log"], "keep.log", False, False),
+    (["*.log", "!keep.log"], "d/keep.log", False, False),
+    (["!keep.log", "*.log"], "keep.log", False, True),
+    (["*", "!*/", "!*.py"], "pkg", True, False),
+    (["*", "!*/", "!*.py"], "pkg/a.py", False, False),
+    (["*", "!*/", "!*.py"], "pkg/a.txt", False, True),
+    (["?.txt"], "a.txt", False, True),
+    (["?.txt"], "ab.txt", False, False),
+    (["?.txt"], "dir/a.txt", False, True),
+    (["[abc].py"], "a.py", False, True),
+    (["[abc].py"], "d.py", False, False),
+    (["[!abc].py"], "d.py", False, True),
+    (["[!abc].py"], "a.py", False, False),
+    (["[a-c]x"], "bx", False, True),
+    (["\\#file"], "#file", False, True),
+    (["\\!important"], "!important", False, True),
+    (["trailing   "], "trailing", False, True),
+    (["name\\ "], "name ", False, True),
+    (["name\\ "], "name", False, False),
+    (["# comment"], "# comment", False, False),
+]
+
+
+@pytest.mark.parametrize("patterns, rel_path, is_dir, ignored", PATTERN_CASES)
+def test_gitignore_patterns(patterns, rel_path, is_dir, ignored):
+    rules = [rule for rule in map(compile_pattern, patterns) if rule is not None]
+    assert is_ignored(rules, rel_path, is_dir) == ignored
+
+
+@pytest.mark.parametrize("line", ["", "   ", "\n", "# comment", "!", "/", "!/"])
+def test_lines_without_patterns(line):
+    assert compile_pattern(line) is None
+
+
+def test_rules_are_relative_to_their_gitignore():
+    # Read from sub/.gitignore
+    rules = [compile_pattern("*.tmp", "sub"), compile_pattern("/top.py", "sub")]
+    assert is_ignored(rules, "sub/a.tmp", False)
+    assert is_ignored(rules, "sub/deep/a.tmp", False)
+    assert not is_ignored(rules, "a.tmp", False)
+    assert not is_ignored(rules, "other/sub/a.tmp", False)
+    assert is_ignored(rules, "sub/top.py", False)
+    assert not is_ignored(rules, "sub/deep/top.py", False)
+
+
+TREE = {
+    ".gitignore": """
+        *.log
+        /generated/
+        secret_*.py
+        !secret_ok.py
+    """,
+    "a.py": "",
+    "b.txt": "",
+    "x.log": "",
+    "only_here.py": "",
+    "secret_key.py": "",
+    "secret_ok.py": "",
+    "generated/g.py": "",
+    "node_modules/m.py": "",
+    ".venv/lib/v.py": "",
+    "build/b.py": "",
+    "src/.gitignore": """
+        local.py
+        /only_here.py
+    """,
+    "src/local.py": "",
+    "src/only_here.py": "",
+    "src/generated/g.py": "",
+    "src/deep/local.py": "",
+    "src/deep/only_here.py": "",
+    "tests/test_a.py": "",
+}
+
+
+@pytest.mark.parametrize("options, expected", [
+    ({}, ["a.py", "only_here.py", "secret_ok.py", "src/deep/only_here.py", "src/generated/g.py", "tests/test_a.py"]),
+    ({"exclude": ["tests/", "a.py"]}, ["only_here.py", "secret_ok.py", "src/deep/only_here.py", "src/generated/g.py"]),
+    ({"include": ["*.txt", "*.log"]}, ["b.txt"]),
+    ({"use_gitignore": False}, [
+        "a.py", "generated/g.py", "only_here.py", "secret_key.py", "secret_ok.py", "src/deep/local.py",
+        "src/deep/only_here.py", "src/generated/g.py", "src/local.py", "src/only_here.py", "tests/test_a.py",
+    ]),
+    ({"exclude_dirs": ()}, [
+        ".venv/lib/v.py", "a.py", "build/b.py", "node_modules/m.py", "only_here.py", "secret_ok.py",
+        "src/deep/only_here.py", "src/generated/g.py", "tests/test_a.py",
+    ]),
+])
+def test_walk(tmp_path, options, expected):
+    write_files(tmp_path, TREE)
+    root = str(tmp_path)
+    discovery = FileDiscovery(root, **options)
+    found = [os.path.relpath(path, root).replace(os.sep, "/") for path in discovery.iter_files()]
+    assert found == expected
+
+    # Walking level by level with list_dir finds the same files in the same order.
+    def walk(path, rel_path, inherited):
+        rules = discovery.dir_rules(path, rel_path, inherited)
+        files, subdirs = discovery.list_dir(path, rel_path, rules)
+        entries = [(os.path.basename(p), [p]) for p in files]
+        entries += [(os.path.basename(p), walk(p, rel, rules)) for p, rel in subdirs]
+        return [p for _, paths in sorted(entries) for p in paths]
+
+    assert walk(root, "", []) == discovery.find_files()
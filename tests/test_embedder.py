@@ -0,0 +1,145 @@
+"""BGEEmbedder batching, ordering and retries, against a local stand-in for the embedding API."""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("dotenv")
+
+from code_intel import embedder  # noqa: E402
+from code_intel.embedder import EMBEDDING_DIM, BGEEmbedder  # noqa: E402
+
+
+def vector_of(text):
+    """The stand-in's embedding of ``text``: distinct per text, so order mistakes show."""
+    return [float(len(text)), float(sum(map(ord, text)))]
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """
+    Answers ``:batchEmbedText`` and ``:embedText``. ``failures`` is a queue of
+    (status, headers) answered before succeeding; ``jitter`` delays replies at
+    random so concurrent batches finish out of order.
+    """
+    failures = []
+    jitter = 0.0
+    requests = []
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.lock:
+            self.requests.append((self.path, body))
+            failure = self.failures.pop(0) if self.failures else None
+        if self.jitter:
+            time.sleep(random.random() * self.jitter)
+        if failure is not None:
+            status, headers = failure
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(b"try again")
+            return
+        if ":batchEmbedText" in self.path:
+            payload = {"embeddings": [{"value": vector_of(text)} for text in body["texts"]]}
+        else:
+            payload = {"embedding": {"value": vector_of(body["text"])}}
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    StandIn.failures, StandIn.jitter, StandIn.requests = [], 0.0, []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    thread = threading.Thread(target=httpd.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Records backoff delays instead of sleeping them."""
+    delays = []
+    monkeypatch.setattr(embedder.time, "sleep", delays.append)
+    return delays
+
+
+def make(base_url, **options):
+    return BGEEmbedder(api_key="test-key", base_url=base_url, **options)
+
+
+@pytest.mark.parametrize("batch_size, max_workers", [(100, 4), (7, 1), (7, 4), (1, 8)])
+def test_embed_batch_keeps_input_order(server, batch_size, max_workers):
+    StandIn.jitter = 0.01
+    texts = [f"text {i} " * (i % 5 + 1) for i in range(60)]
+    client = make(server, batch_size=batch_size, max_workers=max_workers)
+    assert client.embed_batch(texts) == [vector_of(text) for text in texts]
+    assert client.embed_batch([]) == []
+    client.close()
+
+    batches = [body["texts"] for path, body in StandIn.requests]
+    assert all(path.endswith("/models/embedding-001:batchEmbedText?key=test-key") for path, _ in StandIn.requests)
+    assert sorted(map(len, batches)) == sorted(len(texts[i:i + batch_size]) for i in range(0, 60, batch_size))
+
+
+def test_base_url_from_environment(server, monkeypatch):
+    monkeypatch.setenv("EMBEDDING_API_URL", server + "/")
+    client = BGEEmbedder(api_key="test-key")
+    assert client.embed("hello") == vector_of("hello")
+    assert StandIn.requests[0][0].startswith("/models/embedding-001:embedText")
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_retries_and_honours_retry_after(server, sleeps, status):
+    StandIn.failures = [(status, {"Retry-After": "3"}), (status, {})]
+    client = make(server, backoff=0.5)
+    assert client.embed_batch(["a", "bb"]) == [vector_of("a"), vector_of("bb")]
+    assert len(StandIn.requests) == 3
+    # Retry-After wins; otherwise jittered exponential backoff: 0.5 * 2 ** 1 * [0.5, 1).
+    assert sleeps[0] == 3.0
+    assert 0.5 <= sleeps[1] < 1.0
+
+
+def test_client_errors_are_not_retried(server, sleeps):
+    StandIn.failures = [(400, {})]
+    assert make(server).embed_batch(["a"]) == [[0.0] * EMBEDDING_DIM]
+    assert len(StandIn.requests) == 1 and sleeps == []
+
+
+def test_zero_vectors_once_retries_run_out(server, sleeps):
+    StandIn.failures = [(503, {})] * 3
+    client = make(server, batch_size=2, max_workers=1, max_retries=2)
+    # The first batch uses up every attempt; the second one succeeds.
+    assert client.embed_batch(["a", "b", "c"]) == [[0.0] * EMBEDDING_DIM] * 2 + [vector_of("c")]
+    assert len(StandIn.requests) == 4 and len(sleeps) == 2
+    StandIn.failures = [(429, {})] * 3
+    assert client.embed("d") == [0.0] * EMBEDDING_DIM
+
+
+def test_unreachable_server_falls_back_to_zero_vectors(sleeps):
+    client = make("http://127.0.0.1:9", max_retries=1, timeout=1.0)
+    assert client.embed_batch(["a"]) == [[0.0] * EMBEDDING_DIM]
+    assert len(sleeps) == 1
+
+
+def test_missing_api_key(server, monkeypatch):
+    for name in ("GOOGLE_API_KEY", "GEMINI_API_KEY"):
+        monkeypatch.delenv(name, raising=False)
+    with pytest.raises(ValueError, match="GEMINI_API_KEY"):
+        BGEEmbedder(base_url=server).embed_batch(["a"])
@@ -0,0 +1,106 @@
+"""EmbeddingCache: keys, LRU eviction and persistence, and embed_cached's request savings."""
+
+import hashlib
+import sqlite3
+
+import pytest
+
+from code_intel.embedding_cache import EmbeddingCache, embed_cached, text_digest
+
+
+def vector_of(text):
+    # Exactly representable in float32, so round trips compare equal.
+    return [float(len(text)), 0.5, -1.25]
+
+
+class CountingEmbedder:
+    def __init__(self, fail=()):
+        self.calls = []
+        self.fail = set(fail)
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [[0.0, 0.0, 0.0] if text in self.fail else vector_of(text) for text in texts]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with EmbeddingCache(str(tmp_path / "cache" / "embeddings.sqlite"), max_entries=None) as cache:
+        yield cache
+
+
+def test_keyed_on_model_and_text_digest(cache):
+    cache.put("model-a", "def f(): pass", [1.0, 2.0])
+    assert cache.get("model-a", "def f(): pass") == [1.0, 2.0]
+    assert cache.get("model-b", "def f(): pass") is None
+    assert cache.get("model-a", "def f():  pass") is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    rows = sqlite3.connect(cache.path).execute("SELECT model, digest, dim FROM embeddings").fetchall()
+    assert rows == [("model-a", hashlib.sha256(b"def f(): pass").hexdigest(), 2)]
+    assert text_digest("hé") == hashlib.sha256("hé".encode("utf-8")).hexdigest()
+
+
+def test_get_many_keeps_order_and_duplicates(cache):
+    cache.put_many("m", [("a", [1.0]), ("b", [2.0])])
+    assert cache.get_many("m", ["b", "x", "a", "b"]) == [[2.0], None, [1.0], [2.0]]
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_put_replaces(cache):
+    cache.put("m", "a", [1.0])
+    cache.put("m", "a", [3.0, 4.0])
+    assert len(cache) == 1 and cache.get("m", "a") == [3.0, 4.0]
+
+
+def test_evicts_least_recently_used(tmp_path):
+    with EmbeddingCache(str(tmp_path / "lru.sqlite"), max_entries=3) as cache:
+        for text in ("a", "b", "c"):
+            cache.put("m", text, vector_of(text))
+        # Reading "a" makes "b" the least recently used.
+        assert cache.get("m", "a") is not None
+        cache.put("m", "d", vector_of("d"))
+        assert len(cache) == 3
+        assert [cache.get("m", text) is not None for text in "abcd"] == [True, False, True, True]
+        cache.put_many("m", [("e", vector_of("e")), ("f", vector_of("f"))])
+        assert len(cache) == 3
+        assert [text for text in "acdef" if cache.get("m", text) is not None] == ["d", "e", "f"]
+
+
+def test_persists_and_keeps_the_lru_clock(tmp_path):
+    path = str(tmp_path / "lru.sqlite")
+    with EmbeddingCache(path, max_entries=2) as cache:
+        cache.put("m", "old", [1.0])
+        cache.put("m", "new", [2.0])
+    with EmbeddingCache(path, max_entries=2) as cache:
+        assert cache.get("m", "old") == [1.0]
+        cache.put("m", "newest", [3.0])
+        assert cache.get("m", "new") is None
+        assert cache.get("m", "old") == [1.0]
+
+
+def test_embed_cached_requests_only_missing_texts(cache):
+    texts = ["a", "bb", "a", "ccc"]
+    embedder = CountingEmbedder()
+    assert embed_cached(cache, "m", texts, embedder) == [vector_of(text) for text in texts]
+    assert embedder.calls == [["a", "bb", "ccc"]]
+
+    # A second run over the same inputs is answered entirely from the cache.
+    second = CountingEmbedder()
+    assert embed_cached(cache, "m", texts, second) == [vector_of(text) for text in texts]
+    assert second.calls == []
+
+    third = CountingEmbedder()
+    embed_cached(cache, "m", ["bb", "dddd"], third)
+    embed_cached(cache, "other-model", ["bb"], third)
+    assert third.calls == [["dddd"], ["bb"]]
+
+
+def test_failed_vectors_are_not_cached(cache):
+    failing = CountingEmbedder(fail={"bad"})
+    assert embed_cached(cache, "m", ["good", "bad"], failing) == [vector_of("good"), [0.0, 0.0, 0.0]]
+    assert len(cache) == 1 and cache.get("m", "bad") is None
+
+    retry = CountingEmbedder()
+    assert embed_cached(cache, "m", ["good", "bad"], retry) == [vector_of("good"), vector_of("bad")]
+    assert retry.calls == [["bad"]]
@@ -0,0 +1,170 @@
+"""CodeGraph and CompactCodeGraph: de-duplication, removal, and backend equivalence."""
+
+import random
+
+import pytest
+
+from code_intel.compact_graph import MAX_REL_TYPES, CompactCodeGraph
+from code_intel.entities import Entity
+from code_intel.graph import CodeGraph
+from code_intel.relations import REL_CALLS, REL_IMPORTS, REL_TYPES, Relationship
+from code_intel.scanner import ProjectScanner
+
+from conftest import graph_state
+
+BACKENDS = [CodeGraph, CompactCodeGraph]
+
+
+def entity(entity_id, file_path="a.py"):
+    return Entity(entity_id, entity_id.rsplit(".", 1)[-1], "function", file_path, 1)
+
+
+def edge_tuples(edges):
+    # Lines are copied: the graph extends its edges' lists in place.
+    return [(r.source_id, r.target_id, r.type, r.count, r.lines and list(r.lines)) for r in edges]
+
+
+@pytest.mark.parametrize("graph_cls", BACKENDS)
+def test_repeated_edges_are_merged(graph_cls):
+    graph = graph_cls(track_call_sites=True)
+    graph.add_relationship(Relationship("a", "b", REL_CALLS, lines=[3]))
+    graph.add_relationship(Relationship("a", "c", REL_CALLS, lines=[4]))
+    graph.add_relationship(Relationship("a", "b", REL_CALLS, lines=[7]))
+    graph.add_relationship(Relationship("a", "b", REL_IMPORTS))
+    assert edge_tuples(graph.edges) == [
+        ("a", "b", REL_CALLS, 2, [3, 7]),
+        ("a", "c", REL_CALLS, 1, [4]),
+        ("a", "b", REL_IMPORTS, 1, None),
+    ]
+    assert [r.target_id for r in graph.get_outgoing_edges("a")] == ["b", "c", "b"]
+    assert [r.source_id for r in graph.get_incoming_edges("b")] == ["a", "a"]
+
+
+@pytest.mark.parametrize("graph_cls", BACKENDS)
+def test_call_sites_off_drops_lines(graph_cls):
+    graph = graph_cls()
+    graph.add_relationship(Relationship("a", "b", REL_CALLS, lines=[3]))
+    graph.add_relationship(Relationship("a", "b", REL_CALLS, lines=[5]))
+    assert edge_tuples(graph.edges) == [("a", "b", REL_CALLS, 2, None)]
+
+
+@pytest.mark.parametrize("graph_cls", BACKENDS)
+@pytest.mark.parametrize("call_sites", [False, True])
+def test_added_relationships_are_not_modified(graph_cls, call_sites):
+    graph = graph_cls(track_call_sites=call_sites)
+    first, second = Relationship("a", "b", REL_CALLS, lines=[3]), Relationship("a", "b", REL_CALLS, 2, [5, 8])
+    graph.add_relationship(first)
+    graph.add_relationship(second)
+    assert (first.count, first.lines, second.count, second.lines) == (1, [3], 2, [5, 8])
+    assert edge_tuples(graph.edges) == [("a", "b", REL_CALLS, 3, [3, 5, 8] if call_sites else None)]
+
+
+@pytest.mark.parametrize("graph_cls", BACKENDS)
+def test_remove_file_and_entity(graph_cls):
+    graph = graph_cls()
+    for entity_id, file_path in (("m.f", "m.py"), ("m.g", "m.py"), ("n.h", "n.py")):
+        graph.add_entity(entity(entity_id, file_path))
+    graph.add_relationship(Relationship("m.f", "n.h", REL_CALLS))
+    graph.add_relationship(Relationship("n.h", "m.g", REL_CALLS))
+    graph.add_relationship(Relationship("n.h", "ext", REL_IMPORTS))
+
+    # A file takes its entities and their outgoing edges with it.
+    removed = graph.remove_file("m.py")
+    assert sorted(e.id for e in removed) == ["m.f", "m.g"]
+    assert sorted(graph.nodes) == ["n.h"]
+    assert edge_tuples(graph.edges) == [("n.h", "m.g", REL_CALLS, 1, None), ("n.h", "ext", REL_IMPORTS, 1, None)]
+    assert graph.get_incoming_edges("n.h") == []
+    assert graph.remove_file("m.py") == []
+
+    # An entity takes its incoming and outgoing edges.
+    assert graph.remove_entity("n.h").id == "n.h"
+    assert graph.remove_entity("n.h") is None
+    assert list(graph.edges) == []
+    assert graph.get_file_entities("n.py") == []
+
+
+@pytest.mark.parametrize("graph_cls", BACKENDS)
+def test_remove_edges(graph_cls):
+    graph = graph_cls()
+    edges = [("a", "b", REL_CALLS), ("a", "c", REL_CALLS), ("a", "b", REL_IMPORTS), ("d", "b", REL_CALLS)]
+    for source, target, rel_type in edges:
+        graph.add_relationship(Relationship(source, target, rel_type))
+    version = graph.version
+    assert edge_tuples(graph.remove_edges(target_id="b", type=REL_CALLS)) == [
+        ("a", "b", REL_CALLS, 1, None),
+        ("d", "b", REL_CALLS, 1, None),
+    ]
+    assert graph.version > version
+    assert graph.remove_edge("a", "b", REL_CALLS) is None
+    assert graph.remove_edge("a", "b", REL_IMPORTS).type == REL_IMPORTS
+    assert edge_tuples(graph.edges) == [("a", "c", REL_CALLS, 1, None)]
+    assert graph.remove_edges(source_id="missing") == []
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_compact_graph_matches_code_graph(seed):
+    """Random interleavings of adds, removals and reads give identical results on both backends."""
+    rnd = random.Random(seed)
+    ids = [f"f{i % 3}.n{i}" for i in range(8)]
+    operations = []
+    for _ in range(80):
+        roll = rnd.random()
+        if roll < 0.6:
+            rel_type = rnd.choice([REL_CALLS, REL_IMPORTS])
+            operations.append(("add", rnd.choice(ids), rnd.choice(ids + ["ext"]), rel_type, rnd.randint(1, 50)))
+        elif roll < 0.7:
+            operations.append(("remove_file", f"f{rnd.randint(0, 2)}"))
+        elif roll < 0.8:
+            operations.append(("remove_entity", rnd.choice(ids)))
+        elif roll < 0.9:
+            source, target = rnd.choice([None] + ids), rnd.choice([None, "ext"] + ids)
+            operations.append(("remove_edges", source, target, rnd.choice([None, REL_CALLS])))
+        else:
+            operations.append(("remove_edge", rnd.choice(ids), rnd.choice(ids), REL_CALLS))
+        if rnd.random() < 0.2:
+            operations.append(("read",))
+
+    results = []
+    for graph_cls in BACKENDS:
+        graph = graph_cls(track_call_sites=True)
+        for i, entity_id in enumerate(ids):
+            graph.add_entity(entity(entity_id, f"f{i % 3}"))
+        log = []
+        for op, *args in operations:
+            if op == "add":
+                source, target, rel_type, line = args
+                graph.add_relationship(Relationship(source, target, rel_type, lines=[line]))
+            elif op == "remove_file":
+                log.append(sorted(e.id for e in graph.remove_file(*args)))
+            elif op == "remove_entity":
+                removed = graph.remove_entity(*args)
+                log.append(removed.id if removed else None)
+            elif op == "remove_edges":
+                log.append(edge_tuples(graph.remove_edges(*args)))
+            elif op == "remove_edge":
+                removed = graph.remove_edge(*args)
+                log.append(edge_tuples([removed]) if removed else None)
+            else:
+                log.append(edge_tuples(graph.edges))
+        log.append(graph_state(graph))
+        log.append([edge_tuples(graph.get_incoming_edges(i)) for i in ids + ["ext"]])
+        results.append(log)
+    assert results[0] == results[1]
+
+
+def test_compact_graph_scan_matches(project):
+    expected = CodeGraph(track_call_sites=True)
+    ProjectScanner(project, expected).scan()
+    compact = CompactCodeGraph(track_call_sites=True)
+    ProjectScanner(project, compact).scan()
+    assert graph_state(compact) == graph_state(expected)
+
+
+def test_compact_graph_relationship_type_limit():
+    graph = CompactCodeGraph()
+    extra = MAX_REL_TYPES - len(REL_TYPES)
+    for i in range(extra):
+        graph.add_relationship(Relationship("a", "b", f"T{i}"))
+    with pytest.raises(ValueError, match="at most 256 relationship types"):
+        graph.add_relationship(Relationship("a", "b", "ONE_TOO_MANY"))
+    assert len(graph.edges) == extra
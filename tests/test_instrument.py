@@ -0,0 +1,233 @@
+"""Profiler: phase aggregation and nesting, counters, the slowest-files heap, and reports."""
+
+import ast
+import json
+import os
+import time
+import tracemalloc
+
+import pytest
+
+from code_intel import instrument
+from code_intel.graph import CodeGraph
+from code_intel.instrument import PhaseStats, Profiler
+from code_intel.scanner import ProjectScanner
+from code_intel.sources import ParsedModule
+
+
+def parsed(name, parse_seconds, read_seconds=0.001, source="x = 1\n", error=None):
+    tree = ast.parse(source) if error is None else None
+    return ParsedModule(f"/src/{name}.py", name, source.encode("utf-8"), tree, error, read_seconds, parse_seconds)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A wall clock that only moves when the test advances it."""
+    now = [100.0]
+    monkeypatch.setattr(instrument.time, "perf_counter", lambda: now[0])
+
+    def advance(seconds):
+        now[0] += seconds
+
+    return advance
+
+
+def test_repeated_phases_are_summed(clock):
+    profiler = Profiler()
+    for seconds in (1.0, 2.5):
+        with profiler.phase("pass1") as stats:
+            clock(seconds)
+    with profiler.phase("pass2"):
+        clock(0.5)
+    assert list(profiler.phases) == ["pass1", "pass2"]
+    assert stats is profiler.phases["pass1"]
+    assert (stats.calls, stats.seconds) == (2, 3.5)
+    assert (profiler.phases["pass2"].calls, profiler.phases["pass2"].seconds) == (1, 0.5)
+
+
+def test_phase_is_recorded_when_the_block_raises(clock):
+    profiler = Profiler()
+    with pytest.raises(KeyError):
+        with profiler.phase("pass1"):
+            clock(1.0)
+            raise KeyError("boom")
+    assert (profiler.phases["pass1"].calls, profiler.phases["pass1"].seconds) == (1, 1.0)
+    with profiler.phase("pass2"):
+        pass
+    assert profiler.phases["pass1"].calls == 1
+
+
+def test_nested_phases(clock):
+    profiler = Profiler()
+    with profiler.phase("scan"):
+        clock(1.0)
+        with profiler.phase("pass1"):
+            clock(2.0)
+        with profiler.phase("pass2"):
+            clock(3.0)
+        clock(0.5)
+    seconds = {name: stats.seconds for name, stats in profiler.phases.items()}
+    assert seconds == {"scan": 6.5, "pass1": 2.0, "pass2": 3.0}
+    assert all(stats.calls == 1 for stats in profiler.phases.values())
+
+
+def test_reentered_phase_is_measured_once(clock):
+    profiler = Profiler()
+    with profiler.phase("scan") as outer:
+        clock(1.0)
+        with profiler.phase("scan") as inner:
+            clock(2.0)
+    assert inner is outer
+    assert (outer.calls, outer.seconds) == (1, 3.0)
+
+
+def test_overhead_goes_to_every_open_phase():
+    profiler = Profiler()
+    profiler.record_file(parsed("outside", 0.1))
+    with profiler.phase("scan"):
+        with profiler.phase("pass1"):
+            profiler.record_file(parsed("a", 0.1, source="def f():\n    return [i for i in range(3)]\n" * 50))
+        inner = profiler.phases["pass1"].overhead_seconds
+        profiler.record_file(parsed("b", 0.1))
+    outer = profiler.phases["scan"].overhead_seconds
+    assert 0 < inner < outer
+    # Overhead is part of the phase's own time, never more.
+    assert outer <= profiler.phases["scan"].seconds
+    assert inner <= profiler.phases["pass1"].seconds
+
+
+def test_counters():
+    profiler = Profiler()
+    profiler.count("files_reused", 3)
+    profiler.count("graph_nodes", 10)
+    profiler.count("files_reused")
+    assert profiler.counters == {"files_reused": 4, "graph_nodes": 10}
+    assert list(profiler.report()["counters"]) == ["files_reused", "graph_nodes"]
+
+
+def test_record_file_totals():
+    profiler = Profiler()
+    profiler.record_file(parsed("a", 0.25, read_seconds=0.5, source="def f():\n    return 1\n"))
+    profiler.record_file(parsed("b", 0.125, read_seconds=0.25, source="def oops(:\n", error="invalid syntax"))
+    profiler.record_file(ParsedModule("/src/gone.py", "gone", error="unreadable"))
+    assert (profiler.files_recorded, profiler.read_seconds, profiler.parse_seconds) == (3, 0.75, 0.375)
+    nodes = sum(1 for _ in ast.walk(ast.parse("def f():\n    return 1\n")))
+    assert profiler.counters == {
+        "bytes_read": len("def f():\n    return 1\n") + len("def oops(:\n"),
+        "ast_nodes": nodes,
+        "parse_errors": 2,
+    }
+
+
+@pytest.mark.parametrize("slowest", [0, 1, 3, 10])
+def test_slowest_files_are_bounded_and_sorted(slowest):
+    profiler = Profiler(slowest=slowest)
+    times = [0.3, 0.1, 0.7, 0.2, 0.9, 0.5, 0.4]
+    for i, seconds in enumerate(times):
+        profiler.record_file(parsed(f"m{i}", seconds))
+    files = profiler.slowest_files()
+    assert [f["parse_seconds"] for f in files] == sorted(times, reverse=True)[:slowest]
+    assert all(f["file"] == f"/src/m{times.index(f['parse_seconds'])}.py" for f in files)
+    assert profiler.files_recorded == len(times)
+
+
+def test_report_is_json_ready(tmp_path):
+    profiler = Profiler(slowest=2)
+    with profiler.phase("pass1"):
+        profiler.record_file(parsed("a", 0.5))
+    profiler.count("graph_nodes", 7)
+    report = json.loads(json.dumps(profiler.report()))
+    assert report["version"] == instrument.PROFILE_VERSION
+    assert [phase["name"] for phase in report["phases"]] == ["pass1"]
+    assert report["counters"]["graph_nodes"] == 7
+    assert report["files"]["recorded"] == 1 and report["files"]["slowest"][0]["file"] == "/src/a.py"
+    assert "tracemalloc" not in report
+
+    assert profiler.write(str(tmp_path)) == [str(tmp_path / "profile.json")]
+    with open(tmp_path / "profile.json", encoding="utf-8") as f:
+        assert json.load(f)["counters"] == report["counters"]
+
+
+def test_phase_stats_to_dict_omits_unset_fields():
+    assert PhaseStats("a", seconds=1.0, calls=1).to_dict() == {
+        "name": "a", "seconds": 1.0, "cpu_seconds": 0.0, "calls": 1,
+    }
+    data = PhaseStats("a", overhead_seconds=0.25, rss_peak_kb=2048.0, peak_kb=0.04, retained_kb=-1.0).to_dict()
+    keys = ("overhead_seconds", "rss_peak_kb", "peak_kb", "retained_kb")
+    assert [data[key] for key in keys] == [0.25, 2048.0, 0.0, -1.0]
+
+
+@pytest.fixture
+def traced():
+    assert not tracemalloc.is_tracing()
+    profiler = Profiler(trace_memory=True)
+    yield profiler
+    profiler.close()
+    assert not tracemalloc.is_tracing()
+
+
+KB = 1024
+
+
+def test_memory_peaks_and_retained(traced):
+    kept = []
+    with traced.phase("allocate"):
+        kept.append(bytearray(512 * KB))
+        assert len(bytes(2048 * KB)) == 2048 * KB  # a temporary: counts towards the peak only
+    stats = traced.phases["allocate"]
+    assert stats.peak_kb >= 2048 + 512
+    assert 512 <= stats.retained_kb < 2048
+    report = traced.report()
+    assert report["tracemalloc"]["peak_kb"] >= 2048 and report["tracemalloc"]["top_allocations"]
+
+
+def test_nested_phase_keeps_the_outer_peak(traced):
+    with traced.phase("outer"):
+        data = bytearray(4096 * KB)
+        del data
+        with traced.phase("inner"):
+            small = bytearray(256 * KB)
+            del small
+        with traced.phase("inner"):
+            pass
+    assert traced.phases["outer"].peak_kb >= 4096
+    assert 256 <= traced.phases["inner"].peak_kb < 4096
+
+
+def test_close_leaves_tracing_it_did_not_start():
+    tracemalloc.start()
+    try:
+        profiler = Profiler(trace_memory=True)
+        profiler.close()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.skipif(instrument.cProfile is None, reason="cProfile not available")
+def test_cprofile_covers_outer_phase_after_nested_one(tmp_path):
+    import pstats
+
+    def after_inner():
+        time.sleep(0)
+
+    profiler = Profiler(cprofile=True)
+    with profiler.phase("outer"):
+        with profiler.phase("inner"):
+            pass
+        after_inner()
+    after_inner()  # outside every phase: not profiled
+    paths = profiler.write(str(tmp_path))
+    assert paths == [str(tmp_path / "profile.json"), str(tmp_path / "profile.pstats")]
+    calls = {func[2]: stat[1] for func, stat in pstats.Stats(paths[1]).stats.items()}
+    assert calls["after_inner"] == 1
+
+
+def test_scanner_phases(synthetic_project):
+    profiler = Profiler()
+    ProjectScanner(synthetic_project, CodeGraph(), profiler=profiler).scan()
+    assert {"discovery", "pass1", "index", "pass2"} <= set(profiler.phases)
+    python_files = [name for _, _, names in os.walk(synthetic_project) for name in names if name.endswith(".py")]
+    assert profiler.files_recorded == len(python_files)
+    assert profiler.counters["parse_errors"] >= 1  # broken.py
+    assert profiler.phases["pass1"].overhead_seconds > 0
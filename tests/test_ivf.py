@@ -0,0 +1,94 @@
+"""IVF index over a VectorStore: exact at full probe, high recall on clustered data."""
+
+import pytest
+
+from code_intel import storage
+from code_intel.storage import VectorStore
+
+np = pytest.importorskip("numpy")
+
+
+def clustered_vectors(count, dim, clusters, seed, spread=0.3):
+    rnd = np.random.default_rng(seed)
+    centers = rnd.normal(size=(clusters, dim))
+    labels = rnd.integers(clusters, size=count)
+    return (centers[labels] + spread * rnd.normal(size=(count, dim))).astype(np.float32)
+
+
+def fill(store, vectors, first=0):
+    rows = range(first, first + len(vectors))
+    store.add_embeddings([f"chunk {i}" for i in rows], vectors.tolist(), ["f.py"] * len(rows), [f"n{i}" for i in rows])
+    return store
+
+
+@pytest.fixture
+def indexed():
+    store = fill(VectorStore(), clustered_vectors(3000, 32, 40, seed=0))
+    store.build_index(nlist=50, nprobe=4)
+    return store
+
+
+def queries(count=25, seed=1):
+    return clustered_vectors(count, 32, 40, seed).tolist()
+
+
+def test_index_covers_every_row(indexed):
+    index = indexed.index
+    assert index.nlist == 50 and len(index) == len(indexed)
+    rows = np.concatenate([np.frombuffer(rows, dtype=np.int32) for rows in index.lists])
+    assert sorted(rows.tolist()) == list(range(len(indexed)))
+
+
+def test_full_probe_is_exact(indexed):
+    for query in queries():
+        assert indexed.top_k(query, 10, nprobe=indexed.index.nlist) == indexed.top_k(query, 10, exact=True)
+
+
+def test_recall_on_clustered_data(indexed):
+    hits = total = 0
+    for query in queries(50):
+        exact = {row for row, _ in indexed.top_k(query, 10, exact=True)}
+        approx = {row for row, _ in indexed.top_k(query, 10, nprobe=8)}
+        hits += len(exact & approx)
+        total += len(exact)
+    assert hits / total >= 0.9
+
+
+def test_approximate_scores_are_exact_scores(indexed):
+    exact = dict(indexed.top_k(queries()[0], len(indexed), exact=True))
+    for row, score in indexed.top_k(queries()[0], 10):
+        assert score == pytest.approx(exact[row], abs=1e-6)
+
+
+def test_rows_added_after_build_are_indexed(indexed):
+    extra = clustered_vectors(20, 32, 40, seed=7)
+    fill(indexed, extra, first=len(indexed))
+    assert len(indexed.index) == len(indexed) == 3020
+    # A row lands in its nearest cluster, which is the first one a query equal to it probes.
+    for i, vector in enumerate(extra.tolist()):
+        assert indexed.top_k(vector, 1, nprobe=1)[0][0] == 3000 + i
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_index_survives_save_and_load(indexed, tmp_path, mmap):
+    path = str(tmp_path / "store")
+    indexed.save(path)
+    loaded = VectorStore.load(path, mmap=mmap)
+    assert loaded.index is not None
+    assert (loaded.index.nlist, loaded.index.nprobe) == (indexed.index.nlist, indexed.index.nprobe)
+    assert [list(rows) for rows in loaded.index.lists] == [list(rows) for rows in indexed.index.lists]
+    for query in queries():
+        assert loaded.top_k(query, 10) == indexed.top_k(query, 10)
+
+    loaded.drop_index()
+    loaded.save(path)
+    assert VectorStore.load(path).index is None
+
+
+def test_build_index_needs_numpy_and_rows(monkeypatch):
+    with pytest.raises(ValueError):
+        VectorStore(4).build_index()
+    monkeypatch.setattr(storage, "np", None)
+    store = fill(VectorStore(), np.eye(4, dtype=np.float32))
+    with pytest.raises(RuntimeError, match="NumPy"):
+        store.build_index()
@@ -0,0 +1,157 @@
+"""ScanPipeline: ordering, backpressure, error propagation and shutdown."""
+
+import ast
+import os
+import threading
+import time
+
+import pytest
+
+from code_intel import pipeline
+from code_intel.pipeline import ScanPipeline
+from code_intel.sources import parse_module, read_module
+
+from conftest import write_files
+
+TIMEOUT = 10.0
+
+
+def run_with_timeout(function):
+    """Runs ``function`` in a thread so a deadlock fails the test instead of hanging it."""
+    outcome = {}
+
+    def target():
+        try:
+            outcome["value"] = function()
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(TIMEOUT)
+    assert not thread.is_alive(), "pipeline deadlocked"
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["value"]
+
+
+def pipeline_threads():
+    return [t for t in threading.enumerate() if t.name.startswith("scan-")]
+
+
+def wait_for_shutdown():
+    deadline = time.monotonic() + TIMEOUT
+    while pipeline_threads() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert pipeline_threads() == []
+
+
+def module_id(file_path):
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+
+@pytest.fixture
+def files(tmp_path):
+    sources = {f"m{i:02d}.py": "x = 1\n" * (i * 37 % 50) + f"def f{i}():\n    return {i}\n" for i in range(40)}
+    sources["broken.py"] = "def oops(:\n"
+    write_files(tmp_path, sources)
+    paths = sorted(os.path.join(str(tmp_path), name) for name in sources)
+    return paths + [os.path.join(str(tmp_path), "missing.py")]
+
+
+def summary(parsed):
+    tree = ast.dump(parsed.tree) if parsed.tree is not None else None
+    return parsed.file_path, parsed.module_id, parsed.source, tree, parsed.error is not None
+
+
+@pytest.mark.parametrize("readers, parsers, max_in_flight", [(1, 1, 1), (4, 1, 64), (3, 2, 2), (8, 4, 5)])
+def test_yields_in_input_order(files, readers, parsers, max_in_flight):
+    expected = [summary(parse_module(read_module(path, module_id(path)))) for path in files]
+    scan = ScanPipeline(iter(files), module_id, readers, parsers, max_in_flight)
+    assert run_with_timeout(lambda: [summary(parsed) for parsed in scan]) == expected
+    wait_for_shutdown()
+
+
+def test_empty_input():
+    assert run_with_timeout(lambda: list(ScanPipeline([], module_id))) == []
+    wait_for_shutdown()
+
+
+@pytest.mark.parametrize("max_in_flight", [1, 3])
+def test_backpressure(files, max_in_flight):
+    pulled = []
+
+    def discover():
+        for path in files:
+            pulled.append(path)
+            yield path
+
+    def consume():
+        for consumed, _ in enumerate(ScanPipeline(discover(), module_id, max_in_flight=max_in_flight)):
+            time.sleep(0.005)  # let discovery run ahead as far as it can
+            # Slots of the ``consumed`` modules already handed over are free again; one
+            # more path may have been pulled while discovery waits for a slot.
+            assert len(pulled) <= consumed + max_in_flight + 1
+        return consumed + 1
+
+    assert run_with_timeout(consume) == len(files)
+
+
+def test_discovery_error_is_raised(files):
+    def discover():
+        yield from files[:3]
+        raise OSError("walk failed")
+
+    seen = []
+
+    def consume():
+        for parsed in ScanPipeline(discover(), module_id):
+            seen.append(parsed.file_path)
+
+    with pytest.raises(OSError, match="walk failed"):
+        run_with_timeout(consume)
+    # Modules handed over before the error stops the pipeline come in order.
+    assert seen == files[:len(seen)]
+    wait_for_shutdown()
+
+
+def test_reader_error_is_raised(files):
+    def failing_module_id(file_path):
+        if file_path == files[5]:
+            raise KeyError("no module for this file")
+        return module_id(file_path)
+
+    with pytest.raises(KeyError, match="no module"):
+        run_with_timeout(lambda: list(ScanPipeline(files, failing_module_id, readers=3)))
+    wait_for_shutdown()
+
+
+def test_parser_error_is_raised(files, monkeypatch):
+    def failing_parse(parsed):
+        if parsed.module_id == "m07":
+            raise RecursionError("too deeply nested")
+        return parse_module(parsed)
+
+    monkeypatch.setattr(pipeline, "parse_module", failing_parse)
+    with pytest.raises(RecursionError):
+        run_with_timeout(lambda: list(ScanPipeline(files, module_id, parsers=2)))
+    wait_for_shutdown()
+
+
+def test_consumer_stopping_early_shuts_down(files):
+    pulled = []
+
+    def discover():
+        for path in files:
+            pulled.append(path)
+            yield path
+
+    def consume():
+        scan = iter(ScanPipeline(discover(), module_id, max_in_flight=2))
+        first = next(scan)
+        scan.close()
+        return first
+
+    assert run_with_timeout(consume).file_path == files[0]
+    wait_for_shutdown()
+    assert len(pulled) < len(files)
@@ -0,0 +1,123 @@
+"""GraphQuery traversals checked against a naive breadth-first search."""
+
+import random
+from collections import deque
+
+import pytest
+
+from code_intel.compact_graph import CompactCodeGraph
+from code_intel.entities import Entity
+from code_intel.graph import CodeGraph
+from code_intel.query import IMPACT_TYPES, IN, OUT, GraphQuery
+from code_intel.relations import REL_CALLS, REL_IMPORTS, REL_INHERITS, Relationship
+from code_intel.scanner import ProjectScanner
+
+TYPES = (REL_CALLS, REL_IMPORTS, REL_INHERITS)
+
+
+def random_graph(graph_cls, seed, nodes=30, edges=60):
+    rnd = random.Random(seed)
+    graph = graph_cls()
+    ids = [f"m{i % 4}.f{i}" for i in range(nodes)]
+    for i, entity_id in enumerate(ids):
+        graph.add_entity(Entity(entity_id, f"f{i}", "function", f"m{i % 4}.py", i + 1))
+    for _ in range(edges):
+        target = rnd.choice(ids + ["external.name"])
+        graph.add_relationship(Relationship(rnd.choice(ids), target, rnd.choice(TYPES)))
+    return graph, ids
+
+
+def naive_distances(graph, start_ids, direction, types, max_depth=None):
+    """Hop distance of every node reachable from ``start_ids`` (excluding them)."""
+    adjacency = {}
+    for r in graph.edges:
+        if types is not None and r.type not in types:
+            continue
+        u, v = (r.source_id, r.target_id) if direction == OUT else (r.target_id, r.source_id)
+        adjacency.setdefault(u, []).append(v)
+    starts = [s for s in start_ids if s in graph.nodes or s in adjacency]
+    distance = {s: 0 for s in starts}
+    queue = deque(starts)
+    while queue:
+        u = queue.popleft()
+        if max_depth is not None and distance[u] >= max_depth:
+            continue
+        for v in adjacency.get(u, ()):
+            if v not in distance:
+                distance[v] = distance[u] + 1
+                queue.append(v)
+    return {v: d for v, d in distance.items() if v not in starts}
+
+
+def edge_set(graph, types):
+    return {(r.source_id, r.target_id) for r in graph.edges if r.type in types}
+
+
+@pytest.mark.parametrize("graph_cls", [CodeGraph, CompactCodeGraph])
+@pytest.mark.parametrize("seed", range(10))
+def test_traverse_matches_bfs(graph_cls, seed):
+    graph, ids = random_graph(graph_cls, seed)
+    query = GraphQuery(graph)
+    rnd = random.Random(seed)
+    for _ in range(10):
+        starts = rnd.sample(ids, rnd.randint(1, 3))
+        direction = rnd.choice([OUT, IN])
+        types = rnd.choice([None, (REL_CALLS,), (REL_CALLS, REL_IMPORTS)])
+        max_depth = rnd.choice([None, 1, 2, 3])
+        result = query.traverse(starts, direction, max_depth, types)
+        assert len(result) == len(dict(result))
+        assert dict(result) == naive_distances(graph, starts, direction, types, max_depth)
+        # Nearest first.
+        assert [depth for _, depth in result] == sorted(depth for _, depth in result)
+
+
+@pytest.mark.parametrize("graph_cls", [CodeGraph, CompactCodeGraph])
+@pytest.mark.parametrize("seed", range(10))
+def test_shortest_path_matches_bfs(graph_cls, seed):
+    graph, ids = random_graph(graph_cls, seed, edges=45)
+    query = GraphQuery(graph)
+    calls = edge_set(graph, (REL_CALLS,))
+    for source in ids[:8]:
+        distances = naive_distances(graph, [source], OUT, (REL_CALLS,))
+        for target in ids + ["external.name", "missing.name"]:
+            path = query.shortest_path(source, target)
+            if target == source:
+                assert path == [source]
+                continue
+            if target not in distances:
+                assert path is None
+                assert not query.reachable(source, target)
+                continue
+            assert path[0] == source and path[-1] == target
+            assert len(path) - 1 == distances[target]
+            assert all(step in calls for step in zip(path, path[1:]))
+            # Bounded searches give up exactly when the path is too long.
+            hops = distances[target]
+            assert query.shortest_path(source, target, max_depth=hops) is not None
+            assert query.shortest_path(source, target, max_depth=hops - 1) is None
+
+
+def test_callers_callees_and_impact(sample_project):
+    graph = CodeGraph()
+    ProjectScanner(sample_project, graph).scan()
+    query = GraphQuery(graph)
+    assert query.callers("utils.logger") == [("main.mainService.run", 1), ("utils.helper_func", 1)]
+    assert ("main.mainService.process", 1) in query.callees("main.mainService.run")
+    assert dict(query.callers("utils.logger", max_depth=None)) == naive_distances(
+        graph, ["utils.logger"], IN, (REL_CALLS,)
+    )
+    assert query.impact(["utils.logger"]) == naive_distances(graph, ["utils.logger"], IN, IMPACT_TYPES)
+    file_path = graph.get_entity("utils.logger").file_path
+    impact = query.file_impact(file_path)
+    assert "main" in impact and "main.mainService.run" in impact
+
+
+def test_index_follows_graph_updates():
+    graph = CodeGraph()
+    query = GraphQuery(graph)
+    graph.add_relationship(Relationship("a", "b", REL_CALLS))
+    assert query.shortest_path("a", "b") == ["a", "b"]
+    graph.add_relationship(Relationship("b", "c", REL_CALLS))
+    assert query.shortest_path("a", "c") == ["a", "b", "c"]
+    graph.remove_edge("a", "b", REL_CALLS)
+    assert query.shortest_path("a", "c") is None
@@ -0,0 +1,132 @@
+"""ProjectScanner: every scan mode must build the same graph as a plain serial scan."""
+
+import os
+
+import pytest
+
+from code_intel.graph import CodeGraph
+from code_intel.relations import REL_CALLS, REL_IMPORTS, REL_INHERITS
+from code_intel.scan_cache import CACHE_FILENAME, ScanCache
+from code_intel.scanner import ProjectScanner
+
+from conftest import graph_state, write_files
+
+
+def scan(root, call_sites=True, **options):
+    graph = CodeGraph(track_call_sites=call_sites)
+    ProjectScanner(root, graph, **options).scan()
+    return graph
+
+
+def cached_scan(root, cache_path, **options):
+    cache = ScanCache(cache_path, root)
+    cache.load()
+    graph = scan(root, scan_cache=cache, **options)
+    cache.save()
+    return graph
+
+
+def test_sample_project_graph(sample_project):
+    graph = scan(sample_project, call_sites=False)
+    assert {"base.BaseService.connect", "main.mainService.run", "main.entry_point", "utils.helper_func"} <= set(
+        graph.nodes
+    )
+    edges = {(r.source_id, r.target_id, r.type) for r in graph.edges}
+    assert ("main.mainService", "base.BaseService", REL_INHERITS) in edges
+    assert ("main", "utils", REL_IMPORTS) in edges
+    assert ("main.mainService.run", "utils.logger", REL_CALLS) in edges
+    assert ("main.mainService.run", "main.mainService.process", REL_CALLS) in edges
+    assert ("utils.helper_func", "utils.logger", REL_CALLS) in edges
+
+
+def test_synthetic_project_resolution(synthetic_project):
+    graph = scan(synthetic_project)
+    edges = {(r.source_id, r.target_id, r.type): r for r in graph.edges}
+    # Relative import, module attribute and aliased module calls all resolve.
+    assert ("app.core.Engine.start", "app.util.helper", REL_CALLS) in edges
+    assert ("app.core.Engine.start", "app.util.format_name", REL_CALLS) in edges
+    assert ("app.core.Engine.start", "app.core.Engine.step", REL_CALLS) in edges
+    # Package re-export: main imports Engine from app/__init__.py.
+    assert ("main.Runner", "app.core.Engine", REL_INHERITS) in edges
+    # Two call sites, one edge.
+    repeated = edges[("main.Runner.run", "app.util.helper", REL_CALLS)]
+    assert repeated.count == 2
+    assert len(repeated.lines) == 2
+    # The unparsable file still gets its module entity.
+    assert "broken" in graph.nodes
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{"readers": 2}, {"jobs": 2}, {"live": True}],
+    ids=["readers", "jobs", "live"],
+)
+def test_scan_modes_match_serial(project, options):
+    assert graph_state(scan(project, **options)) == graph_state(scan(project))
+
+
+def test_incremental_matches_serial(project, tmp_path):
+    expected = graph_state(scan(project))
+    cache_path = str(tmp_path / CACHE_FILENAME)
+    assert graph_state(cached_scan(project, cache_path)) == expected
+    assert os.path.exists(cache_path)
+    # Warm run: everything comes from the cache.
+    assert graph_state(cached_scan(project, cache_path)) == expected
+    assert graph_state(cached_scan(project, cache_path, jobs=2)) == expected
+
+
+def test_incremental_after_edits_matches_rescan(synthetic_project, tmp_path):
+    cache_path = str(tmp_path / CACHE_FILENAME)
+    cached_scan(synthetic_project, cache_path)
+
+    write_files(
+        synthetic_project,
+        {
+            "app/util.py": """
+                def helper():
+                    return shout("y")
+
+
+                def shout(name):
+                    return name.upper()
+            """,
+            "extra.py": """
+                from app.util import helper
+
+
+                def use():
+                    helper()
+            """,
+        },
+    )
+    os.remove(os.path.join(synthetic_project, "broken.py"))
+
+    assert graph_state(cached_scan(synthetic_project, cache_path)) == graph_state(scan(synthetic_project))
+
+
+def test_touched_file_stays_cached(sample_project, tmp_path):
+    cache_path = str(tmp_path / CACHE_FILENAME)
+    cached_scan(sample_project, cache_path)
+    path = os.path.join(sample_project, "utils.py")
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    cache = ScanCache(cache_path, sample_project)
+    cache.load()
+    assert cache.lookup(path, "utils") is not None
+
+
+def test_unreadable_cache_is_ignored(sample_project, tmp_path):
+    cache_path = tmp_path / CACHE_FILENAME
+    expected = graph_state(scan(sample_project))
+    for junk in ("not json", '{"version": 4, "root_path": null}', "[1, 2, 3]"):
+        cache_path.write_text(junk)
+        assert graph_state(cached_scan(sample_project, str(cache_path))) == expected
+
+
+def test_cache_for_other_root_is_ignored(sample_project, synthetic_project, tmp_path):
+    cache_path = str(tmp_path / CACHE_FILENAME)
+    cached_scan(synthetic_project, cache_path)
+    cache = ScanCache(cache_path, sample_project)
+    cache.load()
+    assert cache.lookup(os.path.join(synthetic_project, "main.py"), "main") is None
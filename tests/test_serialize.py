@@ -0,0 +1,152 @@
+"""Streaming JSON writers: byte-identical to ``json.dumps``; graph dumps in every format."""
+
+import enum
+import gzip
+import io
+import json
+import lzma
+import os
+import random
+
+import pytest
+
+from code_intel import serialize
+from code_intel.graph import CodeGraph
+from code_intel.scanner import ProjectScanner
+from code_intel.serialize import write_graph_outputs, write_json_array, write_json_object
+
+INDENTS = [None, 0, 2]
+
+
+class Colour(enum.IntEnum):
+    RED = 1
+
+
+DOCUMENTS = [
+    [],
+    [[]],
+    [{}],
+    [{}, [], "", 0],
+    [{"a": {"b": {"c": []}}, "d": [[], [{}], [[1, [2, [3]]]]]}],
+    ["héllo", "日本語", "emoji \U0001f600", "quote \" backslash \\ tab \t nl \n nul \x00", " "],
+    [{"clé": "välue", "ключ": ["значение", {"内": "外"}]}],
+    [0, -1, 10 ** 30, 1.5, -0.0, 1e300, 1e-300, float("inf"), float("-inf"), float("nan")],
+    [True, False, None, {"t": True, "f": False, "n": None}],
+    [(1, 2), {"tuple": (3, ("x", {}))}],
+    # Not handled natively: int keys, int/str subclasses.
+    [{1: "one", 2: [2]}, {"nested": {3: {"x": Colour.RED}}}, Colour.RED],
+    [{"id": f"entity.{i}", "line": i, "lines": [i, i + 1] if i % 2 else None} for i in range(25)],
+]
+
+
+def random_value(rnd, depth=0):
+    roll = rnd.random()
+    if depth > 3 or roll < 0.4:
+        return rnd.choice([
+            None, True, False, rnd.randint(-10 ** 6, 10 ** 6), rnd.uniform(-1e6, 1e6),
+            "".join(rnd.choice("ab \"\\\n\té日\U0001f600") for _ in range(rnd.randint(0, 6))),
+        ])
+    if roll < 0.7:
+        return [random_value(rnd, depth + 1) for _ in range(rnd.randint(0, 4))]
+    keys = ["id", "name", "ключ", "", "a\"b"] + [f"k{i}" for i in range(5)]
+    return {rnd.choice(keys): random_value(rnd, depth + 1) for _ in range(rnd.randint(0, 4))}
+
+
+RANDOM_DOCUMENTS = [[random_value(random.Random(seed)) for _ in range(seed % 7)] for seed in range(60)]
+
+
+def expected(value, indent):
+    if indent is None:
+        return json.dumps(value, separators=(",", ":"))
+    return json.dumps(value, indent=indent)
+
+
+def written(write, *args):
+    fh = io.StringIO()
+    write(fh, *args)
+    return fh.getvalue()
+
+
+@pytest.mark.parametrize("indent", INDENTS)
+@pytest.mark.parametrize("document", DOCUMENTS + RANDOM_DOCUMENTS)
+def test_array_matches_json_dumps(document, indent):
+    assert written(write_json_array, iter(document), indent) == expected(document, indent)
+
+
+@pytest.mark.parametrize("indent", INDENTS)
+@pytest.mark.parametrize("length", range(8))
+def test_array_chunk_boundaries(monkeypatch, indent, length):
+    monkeypatch.setattr(serialize, "CHUNK_SIZE", 3)
+    document = [{"i": i, "s": "é" * i} for i in range(length)]
+    assert written(write_json_array, iter(document), indent) == expected(document, indent)
+
+
+@pytest.mark.parametrize("indent", INDENTS)
+@pytest.mark.parametrize("document", DOCUMENTS + RANDOM_DOCUMENTS[:20])
+def test_object_matches_json_dumps(document, indent):
+    fields = [("context", {"count": len(document), "name": "ünïcode"}), ("empty", []), ("items", document)]
+    streamed = [(key, iter(value) if key == "items" else value) for key, value in fields]
+    assert written(write_json_object, streamed, indent) == expected(dict(fields), indent)
+
+
+@pytest.mark.parametrize("indent", INDENTS)
+def test_empty_object(indent):
+    assert written(write_json_object, [], indent) == expected({}, indent)
+
+
+def test_many_distinct_keys(monkeypatch):
+    """Keys beyond the per-writer cache are still escaped correctly."""
+    monkeypatch.setattr(serialize, "_KEY_CACHE_LIMIT", 4)
+    document = [{f"kéy{i}": i, f"kéy{i + 1}": [i]} for i in range(12)]
+    assert written(write_json_array, iter(document), 2) == expected(document, 2)
+
+
+OPENERS = {None: open, "gzip": gzip.open, "xz": lzma.open}
+
+
+@pytest.mark.parametrize("compression", [None, "gzip", "xz"])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_json_outputs_round_trip(synthetic_project, tmp_path, compression, indent):
+    graph = CodeGraph(track_call_sites=True)
+    ProjectScanner(synthetic_project, graph).scan()
+    paths = write_graph_outputs(graph, str(tmp_path), "json", indent, compression)
+    suffix = {None: "", "gzip": ".gz", "xz": ".xz"}[compression]
+    names = ["entities.json", "relationships.json", "graph.json"]
+    assert paths == [os.path.join(str(tmp_path), name + suffix) for name in names]
+
+    def load(path):
+        with OPENERS[compression](path, "rt", encoding="utf-8") as f:
+            return f.read()
+
+    entities, relationships, whole = (load(path) for path in paths)
+    document = graph.to_json()
+    assert json.loads(entities) == document["nodes"]
+    assert json.loads(relationships) == document["edges"]
+    assert json.loads(whole) == document
+    # Compression changes the container, not the text.
+    assert whole == expected(document, indent)
+
+
+@pytest.mark.parametrize("compression", [None, "gzip", "xz"])
+def test_ndjson_outputs_round_trip(synthetic_project, tmp_path, compression):
+    graph = CodeGraph(track_call_sites=True)
+    ProjectScanner(synthetic_project, graph).scan()
+    paths = write_graph_outputs(graph, str(tmp_path), "ndjson", compression=compression)
+    suffix = {None: "", "gzip": ".gz", "xz": ".xz"}[compression]
+    assert paths == [os.path.join(str(tmp_path), name + suffix) for name in ("entities.ndjson", "relationships.ndjson")]
+
+    def records(path):
+        with OPENERS[compression](path, "rt", encoding="utf-8") as f:
+            lines = f.read().split("\n")
+        assert lines[-1] == ""
+        return [json.loads(line) for line in lines[:-1]]
+
+    document = graph.to_json()
+    assert records(paths[0]) == document["nodes"]
+    assert records(paths[1]) == document["edges"]
+    assert any("lines" in edge for edge in document["edges"])
+
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError, match="format"):
+        write_graph_outputs(CodeGraph(), str(tmp_path), "yaml")
@@ -0,0 +1,197 @@
+"""JSON-RPC analysis server: protocol errors, queries, and applying edits."""
+
+import io
+import json
+import os
+
+import pytest
+
+from code_intel.graph import CodeGraph
+from code_intel.scanner import ProjectScanner
+from code_intel.server import (
+    INVALID_PARAMS,
+    INVALID_REQUEST,
+    METHOD_NOT_FOUND,
+    PARSE_ERROR,
+    AnalysisServer,
+    _merge_edits,
+)
+
+from conftest import graph_state, write_files
+
+NESTED = {
+    "nested.py": """
+        class Outer:
+            def method(self):
+                def inner():
+                    return 1
+                return inner()
+
+            x = 1
+
+
+        async def later():
+            pass
+    """,
+}
+
+
+@pytest.fixture
+def server(synthetic_project):
+    write_files(synthetic_project, NESTED)
+    return AnalysisServer(ProjectScanner(synthetic_project, CodeGraph(track_call_sites=True), live=True))
+
+
+def call(server, method, params=None, request_id=1):
+    message = {"jsonrpc": "2.0", "id": request_id, "method": method}
+    if params is not None:
+        message["params"] = params
+    return server.handle_line(json.dumps(message))
+
+
+def result(server, method, **params):
+    response = call(server, method, params)
+    assert "error" not in response, response
+    return response["result"]
+
+
+def error_code(response):
+    return response["error"]["code"]
+
+
+def test_protocol_errors(server):
+    response = server.handle_line("{not json")
+    assert error_code(response) == PARSE_ERROR and response["id"] is None
+    assert error_code(server.handle_line("[1, 2]")) == INVALID_REQUEST
+    assert error_code(server.handle_line('{"jsonrpc": "2.0", "id": 3, "method": 7}')) == INVALID_REQUEST
+    response = call(server, "noSuchMethod", request_id=9)
+    assert error_code(response) == METHOD_NOT_FOUND and response["id"] == 9
+    assert error_code(call(server, "callers", [1, 2])) == INVALID_PARAMS
+
+
+@pytest.mark.parametrize("method, params", [
+    ("callers", {}),
+    ("callers", {"id": "app.util.helper", "type": "USES"}),
+    ("entityAtPosition", {"file": "main.py"}),
+    ("entityAtPosition", {"file": "main.py", "line": True}),
+    ("hotspots", {"limit": -1}),
+    ("hotspots", {"kinds": ["nope"]}),
+    ("impact", {"id": "app.util.helper", "depth": 0}),
+    ("callPath", {"from": "main.main"}),
+    ("didChangeFiles", {"changed": "main.py"}),
+])
+def test_bad_params(server, method, params):
+    assert error_code(call(server, method, params)) == INVALID_PARAMS
+
+
+def test_notifications_get_no_response(server):
+    assert server.handle_line(json.dumps({"jsonrpc": "2.0", "method": "initialize"})) is None
+    assert server.handle_line(json.dumps({"jsonrpc": "2.0", "method": "noSuchMethod"})) is None
+
+
+@pytest.mark.parametrize("file_path, line, expected", [
+    ("nested.py", 1, "nested.Outer"),
+    ("nested.py", 2, "nested.Outer.method"),
+    ("nested.py", 3, "nested.Outer.method.inner"),
+    ("nested.py", 4, "nested.Outer.method.inner"),
+    ("nested.py", 5, "nested.Outer.method"),
+    ("nested.py", 7, "nested.Outer"),
+    ("nested.py", 8, "nested"),
+    ("nested.py", 10, "nested.later"),
+    ("nested.py", 11, "nested.later"),
+    ("nested.py", 99, "nested"),
+    ("main.py", 1, "main"),
+    ("main.py", 9, "main.Runner.run"),
+    ("main.py", 10, "main"),
+    ("main.py", 13, "main.main"),
+])
+def test_entity_at_position(server, file_path, line, expected):
+    assert result(server, "entityAtPosition", file=file_path, line=line)["id"] == expected
+
+
+def test_entity_at_position_accepts_absolute_paths(server):
+    absolute = os.path.join(server.scanner.root_path, "nested.py")
+    assert result(server, "entityAtPosition", file=absolute, line=4)["id"] == "nested.Outer.method.inner"
+    assert result(server, "entityAtPosition", file="missing.py", line=1) is None
+
+
+def test_queries(server):
+    callers = result(server, "callers", id="app.util.helper")
+    assert [(c["id"], c["count"], c["lines"]) for c in callers] == [
+        ("app.core.Engine.start", 1, [7]),
+        ("app.core.Engine.step", 1, [12]),
+        ("main.Runner.run", 2, [8, 9]),
+    ]
+    path = result(server, "callPath", **{"from": "main.Runner.run", "to": "app.util.format_name"})
+    assert path == ["main.Runner.run", "app.util.helper", "app.util.format_name"]
+    assert result(server, "callPath", **{"from": "app.util.format_name", "to": "main.Runner.run"}) is None
+    hotspots = result(server, "hotspots", limit=1, kinds=["most_called"])
+    assert hotspots == {"most_called": [{"id": "app.util.helper", "count": 4}]}
+
+
+def rescanned(root):
+    graph = CodeGraph(track_call_sites=True)
+    ProjectScanner(root, graph).scan()
+    return graph_state(graph, ordered=False)
+
+
+def test_did_change_files_matches_rescan(server):
+    root = server.scanner.root_path
+    write_files(root, {"extra.py": "from app.util import helper\n\n\ndef go():\n    helper()\n"})
+    os.remove(os.path.join(root, "broken.py"))
+    # Only one of the edits is reported; the poll picks up the other.
+    response = result(server, "didChangeFiles", changed=["extra.py"])
+    assert (response["changed"], response["deleted"]) == (1, 1)
+    assert graph_state(server.graph, ordered=False) == rescanned(root)
+    assert result(server, "didChangeFiles")["changed"] == 0
+
+
+def test_did_change_files_created_then_deleted(server):
+    root = server.scanner.root_path
+    write_files(root, {"tmp.py": "def gone():\n    pass\n"})
+    os.remove(os.path.join(root, "tmp.py"))
+    before = graph_state(server.graph, ordered=False)
+    response = result(server, "didChangeFiles", changed=["tmp.py"])
+    assert (response["changed"], response["deleted"]) == (0, 0)
+    assert graph_state(server.graph, ordered=False) == before == rescanned(root)
+
+
+def test_did_change_files_deleted_then_recreated(server):
+    root = server.scanner.root_path
+    path = os.path.join(root, "main.py")
+    stat = os.stat(path)
+    with open(path, encoding="utf-8") as f:
+        source = f.read()
+    os.remove(path)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(source)
+    # Same size and mtime: the poll cannot tell the file was ever gone.
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    result(server, "didChangeFiles", deleted=["main.py"])
+    assert "main.main" in server.graph.nodes
+    assert graph_state(server.graph, ordered=False) == rescanned(root)
+
+
+@pytest.mark.parametrize("reported, polled_changed, polled_deleted, on_disk, expected", [
+    # Reported changed, deleted since (created then deleted): a deletion.
+    (["a"], [], [], set(), ([], ["a"])),
+    # Reported deleted, re-created since: a change.
+    (["a"], [], [], {"a"}, (["a"], [])),
+    # The poll's classification wins over the disk check and the report.
+    (["a", "b"], ["b"], ["a"], {"a"}, (["b"], ["a"])),
+    # Unreported polled edits are kept; duplicates collapse.
+    (["a", "a", "c"], ["b"], ["d"], {"a", "c"}, (["a", "c", "b"], ["d"])),
+    ([], [], [], set(), ([], [])),
+])
+def test_merge_edits(reported, polled_changed, polled_deleted, on_disk, expected):
+    assert _merge_edits(reported, polled_changed, polled_deleted, on_disk.__contains__) == expected
+
+
+def test_shutdown_stops_serving(server):
+    methods = ["initialize", "shutdown", "initialize"]
+    lines = [json.dumps({"jsonrpc": "2.0", "id": i, "method": method}) for i, method in enumerate(methods)]
+    output = io.StringIO()
+    server.serve(io.StringIO("\n".join(lines) + "\n\n"), output)
+    responses = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [r["id"] for r in responses] == [0, 1]
+    assert "didChangeFiles" in responses[0]["result"]["methods"]
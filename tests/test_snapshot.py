@@ -0,0 +1,78 @@
+"""Binary graph snapshots: a loaded snapshot answers like the graph it was written from."""
+
+import os
+
+import pytest
+
+from code_intel.compact_graph import CompactCodeGraph
+from code_intel.graph import CodeGraph
+from code_intel.relations import Relationship
+from code_intel.scanner import ProjectScanner
+
+from conftest import graph_state
+
+
+def adjacency(graph, ids):
+    def edges(rels):
+        return [(r.source_id, r.target_id, r.type, r.count, r.lines) for r in rels]
+
+    return {
+        entity_id: (edges(graph.get_outgoing_edges(entity_id)), edges(graph.get_incoming_edges(entity_id)))
+        for entity_id in ids
+    }
+
+
+@pytest.mark.parametrize("graph_cls", [CodeGraph, CompactCodeGraph])
+@pytest.mark.parametrize("call_sites", [False, True])
+@pytest.mark.parametrize("mmap", [True, False])
+def test_snapshot_round_trip(project, tmp_path, graph_cls, call_sites, mmap):
+    graph = graph_cls(track_call_sites=call_sites)
+    ProjectScanner(project, graph).scan()
+    path = str(tmp_path / "graph.snapshot")
+    graph.save_snapshot(path)
+
+    with CodeGraph.load_snapshot(path, mmap=mmap) as loaded:
+        assert graph_state(loaded) == graph_state(graph)
+        ids = list(graph.nodes) + ["missing.id"] + [r.target_id for r in graph.edges if r.target_id not in graph.nodes]
+        assert adjacency(loaded, ids) == adjacency(graph, ids)
+        for entity in graph.nodes.values():
+            assert loaded.get_entity(entity.id) == entity
+            assert entity.id in loaded.nodes
+        assert loaded.get_entity("missing.id") is None
+        file_path = next(iter(graph.nodes.values())).file_path
+        assert loaded.get_file_entities(file_path) == graph.get_file_entities(file_path)
+
+
+def test_snapshot_is_read_only(sample_project, tmp_path):
+    graph = CodeGraph()
+    ProjectScanner(sample_project, graph).scan()
+    path = str(tmp_path / "graph.snapshot")
+    graph.save_snapshot(path)
+    with CodeGraph.load_snapshot(path) as loaded:
+        with pytest.raises(TypeError, match="read-only"):
+            loaded.add_relationship(Relationship("a", "b", "CALLS"))
+        with pytest.raises(TypeError, match="read-only"):
+            loaded.remove_file(next(iter(graph.nodes.values())).file_path)
+
+
+def test_snapshot_rejects_other_files(tmp_path):
+    path = tmp_path / "graph.snapshot"
+    path.write_bytes(b"not a snapshot at all, just some bytes")
+    with pytest.raises(ValueError, match="Not a code_intel graph snapshot"):
+        CodeGraph.load_snapshot(str(path))
+
+
+def test_saving_over_a_mapped_snapshot(sample_project, synthetic_project, tmp_path):
+    """Readers mapping the old file keep seeing it after a new snapshot is saved to the same path."""
+    old, new = CodeGraph(), CodeGraph()
+    ProjectScanner(sample_project, old).scan()
+    ProjectScanner(synthetic_project, new).scan()
+    (tmp_path / "out").mkdir()
+    path = str(tmp_path / "out" / "graph.snapshot")
+    old.save_snapshot(path)
+    with CodeGraph.load_snapshot(path, mmap=True) as loaded:
+        new.save_snapshot(path)
+        assert graph_state(loaded) == graph_state(old)
+    with CodeGraph.load_snapshot(path) as reloaded:
+        assert graph_state(reloaded) == graph_state(new)
+    assert os.listdir(str(tmp_path / "out")) == ["graph.snapshot"]
@@ -0,0 +1,161 @@
+"""VectorStore: cosine top-k against brute force, and save/load round trips."""
+
+import json
+import math
+import os
+import random
+
+import pytest
+
+from code_intel import storage
+from code_intel.storage import METADATA_FILE, VECTORS_FILE, VectorStore
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    """Runs a test with NumPy (when installed) and with the ``array("f")`` fallback."""
+    if request.param == "numpy":
+        if storage.np is None:
+            pytest.skip("NumPy is not installed")
+    else:
+        monkeypatch.setattr(storage, "np", None)
+    return request.param
+
+
+def random_vectors(count, dim, seed):
+    rnd = random.Random(seed)
+    return [[rnd.gauss(0.0, 1.0) for _ in range(dim)] for _ in range(count)]
+
+
+def fill(store, vectors, start=0, end=None):
+    rows = range(start, len(vectors) if end is None else end)
+    store.add_embeddings(
+        [f"chunk {i}" for i in rows],
+        vectors[rows.start:rows.stop],
+        [f"file_{i % 3}.py" for i in rows],
+        [f"name_{i}" for i in rows],
+    )
+    return store
+
+
+def cosine(a, b):
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(x * x for x in b))
+    return sum(x * y for x, y in zip(a, b)) / norm if norm else 0.0
+
+
+def brute_force(vectors, query, k):
+    scores = [(cosine(vector, query), i) for i, vector in enumerate(vectors)]
+    return sorted(scores, key=lambda item: (-item[0], item[1]))[:k]
+
+
+def assert_top_k(result, expected):
+    assert [row for row, _ in result] == [row for _, row in expected]
+    assert [score for _, score in result] == pytest.approx([score for score, _ in expected], abs=1e-5)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_top_k_matches_brute_force(backend, seed):
+    vectors = random_vectors(300, 16, seed)
+    store = VectorStore()
+    # Inserted in uneven batches to exercise growth.
+    for start, end in ((0, 1), (1, 70), (70, 71), (71, 300)):
+        fill(store, vectors, start, end)
+    assert len(store) == 300
+    for query in random_vectors(10, 16, seed + 100):
+        for k in (1, 5, 300, 1000):
+            assert_top_k(store.top_k(query, k), brute_force(vectors, query, k))
+
+
+def test_ties_prefer_lower_rows(backend):
+    store = fill(VectorStore(), [[1.0, 0.0], [0.0, 1.0], [2.0, 0.0], [3.0, 0.0]])
+    assert [row for row, _ in store.top_k([1.0, 0.0], 3)] == [0, 2, 3]
+
+
+def test_search_returns_metadata(backend):
+    store = fill(VectorStore(), [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+    (score, metadata), = store.search([0.0, 2.0, 0.0], k=1)
+    assert score == pytest.approx(1.0)
+    assert metadata == {"index": 1, "content": "chunk 1", "file_path": "file_1.py", "name": "name_1"}
+    assert store.vector(2) == pytest.approx([0.0, 0.0, 1.0])
+
+
+def test_zero_vectors_and_edge_cases(backend):
+    store = VectorStore(3)
+    assert store.top_k([1.0, 0.0, 0.0]) == []
+    fill(store, [[0.0, 0.0, 0.0], [1.0, 1.0, 0.0]])
+    assert [row for row, _ in store.top_k([1.0, 0.0, 0.0], 5)] == [1, 0]
+    assert store.top_k([1.0, 0.0, 0.0], 0) == []
+    with pytest.raises(ValueError):
+        store.top_k([1.0, 0.0], 1)
+    with pytest.raises(ValueError):
+        store.add_embedding("x", [1.0, 2.0], "f.py", "x")
+    with pytest.raises(ValueError):
+        store.add_embeddings(["a", "b"], [[1.0, 0.0, 0.0]], ["f.py"], ["a"])
+    with pytest.raises(IndexError):
+        store.vector(2)
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_save_load_round_trip(backend, tmp_path, mmap):
+    vectors = random_vectors(120, 8, 1)
+    store = fill(VectorStore(), vectors)
+    path = str(tmp_path / "store")
+    store.save(path)
+
+    loaded = VectorStore.load(path, mmap=mmap)
+    assert len(loaded) == len(store) and loaded.dim == store.dim
+    assert [loaded.metadata(i) for i in range(len(loaded))] == [store.metadata(i) for i in range(len(store))]
+    for i in (0, 57, 119):
+        assert loaded.vector(i) == pytest.approx(store.vector(i))
+    for query in random_vectors(5, 8, 2):
+        assert loaded.top_k(query, 7) == store.top_k(query, 7)
+
+    # Inserting into a loaded (possibly memory-mapped) store copies it first.
+    loaded.add_embedding("new", vectors[3], "new.py", "new")
+    assert len(loaded) == 121
+    assert [row for row, _ in loaded.top_k(vectors[3], 2)] == [3, 120]
+    # ... and leaves the saved files untouched.
+    assert len(VectorStore.load(path, mmap=mmap)) == 120
+
+
+def test_save_over_own_directory(backend, tmp_path):
+    """Saving a memory-mapped store back where it was loaded from must not clobber the mapping."""
+    vectors = random_vectors(50, 4, 5)
+    path = str(tmp_path / "store")
+    fill(VectorStore(), vectors).save(path)
+    loaded = VectorStore.load(path)
+    last = loaded.vector(49)
+    loaded.save(path)
+    fill(VectorStore.load(path), vectors[:1], 0, 1).save(path)
+    assert loaded.vector(49) == last
+    assert len(VectorStore.load(path)) == 51
+    assert sorted(os.listdir(path)) == sorted([METADATA_FILE, VECTORS_FILE])
+
+
+def test_saved_vectors_are_standard_npy(tmp_path, monkeypatch):
+    """A store saved without NumPy loads with it, and the other way round."""
+    if storage.np is None:
+        pytest.skip("NumPy is not installed")
+    vectors = random_vectors(40, 6, 3)
+    numpy_path, python_path = str(tmp_path / "numpy"), str(tmp_path / "python")
+    fill(VectorStore(), vectors).save(numpy_path)
+    with monkeypatch.context() as patch:
+        patch.setattr(storage, "np", None)
+        fill(VectorStore(), vectors).save(python_path)
+        from_numpy = VectorStore.load(numpy_path)
+        assert from_numpy.vector(5) == pytest.approx(fill(VectorStore(), vectors).vector(5))
+    from_python = VectorStore.load(python_path)
+    assert storage.np.allclose(from_python._rows(), VectorStore.load(numpy_path)._rows())
+
+
+def test_load_rejects_other_versions(backend, tmp_path):
+    path = str(tmp_path / "store")
+    fill(VectorStore(), random_vectors(3, 4, 0)).save(path)
+    metadata_path = os.path.join(path, METADATA_FILE)
+    with open(metadata_path) as f:
+        metadata = json.load(f)
+    metadata["version"] = 999
+    with open(metadata_path, "w") as f:
+        json.dump(metadata, f)
+    with pytest.raises(ValueError, match="unsupported vector store version"):
+        VectorStore.load(path)
@@ -0,0 +1,147 @@
+"""SymbolIndex: local names, ``self.x`` members and package re-exports."""
+
+import pytest
+
+from code_intel.entities import ClassEntity, FunctionEntity, MethodEntity, ModuleEntity
+from code_intel.graph import CodeGraph
+from code_intel.relations import REL_CALLS
+from code_intel.scanner import ProjectScanner
+from code_intel.symbols import MAX_REEXPORT_DEPTH, SymbolIndex, package_of
+
+from conftest import write_files
+
+
+def nodes(*entities):
+    return {entity.id: entity for entity in entities}
+
+
+@pytest.fixture
+def index():
+    graph = nodes(
+        ModuleEntity("pkg.__init__", "__init__", "pkg/__init__.py"),
+        FunctionEntity("pkg.__init__.setup", "setup", "pkg/__init__.py", 1, "pkg.__init__"),
+        ModuleEntity("pkg.impl", "impl", "pkg/impl.py"),
+        FunctionEntity("pkg.impl.helper", "helper", "pkg/impl.py", 1, "pkg.impl"),
+        ClassEntity("pkg.impl.Engine", "Engine", "pkg/impl.py", 3, "pkg.impl"),
+        MethodEntity("pkg.impl.Engine.run", "run", "pkg/impl.py", 4, "pkg.impl.Engine"),
+        MethodEntity("pkg.impl.Engine.stop", "stop", "pkg/impl.py", 6, "pkg.impl.Engine"),
+        FunctionEntity("pkg.impl.Engine.run.callback", "callback", "pkg/impl.py", 5, "pkg.impl.Engine.run"),
+        ModuleEntity("pkg.sub.__init__", "__init__", "pkg/sub/__init__.py"),
+        ModuleEntity("app", "app", "app.py"),
+        FunctionEntity("app.main", "main", "app.py", 1, "app"),
+    )
+    package_imports = {
+        # from .impl import helper, Engine as Motor; from . import sub
+        "pkg.__init__": [("helper", "pkg.impl.helper", "pkg.impl"), ("Motor", "pkg.impl.Engine", "pkg.impl"),
+                         ("sub", "pkg.sub", "pkg.sub")],
+        # from pkg import helper as assist (re-export of a re-export)
+        "pkg.sub.__init__": [("assist", "pkg.helper", "pkg")],
+    }
+    return SymbolIndex(graph, package_imports)
+
+
+def test_local_names(index):
+    assert index.local("pkg.impl", "helper") == "pkg.impl.helper"
+    assert index.local("pkg.impl", "Engine.run") == "pkg.impl.Engine.run"
+    assert index.local("pkg.impl", "Engine.run.callback") == "pkg.impl.Engine.run.callback"
+    assert index.local("pkg.impl", "missing") is None
+    assert index.local("nowhere", "helper") is None
+
+
+def test_self_members(index):
+    assert index.member("pkg.impl.Engine.run", "stop") == "pkg.impl.Engine.stop"
+    # A function nested in a method still sees the method's class.
+    assert index.member("pkg.impl.Engine.run.callback", "run") == "pkg.impl.Engine.run"
+    assert index.member("pkg.impl.Engine.run", "missing") is None
+    # Outside any class, self.x resolves to nothing.
+    assert index.member("pkg.impl.helper", "run") is None
+    assert index.member("app.main", "stop") is None
+    assert index.enclosing_class("pkg.impl.Engine") is None
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("pkg.impl.helper", "pkg.impl.helper"),
+    ("pkg.helper", "pkg.impl.helper"),
+    ("pkg.Motor", "pkg.impl.Engine"),
+    ("pkg.Motor.run", "pkg.impl.Engine.run"),
+    ("pkg.setup", "pkg.__init__.setup"),
+    ("pkg.sub.assist", "pkg.impl.helper"),
+    ("pkg.missing", "pkg.missing"),
+    ("os.path.join", "os.path.join"),
+])
+def test_canonical_follows_reexports(index, name, expected):
+    assert index.canonical(name) == expected
+    assert index.canonical(name) == expected  # memoized
+
+
+def test_reexport_cycles_terminate():
+    graph = nodes(ModuleEntity("a.__init__", "__init__", "a/__init__.py"),
+                  ModuleEntity("b.__init__", "__init__", "b/__init__.py"))
+    index = SymbolIndex(graph, {"a.__init__": [("x", "b.x", "b")], "b.__init__": [("x", "a.x", "a")]})
+    assert index.canonical("a.x") == "a.x"
+    chain = {f"p{i}.__init__": [("x", f"p{i + 1}.x", f"p{i + 1}")] for i in range(MAX_REEXPORT_DEPTH + 2)}
+    assert SymbolIndex(graph, chain).canonical("p0.x") == "p0.x"
+
+
+def test_modules_can_be_replaced(index):
+    index.remove_module("pkg.impl")
+    assert index.local("pkg.impl", "helper") is None
+    assert index.member("pkg.impl.Engine.run", "stop") is None
+
+    entities = [
+        ModuleEntity("pkg.impl", "impl", "pkg/impl.py"),
+        ClassEntity("pkg.impl.Engine", "Engine", "pkg/impl.py", 1, "pkg.impl"),
+        MethodEntity("pkg.impl.Engine.halt", "halt", "pkg/impl.py", 2, "pkg.impl.Engine"),
+    ]
+    index.nodes.update(nodes(*entities))
+    index.add_module(entities)
+    assert index.member("pkg.impl.Engine.run", "halt") == "pkg.impl.Engine.halt"
+    assert index.member("pkg.impl.Engine.run", "stop") is None
+
+    index.remove_module("pkg.__init__")
+    assert "pkg" not in index.exports
+    assert index.canonical("pkg.helper") == "pkg.helper"
+    assert package_of("pkg.sub.__init__") == "pkg.sub" and package_of("pkg.impl") == "pkg.impl"
+
+
+def test_scanner_resolves_members_and_reexports(tmp_path):
+    write_files(tmp_path, {
+        "pkg/__init__.py": "from .impl import helper, Engine as Motor\n",
+        "pkg/impl.py": """
+            def helper():
+                pass
+
+
+            class Engine:
+                def run(self):
+                    def callback():
+                        self.stop()
+                    self.stop()
+                    self.missing()
+
+                def stop(self):
+                    helper()
+        """,
+        "app.py": """
+            import pkg
+            from pkg import Motor
+
+
+            def main():
+                pkg.helper()
+                Motor().run()
+                pkg.Motor.stop(None)
+        """,
+    })
+    graph = CodeGraph()
+    ProjectScanner(str(tmp_path), graph).scan()
+    calls = {(r.source_id, r.target_id) for r in graph.edges if r.type == REL_CALLS}
+    assert calls >= {
+        ("pkg.impl.Engine.run", "pkg.impl.Engine.stop"),
+        ("pkg.impl.Engine.run.callback", "pkg.impl.Engine.stop"),
+        ("pkg.impl.Engine.stop", "pkg.impl.helper"),
+        ("app.main", "pkg.impl.helper"),
+        ("app.main", "pkg.impl.Engine"),
+        ("app.main", "pkg.impl.Engine.stop"),
+    }
+    assert not any(target.endswith("missing") for _, target in calls)
@@ -0,0 +1,129 @@
+"""Watch mode: in-place ``update_files`` and the polling ``FileWatcher``."""
+
+import os
+import random
+import shutil
+
+import pytest
+
+from code_intel.compact_graph import CompactCodeGraph
+from code_intel.graph import CodeGraph
+from code_intel.scanner import ProjectScanner
+from code_intel import watch
+from code_intel.watch import FileWatcher
+
+from conftest import graph_state, write_files
+
+EDITS = {
+    # Modified: helper now calls a new function; format_name is gone.
+    "app/util.py": """
+        def helper():
+            return shout("y")
+
+
+        def shout(name):
+            return name.upper()
+
+
+        def even(n):
+            return n == 0 or odd(n - 1)
+
+
+        def odd(n):
+            return n != 0 and even(n - 1)
+    """,
+    # Created, depending on a changed module.
+    "app/extra.py": """
+        from app.util import shout
+
+
+        def loud():
+            shout("z")
+            shout("z")
+    """,
+    # Fixed: the file that did not parse now defines something.
+    "broken.py": """
+        def oops():
+            pass
+    """,
+}
+
+
+@pytest.mark.parametrize("graph_cls", [CodeGraph, CompactCodeGraph])
+def test_update_files_matches_rescan(synthetic_project, graph_cls):
+    graph = graph_cls(track_call_sites=True)
+    scanner = ProjectScanner(synthetic_project, graph, live=True)
+    scanner.scan()
+
+    write_files(synthetic_project, EDITS)
+    deleted = os.path.join(synthetic_project, "main.py")
+    os.remove(deleted)
+    changed = [os.path.join(synthetic_project, rel_path) for rel_path in EDITS]
+    facets = scanner.update_files(changed, [deleted])
+
+    rescanned = graph_cls(track_call_sites=True)
+    ProjectScanner(synthetic_project, rescanned).scan()
+    assert graph_state(graph, ordered=False) == graph_state(rescanned, ordered=False)
+    assert {"sources", "entities", "CALLS"} <= facets
+
+
+def test_update_files_without_changes_keeps_the_graph(sample_project):
+    graph = CodeGraph()
+    scanner = ProjectScanner(sample_project, graph, live=True)
+    scanner.scan()
+    before = graph_state(graph, ordered=False)
+    assert scanner.update_files([os.path.join(sample_project, "utils.py")]) == {"sources"}
+    assert graph_state(graph, ordered=False) == before
+
+
+def listed(discovery):
+    stats = {}
+    for path in discovery.iter_files():
+        st = os.stat(path)
+        stats[path] = (st.st_mtime_ns, st.st_size)
+    return stats
+
+
+# The project was just created, so with the default window every directory
+# counts as racy and is listed again; 0 exercises the mtime comparison alone.
+@pytest.mark.parametrize("racy_seconds", [watch.RACY_SECONDS, 0.0])
+def test_file_watcher_matches_full_walk(synthetic_project, monkeypatch, racy_seconds):
+    """Every poll reports exactly what comparing two full walks would."""
+    monkeypatch.setattr(watch, "RACY_SECONDS", racy_seconds)
+    scanner = ProjectScanner(synthetic_project, CodeGraph())
+    watcher = FileWatcher(scanner.discovery)
+    previous = listed(scanner.discovery)
+    rnd = random.Random(0)
+    for step in range(60):
+        dirs = [d for d, _, _ in os.walk(synthetic_project)]
+        files = list(previous)
+        action = rnd.randrange(7)
+        if action == 0 and files:
+            with open(rnd.choice(files), "a") as f:
+                f.write(f"\n# edit {step}\n")
+        elif action == 1:
+            write_files(rnd.choice(dirs), {f"new_{step}.py": "x = 1\n"})
+        elif action == 2 and files:
+            os.remove(rnd.choice(files))
+        elif action == 3:
+            write_files(rnd.choice(dirs), {f"pkg_{step}/sub/mod.py": "y = 2\n"})
+        elif action == 4 and len(dirs) > 1:
+            shutil.rmtree(rnd.choice(dirs[1:]))
+        elif action == 5:
+            with open(os.path.join(rnd.choice(dirs), ".gitignore"), "a") as f:
+                f.write(rnd.choice(["new_*.py\n", "mod.py\n", "!new_1*.py\n", "sub/\n"]))
+        elif action == 6:
+            ignores = [os.path.join(d, ".gitignore") for d in dirs if os.path.exists(os.path.join(d, ".gitignore"))]
+            if ignores:
+                os.remove(rnd.choice(ignores))
+
+        changed, deleted = watcher.poll()
+        current = listed(scanner.discovery)
+        assert sorted(changed) == sorted(p for p in current if previous.get(p) != current[p])
+        assert sorted(deleted) == sorted(p for p in previous if p not in current)
+        previous = current
+
+
+def test_file_watcher_reports_nothing_without_edits(sample_project):
+    watcher = FileWatcher(ProjectScanner(sample_project, CodeGraph()).discovery)
+    assert watcher.poll() == ([], [])
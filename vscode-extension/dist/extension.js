@@ -39,6 +39,7 @@ const vscode = __importStar(require("vscode"));
 const cp = __importStar(require("child_process"));
 const fs = __importStar(require("fs"));
 const path = __importStar(require("path"));
+const readline = __importStar(require("readline"));
 const OUTPUT_CHANNEL_NAME = 'Code Analyzer';
 function activate(context) {
     const output = vscode.window.createOutputChannel(OUTPUT_CHANNEL_NAME);
@@ -62,18 +63,10 @@ function activate(context) {
         const pythonPath = (config.get('pythonPath') || 'python').trim();
         const defaultOutputFolder = (config.get('defaultOutputFolder') || 'results').trim();
         output.appendLine(`[info] Workspace: ${workspaceFolder.uri.fsPath}`);
-        // Try to locate the analyzer root by finding code_intel/analyze.py
-        const analyzerEntrypoints = await vscode.workspace.findFiles('**/code_intel/analyze.py', '**/node_modules/**', 5);
-        if (analyzerEntrypoints.length === 0) {
-            vscode.window.showErrorMessage('Could not find code_intel/analyze.py in this workspace.');
+        const analyzerRoot = await findAnalyzerRoot(output);
+        if (!analyzerRoot) {
             return;
         }
-        // Pick the closest analyzer entrypoint (prefer one under a folder named "code_analyzer")
-        const preferred = analyzerEntrypoints.find((u) => u.fsPath.toLowerCase().includes(`${path.sep}code_analyzer${path.sep}`));
-        const entrypointUri = preferred ?? analyzerEntrypoints[0];
-        const analyzerRoot = path.dirname(path.dirname(entrypointUri.fsPath)); // .../code_analyzer
-        output.appendLine(`[info] Analyzer entrypoint: ${entrypointUri.fsPath}`);
-        output.appendLine(`[info] Analyzer root: ${analyzerRoot}`);
         const targetPath = workspaceFolder.uri.fsPath;
         const outputFolderInput = await vscode.window.showInputBox({
             title: 'Code Analyzer Output Folder',
@@ -100,10 +93,201 @@ function activate(context) {
         await vscode.window.showTextDocument(doc, { preview: false });
         vscode.window.showInformationMessage(`Analysis complete. Output: ${outputDir}`);
     });
+    // Long-running analysis server: scans once, then answers queries from memory.
+    let server;
+    async function getServer() {
+        if (server && server.running) {
+            return server;
+        }
+        const workspaceFolder = vscode.workspace.workspaceFolders?.[0];
+        if (!workspaceFolder) {
+            vscode.window.showErrorMessage('Open a folder/workspace first.');
+            return undefined;
+        }
+        const analyzerRoot = await findAnalyzerRoot(output);
+        if (!analyzerRoot) {
+            return undefined;
+        }
+        const pythonPath = (vscode.workspace.getConfiguration('codeAnalyzer').get('pythonPath') || 'python').trim();
+        server = new AnalysisServerClient(pythonPath, analyzerRoot, workspaceFolder.uri.fsPath, output);
+        return server;
+    }
+    async function entityAtCursor(client) {
+        const editor = vscode.window.activeTextEditor;
+        if (!editor || editor.document.languageId !== 'python') {
+            vscode.window.showErrorMessage('Place the cursor inside a Python file first.');
+            return undefined;
+        }
+        const entity = await client.request('entityAtPosition', {
+            file: editor.document.uri.fsPath,
+            line: editor.selection.active.line + 1
+        });
+        if (!entity) {
+            vscode.window.showWarningMessage('No analyzed entity at the cursor.');
+        }
+        return entity ?? undefined;
+    }
+    async function showNeighbours(method) {
+        const client = await getServer();
+        const entity = client && (await entityAtCursor(client));
+        if (!client || !entity) {
+            return;
+        }
+        const neighbours = await client.request(method, { id: entity.id });
+        if (neighbours.length === 0) {
+            vscode.window.showInformationMessage(`No ${method} found for ${entity.id}.`);
+            return;
+        }
+        const picked = await vscode.window.showQuickPick(neighbours.map(n => ({
+            label: n.id,
+            description: `${n.count} call site(s)`,
+            detail: n.entity ? `${n.entity.file_path}:${n.entity.line_number}` : undefined,
+            entity: n.entity
+        })), { title: `${method === 'callers' ? 'Callers of' : 'Callees of'} ${entity.id}` });
+        if (picked?.entity) {
+            await revealEntity(picked.entity);
+        }
+    }
+    const showCallers = vscode.commands.registerCommand('codeAnalyzer.showCallers', () => showNeighbours('callers').catch(err => reportServerError(err, output)));
+    const showCallees = vscode.commands.registerCommand('codeAnalyzer.showCallees', () => showNeighbours('callees').catch(err => reportServerError(err, output)));
+    const showHotspots = vscode.commands.registerCommand('codeAnalyzer.showHotspots', async () => {
+        try {
+            const client = await getServer();
+            if (!client) {
+                return;
+            }
+            const hotspots = await client.request('hotspots', { limit: 10 });
+            output.show(true);
+            output.appendLine('[hotspots]');
+            for (const [kind, entries] of Object.entries(hotspots)) {
+                output.appendLine(`  ${kind}:`);
+                for (const entry of entries) {
+                    output.appendLine(`    ${entry.id} (${entry.count})`);
+                }
+            }
+        }
+        catch (err) {
+            reportServerError(err, output);
+        }
+    });
+    // Keep the resident graph in step with the workspace.
+    const notifyChanged = (key) => (uri) => {
+        if (server && server.running) {
+            server.notify('didChangeFiles', { [key]: [uri.fsPath] });
+        }
+    };
+    const pyWatcher = vscode.workspace.createFileSystemWatcher('**/*.py');
+    pyWatcher.onDidChange(notifyChanged('changed'));
+    pyWatcher.onDidCreate(notifyChanged('changed'));
+    pyWatcher.onDidDelete(notifyChanged('deleted'));
     context.subscriptions.push(disposable, output);
     context.subscriptions.push(status);
+    context.subscriptions.push(showCallers, showCallees, showHotspots, pyWatcher);
+    context.subscriptions.push({ dispose: () => server?.dispose() });
 }
 function deactivate() { }
+async function findAnalyzerRoot(output) {
+    // Try to locate the analyzer root by finding code_intel/analyze.py
+    const analyzerEntrypoints = await vscode.workspace.findFiles('**/code_intel/analyze.py', '**/node_modules/**', 5);
+    if (analyzerEntrypoints.length === 0) {
+        vscode.window.showErrorMessage('Could not find code_intel/analyze.py in this workspace.');
+        return undefined;
+    }
+    // Pick the closest analyzer entrypoint (prefer one under a folder named "code_analyzer")
+    const preferred = analyzerEntrypoints.find((u) => u.fsPath.toLowerCase().includes(`${path.sep}code_analyzer${path.sep}`));
+    const entrypointUri = preferred ?? analyzerEntrypoints[0];
+    const analyzerRoot = path.dirname(path.dirname(entrypointUri.fsPath)); // .../code_analyzer
+    output.appendLine(`[info] Analyzer entrypoint: ${entrypointUri.fsPath}`);
+    output.appendLine(`[info] Analyzer root: ${analyzerRoot}`);
+    return analyzerRoot;
+}
+async function revealEntity(entity) {
+    const doc = await vscode.workspace.openTextDocument(vscode.Uri.file(entity.file_path));
+    const editor = await vscode.window.showTextDocument(doc, { preview: true });
+    const position = new vscode.Position(Math.max(entity.line_number - 1, 0), 0);
+    editor.selection = new vscode.Selection(position, position);
+    editor.revealRange(new vscode.Range(position, position), vscode.TextEditorRevealType.InCenter);
+}
+function reportServerError(err, output) {
+    output.appendLine(`[error] Analysis server: ${String(err)}`);
+    vscode.window.showErrorMessage(`Analysis server error: ${String(err)}. See Output -> ${OUTPUT_CHANNEL_NAME}`);
+}
+/**
+ * Client for `python -m code_intel.server`: line-delimited JSON-RPC 2.0 over the
+ * child's stdin/stdout. The server's stderr (scan progress) goes to the output channel.
+ */
+class AnalysisServerClient {
+    constructor(command, cwd, targetPath, output) {
+        this.output = output;
+        this.nextId = 1;
+        this.pending = new Map();
+        this.running = true;
+        const args = ['-m', 'code_intel.server', targetPath];
+        output.appendLine(`[server] ${command} ${args.map(a => JSON.stringify(a)).join(' ')}`);
+        this.child = cp.spawn(command, args, { cwd, env: process.env, shell: false, windowsHide: true });
+        readline.createInterface({ input: this.child.stdout }).on('line', (line) => this.onLine(line));
+        this.child.stderr?.on('data', (d) => output.append(d.toString()));
+        this.child.on('error', (err) => this.stop(err));
+        this.child.on('close', (code) => this.stop(new Error(`Analysis server exited with code ${code}`)));
+    }
+    request(method, params) {
+        if (!this.running) {
+            return Promise.reject(new Error('Analysis server is not running'));
+        }
+        const id = this.nextId++;
+        return new Promise((resolve, reject) => {
+            this.pending.set(id, { resolve, reject });
+            this.send({ jsonrpc: '2.0', id, method, params });
+        });
+    }
+    notify(method, params) {
+        this.send({ jsonrpc: '2.0', method, params });
+    }
+    dispose() {
+        if (this.running) {
+            this.request('shutdown', {}).catch(() => undefined);
+            this.child.stdin?.end();
+        }
+    }
+    send(message) {
+        this.child.stdin?.write(JSON.stringify(message) + '\n');
+    }
+    onLine(line) {
+        let message;
+        try {
+            message = JSON.parse(line);
+        }
+        catch {
+            this.output.appendLine(`[server] unexpected output: ${line}`);
+            return;
+        }
+        const waiter = this.pending.get(message.id);
+        if (!waiter) {
+            if (message.error) {
+                this.output.appendLine(`[server] error: ${message.error.message}`);
+            }
+            return;
+        }
+        this.pending.delete(message.id);
+        if (message.error) {
+            waiter.reject(new Error(message.error.message));
+        }
+        else {
+            waiter.resolve(message.result);
+        }
+    }
+    stop(err) {
+        if (!this.running) {
+            return;
+        }
+        this.running = false;
+        this.output.appendLine(`[server] ${err.message}`);
+        for (const waiter of this.pending.values()) {
+            waiter.reject(err);
+        }
+        this.pending.clear();
+    }
+}
 function runProcess(command, args, cwd, output) {
     return new Promise((resolve, reject) => {
         const child = cp.spawn(command, args, {
@@ -136,6 +320,7 @@ function generateAnalysisReadme(outputDir, analyzerRoot, targetPath) {
     const files = [
         'domain_overview.md',
         'dependency_report.md',
+        'cycles.json',
         'business_rules.md',
         'business_rules.json',
         'entity_map.json',
@@ -2,6 +2,7 @@ import * as vscode from 'vscode';
 import * as cp from 'child_process';
 import * as fs from 'fs';
 import * as path from 'path';
+import * as readline from 'readline';
 
 const OUTPUT_CHANNEL_NAME = 'Code Analyzer';
 
@@ -34,23 +35,11 @@ export function activate(context: vscode.ExtensionContext) {
 
     output.appendLine(`[info] Workspace: ${workspaceFolder.uri.fsPath}`);
 
-    // Try to locate the analyzer root by finding code_intel/analyze.py
-    const analyzerEntrypoints = await vscode.workspace.findFiles('**/code_intel/analyze.py', '**/node_modules/**', 5);
-    if (analyzerEntrypoints.length === 0) {
-      vscode.window.showErrorMessage('Could not find code_intel/analyze.py in this workspace.');
+    const analyzerRoot = await findAnalyzerRoot(output);
+    if (!analyzerRoot) {
       return;
     }
 
-    // Pick the closest analyzer entrypoint (prefer one under a folder named "code_analyzer")
-    const preferred = analyzerEntrypoints.find((u: vscode.Uri) =>
-      u.fsPath.toLowerCase().includes(`${path.sep}code_analyzer${path.sep}`)
-    );
-    const entrypointUri = preferred ?? analyzerEntrypoints[0];
-    const analyzerRoot = path.dirname(path.dirname(entrypointUri.fsPath)); // .../code_analyzer
-
-    output.appendLine(`[info] Analyzer entrypoint: ${entrypointUri.fsPath}`);
-    output.appendLine(`[info] Analyzer root: ${analyzerRoot}`);
-
     const targetPath = workspaceFolder.uri.fsPath;
 
     const outputFolderInput = await vscode.window.showInputBox({
@@ -87,12 +76,229 @@ export function activate(context: vscode.ExtensionContext) {
     vscode.window.showInformationMessage(`Analysis complete. Output: ${outputDir}`);
   });
 
+  // Long-running analysis server: scans once, then answers queries from memory.
+  let server: AnalysisServerClient | undefined;
+
+  async function getServer(): Promise<AnalysisServerClient | undefined> {
+    if (server && server.running) {
+      return server;
+    }
+    const workspaceFolder = vscode.workspace.workspaceFolders?.[0];
+    if (!workspaceFolder) {
+      vscode.window.showErrorMessage('Open a folder/workspace first.');
+      return undefined;
+    }
+    const analyzerRoot = await findAnalyzerRoot(output);
+    if (!analyzerRoot) {
+      return undefined;
+    }
+    const pythonPath = (vscode.workspace.getConfiguration('codeAnalyzer').get<string>('pythonPath') || 'python').trim();
+    server = new AnalysisServerClient(pythonPath, analyzerRoot, workspaceFolder.uri.fsPath, output);
+    return server;
+  }
+
+  async function entityAtCursor(client: AnalysisServerClient): Promise<any | undefined> {
+    const editor = vscode.window.activeTextEditor;
+    if (!editor || editor.document.languageId !== 'python') {
+      vscode.window.showErrorMessage('Place the cursor inside a Python file first.');
+      return undefined;
+    }
+    const entity = await client.request('entityAtPosition', {
+      file: editor.document.uri.fsPath,
+      line: editor.selection.active.line + 1
+    });
+    if (!entity) {
+      vscode.window.showWarningMessage('No analyzed entity at the cursor.');
+    }
+    return entity ?? undefined;
+  }
+
+  async function showNeighbours(method: 'callers' | 'callees') {
+    const client = await getServer();
+    const entity = client && (await entityAtCursor(client));
+    if (!client || !entity) {
+      return;
+    }
+    const neighbours: any[] = await client.request(method, { id: entity.id });
+    if (neighbours.length === 0) {
+      vscode.window.showInformationMessage(`No ${method} found for ${entity.id}.`);
+      return;
+    }
+    const picked = await vscode.window.showQuickPick(
+      neighbours.map(n => ({
+        label: n.id,
+        description: `${n.count} call site(s)`,
+        detail: n.entity ? `${n.entity.file_path}:${n.entity.line_number}` : undefined,
+        entity: n.entity
+      })),
+      { title: `${method === 'callers' ? 'Callers of' : 'Callees of'} ${entity.id}` }
+    );
+    if (picked?.entity) {
+      await revealEntity(picked.entity);
+    }
+  }
+
+  const showCallers = vscode.commands.registerCommand('codeAnalyzer.showCallers', () =>
+    showNeighbours('callers').catch(err => reportServerError(err, output))
+  );
+  const showCallees = vscode.commands.registerCommand('codeAnalyzer.showCallees', () =>
+    showNeighbours('callees').catch(err => reportServerError(err, output))
+  );
+  const showHotspots = vscode.commands.registerCommand('codeAnalyzer.showHotspots', async () => {
+    try {
+      const client = await getServer();
+      if (!client) {
+        return;
+      }
+      const hotspots: Record<string, { id: string; count: number }[]> = await client.request('hotspots', { limit: 10 });
+      output.show(true);
+      output.appendLine('[hotspots]');
+      for (const [kind, entries] of Object.entries(hotspots)) {
+        output.appendLine(`  ${kind}:`);
+        for (const entry of entries) {
+          output.appendLine(`    ${entry.id} (${entry.count})`);
+        }
+      }
+    } catch (err) {
+      reportServerError(err, output);
+    }
+  });
+
+  // Keep the resident graph in step with the workspace.
+  const notifyChanged = (key: 'changed' | 'deleted') => (uri: vscode.Uri) => {
+    if (server && server.running) {
+      server.notify('didChangeFiles', { [key]: [uri.fsPath] });
+    }
+  };
+  const pyWatcher = vscode.workspace.createFileSystemWatcher('**/*.py');
+  pyWatcher.onDidChange(notifyChanged('changed'));
+  pyWatcher.onDidCreate(notifyChanged('changed'));
+  pyWatcher.onDidDelete(notifyChanged('deleted'));
+
   context.subscriptions.push(disposable, output);
   context.subscriptions.push(status);
+  context.subscriptions.push(showCallers, showCallees, showHotspots, pyWatcher);
+  context.subscriptions.push({ dispose: () => server?.dispose() });
 }
 
 export function deactivate() {}
 
+async function findAnalyzerRoot(output: vscode.OutputChannel): Promise<string | undefined> {
+  // Try to locate the analyzer root by finding code_intel/analyze.py
+  const analyzerEntrypoints = await vscode.workspace.findFiles('**/code_intel/analyze.py', '**/node_modules/**', 5);
+  if (analyzerEntrypoints.length === 0) {
+    vscode.window.showErrorMessage('Could not find code_intel/analyze.py in this workspace.');
+    return undefined;
+  }
+
+  // Pick the closest analyzer entrypoint (prefer one under a folder named "code_analyzer")
+  const preferred = analyzerEntrypoints.find((u: vscode.Uri) =>
+    u.fsPath.toLowerCase().includes(`${path.sep}code_analyzer${path.sep}`)
+  );
+  const entrypointUri = preferred ?? analyzerEntrypoints[0];
+  const analyzerRoot = path.dirname(path.dirname(entrypointUri.fsPath)); // .../code_analyzer
+
+  output.appendLine(`[info] Analyzer entrypoint: ${entrypointUri.fsPath}`);
+  output.appendLine(`[info] Analyzer root: ${analyzerRoot}`);
+  return analyzerRoot;
+}
+
+async function revealEntity(entity: { file_path: string; line_number: number }) {
+  const doc = await vscode.workspace.openTextDocument(vscode.Uri.file(entity.file_path));
+  const editor = await vscode.window.showTextDocument(doc, { preview: true });
+  const position = new vscode.Position(Math.max(entity.line_number - 1, 0), 0);
+  editor.selection = new vscode.Selection(position, position);
+  editor.revealRange(new vscode.Range(position, position), vscode.TextEditorRevealType.InCenter);
+}
+
+function reportServerError(err: unknown, output: vscode.OutputChannel) {
+  output.appendLine(`[error] Analysis server: ${String(err)}`);
+  vscode.window.showErrorMessage(`Analysis server error: ${String(err)}. See Output -> ${OUTPUT_CHANNEL_NAME}`);
+}
+
+/**
+ * Client for `python -m code_intel.server`: line-delimited JSON-RPC 2.0 over the
+ * child's stdin/stdout. The server's stderr (scan progress) goes to the output channel.
+ */
+class AnalysisServerClient {
+  private child: cp.ChildProcess;
+  private nextId = 1;
+  private pending = new Map<number, { resolve: (value: any) => void; reject: (reason: Error) => void }>();
+  running = true;
+
+  constructor(command: string, cwd: string, targetPath: string, private output: vscode.OutputChannel) {
+    const args = ['-m', 'code_intel.server', targetPath];
+    output.appendLine(`[server] ${command} ${args.map(a => JSON.stringify(a)).join(' ')}`);
+    this.child = cp.spawn(command, args, { cwd, env: process.env, shell: false, windowsHide: true });
+
+    readline.createInterface({ input: this.child.stdout! }).on('line', (line: string) => this.onLine(line));
+    this.child.stderr?.on('data', (d: Buffer) => output.append(d.toString()));
+    this.child.on('error', (err: Error) => this.stop(err));
+    this.child.on('close', (code: number | null) => this.stop(new Error(`Analysis server exited with code ${code}`)));
+  }
+
+  request(method: string, params: object): Promise<any> {
+    if (!this.running) {
+      return Promise.reject(new Error('Analysis server is not running'));
+    }
+    const id = this.nextId++;
+    return new Promise((resolve, reject) => {
+      this.pending.set(id, { resolve, reject });
+      this.send({ jsonrpc: '2.0', id, method, params });
+    });
+  }
+
+  notify(method: string, params: object) {
+    this.send({ jsonrpc: '2.0', method, params });
+  }
+
+  dispose() {
+    if (this.running) {
+      this.request('shutdown', {}).catch(() => undefined);
+      this.child.stdin?.end();
+    }
+  }
+
+  private send(message: object) {
+    this.child.stdin?.write(JSON.stringify(message) + '\n');
+  }
+
+  private onLine(line: string) {
+    let message: any;
+    try {
+      message = JSON.parse(line);
+    } catch {
+      this.output.appendLine(`[server] unexpected output: ${line}`);
+      return;
+    }
+    const waiter = this.pending.get(message.id);
+    if (!waiter) {
+      if (message.error) {
+        this.output.appendLine(`[server] error: ${message.error.message}`);
+      }
+      return;
+    }
+    this.pending.delete(message.id);
+    if (message.error) {
+      waiter.reject(new Error(message.error.message));
+    } else {
+      waiter.resolve(message.result);
+    }
+  }
+
+  private stop(err: Error) {
+    if (!this.running) {
+      return;
+    }
+    this.running = false;
+    this.output.appendLine(`[server] ${err.message}`);
+    for (const waiter of this.pending.values()) {
+      waiter.reject(err);
+    }
+    this.pending.clear();
+  }
+}
+
 function runProcess(command: string, args: string[], cwd: string, output: vscode.OutputChannel): Promise<void> {
   return new Promise((resolve, reject) => {
     const child = cp.spawn(command, args, {
@@ -128,6 +334,7 @@ function generateAnalysisReadme(outputDir: string, analyzerRoot: string, targetP
   const files = [
     'domain_overview.md',
     'dependency_report.md',
+    'cycles.json',
     'business_rules.md',
     'business_rules.json',
     'entity_map.json',